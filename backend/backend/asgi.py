@@ -3,6 +3,20 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live notification stream (/api/inventory/notifications/stream/) is an async
+view that holds the connection open, so it must be served through this module
+by an ASGI server, e.g.:
+
+    uvicorn backend.asgi:application --workers 1
+
+With several workers set NOTIFICATIONS_SSE_BROADCASTER to
+'inventory.sse.DatabaseBroadcaster'.
+
+The cross-category reports also have async versions under
+/api/inventory/items/<report>/async/ that run their independent queries
+concurrently on a bounded thread pool (REPORT_FANOUT_THREADS, see
+inventory/parallel.py). The sync routes keep working under WSGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
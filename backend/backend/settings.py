@@ -94,6 +94,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Las transacciones toman el candado de escritura al iniciar, así las
+        # reservas concurrentes se serializan en lugar de fallar con "database is locked"
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -153,3 +159,98 @@ EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
+
+# Bandeja de salida de correos: el comando `send_outbox` reintenta los envíos
+# fallidos con espera exponencial y los marca como fallidos al agotar los intentos
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.environ.get('EMAIL_OUTBOX_BACKOFF_SECONDS', '60'))
+
+# Notificaciones en vivo (SSE, ver inventory/sse.py). Con varios workers ASGI usar
+# 'inventory.sse.DatabaseBroadcaster', que consulta la base de datos cada
+# NOTIFICATIONS_SSE_POLL_SECONDS segundos por proceso.
+NOTIFICATIONS_SSE_BROADCASTER = os.environ.get('NOTIFICATIONS_SSE_BROADCASTER', 'inventory.sse.LocalBroadcaster')
+NOTIFICATIONS_SSE_POLL_SECONDS = float(os.environ.get('NOTIFICATIONS_SSE_POLL_SECONDS', '2'))
+
+# Retención de notificaciones (ver inventory/retention.py y el comando
+# purge_notifications): las leídas por todos se depuran a los
+# NOTIFICATIONS_RETENTION_READ_DAYS días y cualquiera a los
+# NOTIFICATIONS_RETENTION_UNREAD_DAYS, en lotes de NOTIFICATIONS_PURGE_BATCH_SIZE.
+NOTIFICATIONS_RETENTION_READ_DAYS = int(os.environ.get('NOTIFICATIONS_RETENTION_READ_DAYS', '90'))
+NOTIFICATIONS_RETENTION_UNREAD_DAYS = int(os.environ.get('NOTIFICATIONS_RETENTION_UNREAD_DAYS', '365'))
+NOTIFICATIONS_PURGE_BATCH_SIZE = int(os.environ.get('NOTIFICATIONS_PURGE_BATCH_SIZE', '500'))
+
+# Inventory
+# Consultas entre categorías sobre la tabla unificada inventory_item en lugar de
+# un UNION ALL sobre las 11 tablas de categorías.
+INVENTORY_UNIFIED_CATALOG = os.environ.get('INVENTORY_UNIFIED_CATALOG', 'True') == 'True'
+
+# Alertas de bajo stock: se agrupan en un resumen por artículo y categoría.
+# 'ventana' emite el resumen al confirmar la transacción cuando la alerta más
+# antigua tiene al menos INVENTORY_LOW_STOCK_WINDOW_SECONDS; 'programado' sólo
+# con el comando send_stock_digest (cron cada hora o cada día).
+INVENTORY_LOW_STOCK_ALERT_MODE = os.environ.get('INVENTORY_LOW_STOCK_ALERT_MODE', 'ventana')
+INVENTORY_LOW_STOCK_WINDOW_SECONDS = int(os.environ.get('INVENTORY_LOW_STOCK_WINDOW_SECONDS', '0'))
+
+# Stock mínimo global, para artículos y categorías sin uno propio (ver
+# inventory/thresholds.py). Después de cambiarlo, ejecutar `rebuild_catalog`.
+INVENTORY_LOW_STOCK_THRESHOLD = int(os.environ.get('INVENTORY_LOW_STOCK_THRESHOLD', '10'))
+
+# Caché de los reportes de inventario (ver inventory/report_cache.py). Se invalida
+# por versión de tabla, así que un resultado nunca se sirve después de un cambio
+# salvo dentro de INVENTORY_REPORT_CACHE_STALE_SECONDS (stale-while-revalidate;
+# 0 = nunca). Backend en INVENTORY_REPORT_CACHE_BACKEND: 'locmem' (por proceso),
+# 'file' o 'db' (compartidos entre workers; 'db' requiere `createcachetable`).
+INVENTORY_REPORT_CACHE = os.environ.get('INVENTORY_REPORT_CACHE', 'True') == 'True'
+INVENTORY_REPORT_CACHE_BACKEND = os.environ.get('INVENTORY_REPORT_CACHE_BACKEND', 'locmem')
+INVENTORY_REPORT_CACHE_TIMEOUT = int(os.environ.get('INVENTORY_REPORT_CACHE_TIMEOUT', '3600'))
+INVENTORY_REPORT_CACHE_STALE_SECONDS = int(os.environ.get('INVENTORY_REPORT_CACHE_STALE_SECONDS', '0'))
+
+REPORT_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventory-reports',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('INVENTORY_REPORT_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'reports')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.environ.get('INVENTORY_REPORT_CACHE_LOCATION', 'inventory_report_cache'),
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': REPORT_CACHE_BACKENDS[INVENTORY_REPORT_CACHE_BACKEND],
+}
+
+# Reportes en segundo plano (ver inventory/jobs.py): el comando run_report_jobs
+# los genera en MEDIA_ROOT/reportes/, donde duran REPORT_JOBS_TTL_HOURS horas. Un
+# reporte que falla se reintenta hasta REPORT_JOBS_MAX_ATTEMPTS veces.
+REPORT_JOBS_TTL_HOURS = int(os.environ.get('REPORT_JOBS_TTL_HOURS', '24'))
+REPORT_JOBS_MAX_ATTEMPTS = int(os.environ.get('REPORT_JOBS_MAX_ATTEMPTS', '3'))
+
+# Hilos compartidos por las vistas async de reportes (…/async/, ver
+# inventory/parallel.py) para hacer sus consultas a la vez; acota también las
+# conexiones a la base de datos que abren.
+REPORT_FANOUT_THREADS = int(os.environ.get('REPORT_FANOUT_THREADS', '4'))
+
+# Reportes PDF/Excel por evento guardados en disco hasta que cambian el evento o
+# su mobiliario (ver inventory/renders.py).
+REPORT_RENDER_CACHE_DIR = os.environ.get('REPORT_RENDER_CACHE_DIR', str(BASE_DIR / 'cache' / 'renders'))
+
+# Paquetes ZIP de reportes de varios eventos (ver inventory/bundles.py): procesos
+# que generan los documentos (0 = en el proceso web) y máximo de eventos por ZIP.
+REPORT_BUNDLE_PROCESSES = int(os.environ.get('REPORT_BUNDLE_PROCESSES', '2'))
+REPORT_BUNDLE_MAX_EVENTS = int(os.environ.get('REPORT_BUNDLE_MAX_EVENTS', '1000'))
+
+# Reservas de mobiliario por fecha: horas que dura un evento / degustación y
+# márgenes de montaje (antes) y desmontaje/limpieza (después) en que el
+# mobiliario sigue fuera de bodega.
+INVENTORY_RESERVATION_HOURS = {'evento': 12, 'degustacion': 2}
+INVENTORY_TURNAROUND_BEFORE_HOURS = 12
+INVENTORY_TURNAROUND_AFTER_HOURS = 12
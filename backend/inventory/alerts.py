@@ -0,0 +1,122 @@
+"""
+Agrupación de alertas de bajo stock.
+
+Cuando un artículo cruza el umbral de bajo stock no se crea de inmediato una
+notificación con su correo: la alerta se guarda en AlertaStockPendiente (una por
+artículo) y después se emite un único resumen con todos los artículos afectados,
+agrupados por categoría. Así una reserva grande o una carga masiva produce una
+notificación y un correo en lugar de decenas.
+
+Modos (INVENTORY_LOW_STOCK_ALERT_MODE):
+
+* 'ventana': el resumen se emite al confirmarse la transacción que generó la
+  alerta, si la alerta más antigua ya tiene INVENTORY_LOW_STOCK_WINDOW_SECONDS.
+  Con 0 segundos hay un resumen por transacción; con más, las alertas que aún no
+  vencen las emite la siguiente transacción o el comando `send_stock_digest`.
+* 'programado': sólo el comando `send_stock_digest` emite resúmenes; se programa
+  cada hora o cada día (cron) para recibir un resumen periódico.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import notifications
+from .categories import get_categoria
+from .models import AlertaStockPendiente, send_notification_email
+
+logger = logging.getLogger(__name__)
+
+MODO = 'ventana'
+VENTANA_SEGUNDOS = 0
+
+
+def modo():
+    return getattr(settings, 'INVENTORY_LOW_STOCK_ALERT_MODE', MODO)
+
+
+def registrar(item, cantidad):
+    """Guarda (o actualiza) la alerta pendiente de `item` con un solo INSERT ... ON CONFLICT."""
+    ahora = timezone.now()
+    AlertaStockPendiente.objects.bulk_create(
+        [AlertaStockPendiente(
+            categoria=item._meta.model_name,
+            item_id=item.pk,
+            producto=item.producto,
+            cantidad=cantidad,
+            created_at=ahora,
+            updated_at=ahora,
+        )],
+        update_conflicts=True,
+        unique_fields=['categoria', 'item_id'],
+        update_fields=['producto', 'cantidad', 'updated_at'],
+    )
+    if modo() == 'ventana':
+        transaction.on_commit(_resumen_al_confirmar)
+
+
+def _resumen_al_confirmar():
+    # Queda programado una vez por alerta de la transacción. El primero emite el
+    # resumen y borra las pendientes; los demás no encuentran ninguna (una consulta)
+    ventana = getattr(settings, 'INVENTORY_LOW_STOCK_WINDOW_SECONDS', VENTANA_SEGUNDOS)
+    emitir_resumen(vencidas_desde=timezone.now() - timedelta(seconds=ventana))
+
+
+def mensaje_resumen(alertas):
+    """Texto del resumen; con un solo artículo se conserva el mensaje de siempre."""
+    if len(alertas) == 1:
+        alerta = alertas[0]
+        return (
+            f"¡Alerta de bajo stock! El artículo '{alerta.producto}' tiene actualmente "
+            f"{alerta.cantidad} unidades. ¡Requiere reabastecimiento urgente!"
+        )
+
+    por_categoria = {}
+    for alerta in alertas:
+        categoria = get_categoria(alerta.categoria)
+        nombre = categoria.etiqueta if categoria else alerta.categoria
+        por_categoria.setdefault(nombre, []).append(f"{alerta.producto} ({alerta.cantidad})")
+
+    detalle = '; '.join(
+        f"{nombre}: {', '.join(productos)}" for nombre, productos in sorted(por_categoria.items())
+    )
+    return (
+        f"¡Alerta de bajo stock! {len(alertas)} artículos en {len(por_categoria)} categorías "
+        f"requieren reabastecimiento urgente. {detalle}."
+    )
+
+
+@transaction.atomic
+def emitir_resumen(vencidas_desde=None):
+    """
+    Emite una notificación y un correo con las alertas pendientes y las elimina.
+
+    Args:
+        vencidas_desde (datetime): Si se indica, sólo se emite si la alerta más
+            antigua es anterior a esta fecha (y entonces se incluyen todas)
+
+    Returns:
+        Notification | None: La notificación creada, o None si no había alertas
+    """
+    alertas = list(AlertaStockPendiente.objects.select_for_update().order_by('categoria', 'producto'))
+    if not alertas:
+        return None
+    if vencidas_desde is not None and min(alerta.created_at for alerta in alertas) > vencidas_desde:
+        return None
+
+    message = mensaje_resumen(alertas)
+    # Un resumen de un solo artículo conserva su referencia; uno agotado es crítico
+    unica = alertas[0] if len(alertas) == 1 else None
+    notificacion = notifications.notificar(
+        'bajo_stock', message,
+        llave=(unica.categoria, unica.item_id) if unica else None,
+        cantidad=unica.cantidad if unica else None,
+        severidad='critico' if any(alerta.cantidad <= 0 for alerta in alertas) else None,
+    )
+    # Enviar correo a usuarios admin y Encargado
+    send_notification_email(message)
+    AlertaStockPendiente.objects.filter(id__in=[alerta.id for alerta in alertas]).delete()
+    logger.info(f"Resumen de bajo stock emitido con {len(alertas)} artículos")
+    return notificacion
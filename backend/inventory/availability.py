@@ -0,0 +1,252 @@
+"""
+Motor de disponibilidad por fechas.
+
+Reservar mobiliario para un evento ya no descuenta `cantidad`: se crea una
+Reserva con el intervalo que el mobiliario estará fuera de bodega (la duración
+del evento más los márgenes de montaje y desmontaje). Las unidades libres de un
+artículo entre T1 y T2 son su `cantidad` menos el máximo de unidades reservadas
+al mismo tiempo dentro de [T1, T2), calculado con un barrido (sweep-line) sobre
+las reservas que se traslapan con la ventana.
+
+Todas las funciones trabajan por lotes: la disponibilidad de N artículos cuesta
+dos consultas sin importar N ni el total de reservas históricas.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import catalog
+from .models import Reserva
+
+DURACION_HORAS = {'evento': 12, 'degustacion': 2}
+MARGEN_ANTES_HORAS = 12
+MARGEN_DESPUES_HORAS = 12
+
+
+def ventana(fecha, hora, tipo='evento'):
+    """
+    Intervalo [inicio, fin) que ocupa el mobiliario de un evento o degustación.
+
+    Args:
+        fecha (date): Fecha del evento o degustación
+        hora (time): Hora de inicio
+        tipo (str): 'evento' o 'degustacion'
+    """
+    duraciones = getattr(settings, 'INVENTORY_RESERVATION_HOURS', DURACION_HORAS)
+    antes = getattr(settings, 'INVENTORY_TURNAROUND_BEFORE_HOURS', MARGEN_ANTES_HORAS)
+    despues = getattr(settings, 'INVENTORY_TURNAROUND_AFTER_HOURS', MARGEN_DESPUES_HORAS)
+
+    inicio = datetime.combine(fecha, hora)
+    if timezone.is_naive(inicio):
+        inicio = timezone.make_aware(inicio)
+    fin = inicio + timedelta(hours=duraciones.get(tipo, DURACION_HORAS[tipo]))
+    return inicio - timedelta(hours=antes), fin + timedelta(hours=despues)
+
+
+def barrido(intervalos):
+    """
+    Unidades en uso a lo largo del tiempo.
+
+    Args:
+        intervalos: Tuplas (inicio, fin, cantidad)
+
+    Yields:
+        tuple: (instante, unidades en uso desde ese instante hasta el siguiente)
+    """
+    puntos = []
+    for inicio, fin, cantidad in intervalos:
+        if inicio < fin:
+            puntos.append((inicio, 1, cantidad))
+            puntos.append((fin, 0, -cantidad))
+
+    # En el mismo instante las salidas (0) se procesan antes que las entradas (1)
+    puntos.sort(key=lambda punto: (punto[0], punto[1]))
+    actual = 0
+    for indice, (instante, _, delta) in enumerate(puntos):
+        actual += delta
+        if indice + 1 == len(puntos) or puntos[indice + 1][0] != instante:
+            yield instante, actual
+
+
+def pico(intervalos, inicio, fin):
+    """
+    Máximo de unidades reservadas al mismo tiempo dentro de [inicio, fin).
+
+    Args:
+        intervalos (list): Tuplas (inicio, fin, cantidad) de las reservas
+    """
+    recortados = ((max(r_inicio, inicio), min(r_fin, fin), cantidad) for r_inicio, r_fin, cantidad in intervalos)
+    return max((unidades for _, unidades in barrido(recortados)), default=0)
+
+
+def reservado_por_llave(inicio, fin, llaves=None, categoria=None, excluir_evento=None, excluir_degustacion=None):
+    """
+    Pico de unidades reservadas por artículo entre `inicio` y `fin`, en una consulta.
+
+    Returns:
+        dict: {(categoria, item_id): unidades}; los artículos sin reservas no aparecen
+    """
+    reservas = Reserva.objects.filter(inicio__lt=fin, fin__gt=inicio)
+    if llaves is not None:
+        reservas = reservas.filter(catalog.filtro_llaves(llaves))
+    elif categoria is not None:
+        reservas = reservas.filter(categoria=categoria.slug)
+    if excluir_evento is not None:
+        reservas = reservas.exclude(evento=excluir_evento)
+    if excluir_degustacion is not None:
+        reservas = reservas.exclude(degustacion=excluir_degustacion)
+
+    intervalos = defaultdict(list)
+    for r_categoria, item_id, r_inicio, r_fin, cantidad in reservas.values_list(
+        'categoria', 'item_id', 'inicio', 'fin', 'cantidad'
+    ).order_by():
+        intervalos[(r_categoria, item_id)].append((r_inicio, r_fin, cantidad))
+    return {llave: pico(lista, inicio, fin) for llave, lista in intervalos.items()}
+
+
+def comprometido(llave, desde=None):
+    """
+    Máximo de unidades de un artículo reservadas al mismo tiempo de `desde`
+    (por defecto, ahora) en adelante: lo mínimo que puede quedar en `cantidad`.
+    """
+    desde = desde or timezone.now()
+    fin = Reserva.objects.filter(catalog.filtro_llaves([llave]), fin__gt=desde).aggregate(fin=Max('fin'))['fin']
+    if fin is None:
+        return 0
+    return reservado_por_llave(desde, fin, llaves=[llave]).get(llave, 0)
+
+
+def disponibilidad(inicio, fin, llaves=None, categoria=None, excluir_evento=None, excluir_degustacion=None):
+    """
+    Unidades libres de varios artículos entre `inicio` y `fin`.
+
+    Args:
+        llaves (list): Pares (categoria, item_id). Si es None, todos los artículos
+        categoria (Categoria): Limitar a una categoría cuando `llaves` es None
+        excluir_evento / excluir_degustacion: Ignorar sus reservas (al editarlos)
+
+    Returns:
+        dict: {(categoria, item_id): {'producto', 'total', 'reservado', 'disponible'}}
+    """
+    campos = ('categoria', 'item_id', 'producto', 'cantidad')
+    if llaves is not None:
+        filas = catalog.por_llaves(llaves, campos=campos)
+    else:
+        filas = catalog.consultar(campos=campos, categorias=[categoria] if categoria else None)
+
+    resultado = {
+        (fila['categoria'], fila['item_id']): {
+            'producto': fila['producto'],
+            'total': fila['cantidad'],
+            'reservado': 0,
+        }
+        for fila in filas
+    }
+    if not resultado:
+        return resultado
+
+    reservado = reservado_por_llave(
+        inicio, fin, llaves=resultado.keys() if llaves is not None else None, categoria=categoria,
+        excluir_evento=excluir_evento, excluir_degustacion=excluir_degustacion,
+    )
+    for llave, datos in resultado.items():
+        datos['reservado'] = reservado.get(llave, 0)
+        datos['disponible'] = max(datos['total'] - datos['reservado'], 0)
+    return resultado
+
+
+def lineas_de_mobiliario(mobiliario_data):
+    """
+    Convierte el mobiliario recibido del frontend ({content_type_id, object_id,
+    cantidad}) en líneas {categoria, item_id, cantidad}.
+    """
+    lineas = []
+    for item in mobiliario_data:
+        content_type = ContentType.objects.get_for_id(item['content_type_id'])
+        lineas.append({
+            'categoria': content_type.model,
+            'item_id': int(item['object_id']),
+            'cantidad': int(item['cantidad']),
+        })
+    return lineas
+
+
+def solicitado_por_llave(lineas):
+    """Suma las cantidades de las líneas por (categoria, item_id)."""
+    solicitado = defaultdict(int)
+    for linea in lineas:
+        solicitado[(linea['categoria'], linea['item_id'])] += linea['cantidad']
+    return solicitado
+
+
+def validar(lineas, inicio, fin, excluir_evento=None, excluir_degustacion=None, articulos=None):
+    """
+    Verifica que haya unidades libres para todas las líneas en la ventana.
+
+    Args:
+        articulos (dict): {(categoria, item_id): item} ya leídos (y bloqueados)
+            por quien llama. Si es None se leen del catálogo.
+
+    Returns:
+        str | None: Mensaje de error para el primer artículo sin disponibilidad
+    """
+    solicitado = solicitado_por_llave(lineas)
+
+    if articulos is None:
+        disponible = disponibilidad(
+            inicio, fin, llaves=solicitado.keys(),
+            excluir_evento=excluir_evento, excluir_degustacion=excluir_degustacion,
+        )
+    else:
+        reservado = reservado_por_llave(
+            inicio, fin, llaves=articulos.keys(),
+            excluir_evento=excluir_evento, excluir_degustacion=excluir_degustacion,
+        )
+        disponible = {
+            llave: {
+                'producto': item.producto,
+                'disponible': max(item.cantidad - reservado.get(llave, 0), 0),
+            }
+            for llave, item in articulos.items()
+        }
+
+    for llave, cantidad in solicitado.items():
+        if llave not in disponible:
+            return f"El item de mobiliario con id {llave[1]} no existe."
+        if disponible[llave]['disponible'] < cantidad:
+            datos = disponible[llave]
+            return f"No hay suficiente stock para {datos['producto']}. Disponible: {datos['disponible']}"
+    return None
+
+
+def reservar(lineas, inicio, fin, evento=None, degustacion=None):
+    """Crea las reservas de las líneas con un solo INSERT."""
+    return Reserva.objects.bulk_create([
+        Reserva(
+            categoria=linea['categoria'],
+            item_id=linea['item_id'],
+            cantidad=linea['cantidad'],
+            inicio=inicio,
+            fin=fin,
+            evento=evento,
+            degustacion=degustacion,
+        )
+        for linea in lineas
+    ])
+
+
+def liberar(reservas, cancelado=False):
+    """
+    Libera reservas. Las canceladas se eliminan; las de un evento finalizado se
+    recortan al momento actual y se conservan como historial de uso.
+    """
+    if cancelado:
+        reservas.delete()
+        return
+    ahora = timezone.now()
+    reservas.filter(inicio__gte=ahora).update(fin=F('inicio'))
+    reservas.filter(inicio__lt=ahora, fin__gt=ahora).update(fin=ahora)
@@ -0,0 +1,115 @@
+"""
+Utilidades para los comandos de benchmark (``manage.py benchmark_*``).
+
+Los benchmarks corren sobre una base de datos de prueba desechable, nunca sobre
+la base de datos configurada, y llaman a las vistas directamente con
+APIRequestFactory para medir sólo el costo del servidor.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from . import catalog
+from .categories import CATEGORIAS
+from .models import Bodega
+
+
+@contextmanager
+def base_de_prueba(keepdb=False, en_archivo=False):
+    """
+    Crea una base de datos de prueba y la destruye al terminar.
+
+    Con `en_archivo`, en SQLite la base de prueba se crea en un archivo temporal
+    en lugar de en memoria para que varios hilos puedan compartirla.
+    """
+    nombre_original = connection.settings_dict['NAME']
+    if en_archivo and connection.vendor == 'sqlite':
+        connection.settings_dict['TEST'] = {
+            **connection.settings_dict.get('TEST', {}),
+            'NAME': os.path.join(tempfile.gettempdir(), 'banquetes_prueba.sqlite3'),
+        }
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0, keepdb=keepdb)
+
+
+def usuario_de_prueba():
+    user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True})
+    return user
+
+
+def llamar_vista(vista, usuario, path='/', params=None, **kwargs):
+    """Ejecuta una vista de DRF con GET y devuelve la respuesta ya renderizada."""
+    request = APIRequestFactory().get(path, params or {})
+    force_authenticate(request, user=usuario)
+    response = vista(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def medir(funcion, repeticiones=5):
+    """
+    Ejecuta `funcion` varias veces y devuelve estadísticas de tiempo y consultas.
+
+    Returns:
+        dict: mediana y máximo en milisegundos, y número de consultas SQL de la última ejecución
+    """
+    tiempos = []
+    consultas = 0
+    for _ in range(repeticiones):
+        with CaptureQueriesContext(connection) as contexto:
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = len(contexto.captured_queries)
+    return {
+        'mediana_ms': round(statistics.median(tiempos), 2),
+        'max_ms': round(max(tiempos), 2),
+        'consultas': consultas,
+    }
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) por el método del rango más cercano."""
+    if not valores:
+        return 0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def poblar_inventario(por_categoria, num_bodegas):
+    """Bodegas y `por_categoria` artículos aleatorios (semilla fija) en cada categoría, con el catálogo al día."""
+    rng = random.Random(42)
+    bodegas = Bodega.objects.bulk_create(
+        Bodega(nombre=f'Bodega {i}', ubicacion=f'Ubicación {i}') for i in range(num_bodegas)
+    )
+    ahora = timezone.now()
+    for categoria in CATEGORIAS:
+        categoria.modelo.objects.bulk_create(
+            (
+                categoria.modelo(
+                    producto=f'{categoria.slug} {i}',
+                    cantidad=rng.randint(0, 200),
+                    cantidad_en_mantenimiento=rng.choice([0, 0, 0, rng.randint(1, 20)]),
+                    bodega=rng.choice(bodegas),
+                    created_at=ahora,
+                    updated_at=ahora,
+                )
+                for i in range(por_categoria)
+            ),
+            batch_size=1000,
+        )
+    catalog.reconstruir()
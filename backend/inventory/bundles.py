@@ -0,0 +1,161 @@
+"""
+Paquetes ZIP con los reportes de varios eventos (papeleo de cierre de mes).
+
+`zip_eventos` es un generador: un grupo de procesos genera los PDF por bloques
+de TAMANO_BLOQUE eventos y el libro Excel de todos, y cada documento se agrega
+al ZIP y se entrega al cliente en cuanto está listo. En memoria sólo están los
+documentos en curso (a lo sumo una ventana de bloques), nunca el ZIP completo:
+el archivo se escribe sobre un flujo no posicionable y zipfile usa descriptores
+de datos en lugar de volver atrás a corregir los encabezados.
+
+El grupo de procesos es del proceso web y se crea al primer uso, con el método
+'spawn' para que los hijos no hereden las conexiones abiertas ni los hilos del
+servidor. Con REPORT_BUNDLE_PROCESSES = 0 todo se genera en el mismo proceso.
+"""
+import io
+import itertools
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+import unidecode
+from django.conf import settings
+
+from . import documents
+from .models import Evento
+
+PROCESOS = 2
+MAX_EVENTOS = 1000
+TAMANO_BLOQUE = 10
+FORMATOS = ('pdf', 'excel')
+
+_grupo = None
+_candado = threading.Lock()
+
+
+def procesos():
+    return getattr(settings, 'REPORT_BUNDLE_PROCESSES', PROCESOS)
+
+
+def max_eventos():
+    return getattr(settings, 'REPORT_BUNDLE_MAX_EVENTS', MAX_EVENTOS)
+
+
+def grupo():
+    """Grupo de procesos compartido por las peticiones de este proceso."""
+    global _grupo
+    with _candado:
+        if _grupo is None:
+            _grupo = ProcessPoolExecutor(
+                max_workers=procesos(),
+                mp_context=multiprocessing.get_context('spawn'),
+                # Los hijos importan este módulo (y los modelos) después de configurar Django
+                initializer=django.setup,
+            )
+        return _grupo
+
+
+def eventos(evento_ids):
+    return Evento.objects.filter(pk__in=evento_ids).select_related('tipo_evento').order_by('fecha_inicio', 'id')
+
+
+def _nombre_pdf(evento):
+    nombre = unidecode.unidecode(evento.nombre).replace(" ", "_").replace("/", "-")
+    return f"pdf/{evento.fecha_inicio:%Y-%m-%d}_{evento.pk}_{nombre}.pdf"
+
+
+def pdfs(evento_ids):
+    """PDF de cada evento del bloque: lista de (nombre en el ZIP, contenido)."""
+    lineas = documents.lineas_de_eventos(evento_ids)
+    resultado = []
+    for evento in eventos(evento_ids):
+        contenido = io.BytesIO()
+        documents.pdf_uso_evento(evento, contenido, lineas[evento.pk])
+        resultado.append((_nombre_pdf(evento), contenido.getvalue()))
+    return resultado
+
+
+def excel(evento_ids):
+    """Libro de todos los eventos (ver documents.excel_eventos)."""
+    contenido = io.BytesIO()
+    documents.excel_eventos(eventos(evento_ids), contenido, documents.lineas_de_eventos(evento_ids))
+    return [('reporte_eventos.xlsx', contenido.getvalue())]
+
+
+def tareas(evento_ids, formatos=FORMATOS):
+    """Lista de (función, argumentos) a repartir entre los procesos."""
+    lista = []
+    if 'excel' in formatos:
+        # Primero el libro, que es la tarea más larga, para que corra junto a los PDF
+        lista.append((excel, (evento_ids,)))
+    if 'pdf' in formatos:
+        for inicio in range(0, len(evento_ids), TAMANO_BLOQUE):
+            lista.append((pdfs, (evento_ids[inicio:inicio + TAMANO_BLOQUE],)))
+    return lista
+
+
+def en_paralelo(pendientes_por_enviar):
+    """
+    Ejecuta las tareas en el grupo de procesos y entrega sus resultados según terminan.
+
+    A lo sumo hay 2 tareas por proceso enviadas a la vez, así los resultados que
+    el cliente aún no descarga no se acumulan en memoria.
+    """
+    if procesos() <= 0:
+        for funcion, argumentos in pendientes_por_enviar:
+            yield funcion(*argumentos)
+        return
+
+    ejecutor = grupo()
+    por_enviar = iter(pendientes_por_enviar)
+    en_curso = {
+        ejecutor.submit(funcion, *argumentos)
+        for funcion, argumentos in itertools.islice(por_enviar, 2 * procesos())
+    }
+    try:
+        while en_curso:
+            listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                siguiente = next(por_enviar, None)
+                if siguiente is not None:
+                    en_curso.add(ejecutor.submit(siguiente[0], *siguiente[1]))
+                yield futuro.result()
+    finally:
+        # El cliente se desconectó o una tarea falló: no seguir generando
+        for futuro in en_curso:
+            futuro.cancel()
+
+
+class _Salida(io.RawIOBase):
+    """Flujo de sólo escritura y no posicionable que acumula lo escrito hasta `vaciar`."""
+
+    def __init__(self):
+        self.partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self):
+        datos = b''.join(self.partes)
+        self.partes.clear()
+        return datos
+
+
+def zip_eventos(evento_ids, formatos=FORMATOS):
+    """Generador con el contenido del ZIP, un fragmento por documento terminado."""
+    salida = _Salida()
+    with zipfile.ZipFile(salida, 'w') as archivo:
+        for documentos in en_paralelo(tareas(list(evento_ids), formatos)):
+            for nombre, contenido in documentos:
+                # El .xlsx ya es un ZIP comprimido; los PDF sí se comprimen
+                compresion = zipfile.ZIP_STORED if nombre.endswith('.xlsx') else zipfile.ZIP_DEFLATED
+                archivo.writestr(nombre, contenido, compress_type=compresion)
+                yield salida.vaciar()
+    # Directorio central
+    yield salida.vaciar()
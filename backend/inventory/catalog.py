@@ -0,0 +1,230 @@
+"""
+Consultas entre categorías de inventario.
+
+Hay dos modos de almacenamiento para las consultas que cruzan categorías:
+
+* Catálogo unificado (INVENTORY_UNIFIED_CATALOG = True): se consulta la tabla
+  indexada ``inventory_item`` (modelo CatalogoItem).
+* Tablas por categoría: se arma un único ``UNION ALL`` sobre las 11 tablas.
+
+En ambos casos cada pregunta cuesta una sola consulta y las filas tienen las
+mismas llaves, así que los reportes no necesitan saber qué modo está activo.
+"""
+from django.conf import settings
+from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+from . import report_cache, thresholds
+from .categories import CATEGORIAS, get_categoria
+from .models import CatalogoItem
+
+CAMPOS = (
+    'categoria', 'item_id', 'producto', 'descripcion', 'cantidad',
+    'cantidad_en_mantenimiento', 'bodega_id', 'bodega__nombre', 'updated_at',
+)
+
+
+def catalogo_unificado():
+    return getattr(settings, 'INVENTORY_UNIFIED_CATALOG', False)
+
+
+def _por_categoria(categoria, filtro):
+    return categoria.modelo.objects.filter(filtro).annotate(
+        categoria=Value(categoria.slug, output_field=models.CharField()),
+        item_id=F('id'),
+    )
+
+
+def _de_categorias(queryset, categorias):
+    """Filtra un queryset de CatalogoItem a `categorias` (sin filtro si son todas)."""
+    if len(categorias) != len(CATEGORIAS):
+        queryset = queryset.filter(categoria__in=[c.slug for c in categorias])
+    return queryset
+
+
+def consultar(filtro=None, campos=CAMPOS, categorias=None, orden=None):
+    """
+    Devuelve un queryset de valores con los artículos de todas las categorías.
+
+    Args:
+        filtro (Q): Condición sobre los campos comunes de InventarioItem
+        campos (tuple): Campos a devolver (subconjunto de CAMPOS)
+        categorias (list): Limitar a estas categorías (por defecto, todas)
+        orden (tuple): Campos de ordenamiento (deben estar en `campos`)
+    """
+    filtro = filtro or Q()
+    categorias = categorias or CATEGORIAS
+
+    if catalogo_unificado():
+        queryset = _de_categorias(CatalogoItem.objects.filter(filtro), categorias).values(*campos)
+    else:
+        queryset = _unir([_por_categoria(categoria, filtro).values(*campos) for categoria in categorias])
+
+    if orden:
+        queryset = queryset.order_by(*orden)
+    return queryset
+
+
+def agrupar_llaves(llaves):
+    """Agrupa pares (categoria, item_id) en {categoria: {ids}}."""
+    agrupadas = {}
+    for categoria, item_id in llaves:
+        agrupadas.setdefault(categoria, set()).add(int(item_id))
+    return agrupadas
+
+
+def filtro_llaves(llaves, campo_categoria='categoria', campo_id='item_id'):
+    """Q que selecciona las filas cuyas (categoria, item_id) estén en `llaves`."""
+    filtro = Q(pk__in=[])
+    for categoria, ids in agrupar_llaves(llaves).items():
+        filtro |= Q(**{campo_categoria: categoria, f'{campo_id}__in': sorted(ids)})
+    return filtro
+
+
+def por_llaves(llaves, campos=CAMPOS):
+    """
+    Devuelve, en una sola consulta, los artículos indicados por pares
+    (categoria, item_id) de cualquier categoría.
+    """
+    agrupadas = agrupar_llaves(llaves)
+    if not agrupadas:
+        return CatalogoItem.objects.none().values(*campos)
+
+    if catalogo_unificado():
+        return CatalogoItem.objects.filter(filtro_llaves(llaves)).values(*campos)
+
+    partes = [
+        _por_categoria(get_categoria(slug), Q(id__in=sorted(ids))).values(*campos)
+        for slug, ids in agrupadas.items() if get_categoria(slug)
+    ]
+    if not partes:
+        return CatalogoItem.objects.none().values(*campos)
+    return _unir(partes)
+
+
+def _unir(partes):
+    return partes[0].union(*partes[1:], all=True) if len(partes) > 1 else partes[0]
+
+
+def bajo_stock(campos=CAMPOS, categorias=None):
+    """
+    Artículos por debajo de su stock mínimo, con su `umbral` efectivo.
+
+    Con el catálogo unificado se lee el conjunto mantenido por la columna
+    generada `bajo_stock` (índice parcial); con las tablas por categoría se
+    compara cada cantidad con su umbral en el mismo UNION ALL.
+
+    Args:
+        categorias (list): Limitar a estas categorías (por defecto, todas)
+    """
+    categorias = categorias or CATEGORIAS
+
+    if catalogo_unificado():
+        return _de_categorias(CatalogoItem.objects.filter(bajo_stock=True), categorias).values(*campos, 'umbral')
+
+    umbrales = thresholds.de_categorias()
+    return _unir([
+        _por_categoria(categoria, Q())
+        .annotate(umbral=Coalesce(F('stock_minimo'), Value(umbrales[categoria.slug])))
+        .filter(cantidad__lt=F('umbral'))
+        .values(*campos, 'umbral')
+        for categoria in categorias
+    ])
+
+
+def totales(agrupar_por, filtro=None, categorias=None, **sumas):
+    """
+    Suma columnas agrupando por `agrupar_por` (ej. ('bodega_id', 'categoria')).
+
+    Ejemplo: totales(('bodega_id',), cantidad=Sum('cantidad'))
+    """
+    filtro = filtro or Q()
+    categorias = categorias or CATEGORIAS
+
+    if catalogo_unificado():
+        queryset = _de_categorias(CatalogoItem.objects.filter(filtro), categorias)
+        return queryset.values(*agrupar_por).annotate(**sumas).order_by()
+
+    return _unir([
+        _por_categoria(categoria, filtro).values(*agrupar_por).annotate(**sumas).order_by()
+        for categoria in categorias
+    ])
+
+
+CAMPOS_SINCRONIZADOS = (
+    'producto', 'descripcion', 'cantidad', 'cantidad_en_mantenimiento', 'bodega', 'stock_minimo',
+    'created_at', 'updated_at',
+)
+
+
+def sincronizar(item, campos=None):
+    """
+    Copia un artículo de categoría a la tabla unificada.
+
+    Args:
+        campos: `update_fields` del guardado. Si se indican, sólo se copian esas
+            columnas con un UPDATE directo.
+    """
+    categoria = item._meta.model_name
+    if campos is not None:
+        valores = {
+            campo: getattr(item, item._meta.get_field(campo).attname)
+            for campo in CAMPOS_SINCRONIZADOS if campo in campos
+        }
+        if not valores:
+            return
+        if 'stock_minimo' in valores:
+            valores['umbral'] = thresholds.de_item(item)
+        if CatalogoItem.objects.filter(categoria=categoria, item_id=item.pk).update(**valores):
+            return
+
+    CatalogoItem.objects.update_or_create(
+        categoria=categoria,
+        item_id=item.pk,
+        defaults={
+            'producto': item.producto,
+            'descripcion': item.descripcion,
+            'cantidad': item.cantidad,
+            'cantidad_en_mantenimiento': item.cantidad_en_mantenimiento,
+            'bodega_id': item.bodega_id,
+            'stock_minimo': item.stock_minimo,
+            'umbral': thresholds.de_item(item),
+            'created_at': item.created_at,
+            'updated_at': item.updated_at,
+        },
+    )
+
+
+def eliminar(item):
+    CatalogoItem.objects.filter(categoria=item._meta.model_name, item_id=item.pk).delete()
+
+
+def reconstruir():
+    """
+    Vuelve a poblar la tabla unificada a partir de las 11 tablas de categorías.
+
+    Returns:
+        int: Número de artículos copiados
+    """
+    filas = []
+    umbrales = thresholds.de_categorias()
+    for categoria in CATEGORIAS:
+        for item in categoria.modelo.objects.all().iterator(chunk_size=2000):
+            filas.append(CatalogoItem(
+                categoria=categoria.slug,
+                item_id=item.pk,
+                producto=item.producto,
+                descripcion=item.descripcion,
+                cantidad=item.cantidad,
+                cantidad_en_mantenimiento=item.cantidad_en_mantenimiento,
+                bodega_id=item.bodega_id,
+                stock_minimo=item.stock_minimo,
+                umbral=umbrales[categoria.slug] if item.stock_minimo is None else item.stock_minimo,
+                created_at=item.created_at,
+                updated_at=item.updated_at,
+            ))
+    CatalogoItem.objects.all().delete()
+    CatalogoItem.objects.bulk_create(filas, batch_size=1000)
+    report_cache.invalidar(CatalogoItem)
+    return len(filas)
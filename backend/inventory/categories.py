@@ -0,0 +1,81 @@
+"""
+Registro de categorías de inventario.
+
+Cada categoría de mobiliario (Mantelería, Sillas, Mesas, ...) vive en su propia
+tabla. Este registro es la única lista de categorías del proyecto: los viewsets,
+las rutas de la API y los reportes se construyen a partir de él, en lugar de
+copiar a mano la lista de modelos en cada vista.
+"""
+from .models import (
+    Manteleria, Cubierto, Loza, Cristaleria, Silla, Mesa, SalaLounge,
+    Periquera, Carpa, PistaTarima, Extra
+)
+from .serializers import (
+    ManteleriaSerializer, CubiertoSerializer, LozaSerializer, CristaleriaSerializer,
+    SillaSerializer, MesaSerializer, SalaLoungeSerializer, PeriqueraSerializer,
+    CarpaSerializer, PistaTarimaSerializer, ExtraSerializer
+)
+
+
+class Categoria:
+    """
+    Describe una categoría de inventario.
+
+    Args:
+        modelo: Modelo concreto de la categoría (subclase de InventarioItem)
+        serializer: Serializer usado por el endpoint /api/inventory/<ruta>/
+        ruta (str): Prefijo de la ruta en el router de la API
+        basename (str): Nombre base de las rutas del router
+        nombre (str): Nombre corto usado en el reporte de bodegas
+    """
+
+    def __init__(self, modelo, serializer, ruta, basename, nombre):
+        self.modelo = modelo
+        self.serializer = serializer
+        self.ruta = ruta
+        self.basename = basename
+        self.nombre = nombre
+
+    @property
+    def slug(self):
+        # Coincide con ContentType.model y con el campo 'tipo' de los reportes
+        return self.modelo._meta.model_name
+
+    @property
+    def etiqueta(self):
+        return str(self.modelo._meta.verbose_name_plural).title()
+
+    def __repr__(self):
+        return f"<Categoria {self.slug}>"
+
+
+CATEGORIAS = [
+    Categoria(Manteleria, ManteleriaSerializer, 'mantelerias', 'manteleria', 'Manteleria'),
+    Categoria(Cubierto, CubiertoSerializer, 'cubiertos', 'cubierto', 'Cubierto'),
+    Categoria(Loza, LozaSerializer, 'lozas', 'loza', 'Loza'),
+    Categoria(Cristaleria, CristaleriaSerializer, 'cristalerias', 'cristaleria', 'Cristaleria'),
+    Categoria(Silla, SillaSerializer, 'sillas', 'silla', 'Sillas'),
+    Categoria(Mesa, MesaSerializer, 'mesas', 'mesa', 'Mesas'),
+    Categoria(SalaLounge, SalaLoungeSerializer, 'salas-lounge', 'sala-lounge', 'Salas lounge'),
+    Categoria(Periquera, PeriqueraSerializer, 'periqueras', 'periquera', 'Periqueras'),
+    Categoria(Carpa, CarpaSerializer, 'carpas', 'carpa', 'Carpas'),
+    Categoria(PistaTarima, PistaTarimaSerializer, 'pistas-tarimas', 'pista-tarima', 'Pistas y tarimas'),
+    Categoria(Extra, ExtraSerializer, 'extras', 'extra', 'Extras'),
+]
+
+_POR_SLUG = {categoria.slug: categoria for categoria in CATEGORIAS}
+_POR_MODELO = {categoria.modelo: categoria for categoria in CATEGORIAS}
+
+
+def get_categoria(slug):
+    """Devuelve la categoría registrada con ese slug (ej. 'silla') o None."""
+    return _POR_SLUG.get(slug)
+
+
+def categoria_de_modelo(modelo):
+    """Devuelve la categoría de un modelo de inventario o None si no está registrado."""
+    return _POR_MODELO.get(modelo)
+
+
+def slugs():
+    return list(_POR_SLUG)
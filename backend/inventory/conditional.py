@@ -0,0 +1,24 @@
+"""
+GET condicional (ETag / Last-Modified) para respuestas calculadas.
+
+La vista calcula primero sus validadores con una consulta barata; si el
+cliente ya tiene esa versión, `no_modificado` devuelve el 304 y la respuesta
+completa no se genera.
+"""
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def no_modificado(request, etag, last_modified=None):
+    """Respuesta 304 si el cliente tiene la versión actual, si no None."""
+    timestamp = last_modified.timestamp() if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def marcar(response, etag, last_modified=None):
+    """Agrega los validadores a `response`; el cliente guarda la respuesta pero revalida cada vez."""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
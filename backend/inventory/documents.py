@@ -0,0 +1,208 @@
+"""
+Documentos PDF (ReportLab) y Excel (openpyxl) de los reportes.
+
+Cada función escribe el documento en `destino`, cualquier objeto con `write`
+(un HttpResponse, un archivo o un BytesIO), así lo usan igual las vistas, el
+worker de reportes en segundo plano (ver jobs.py) y los paquetes ZIP (ver
+bundles.py).
+
+Los artículos de cada evento se leen con dos consultas (las líneas y sus
+artículos en el catálogo) en lugar de una por línea, y los estilos de ReportLab
+se construyen una vez por proceso.
+"""
+import functools
+
+import openpyxl
+import unidecode
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from . import catalog
+from .models import EventoMobiliario
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+EXTENSIONES = {'pdf': 'pdf', 'excel': 'xlsx'}
+
+ESTILO_TABLA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+ENCABEZADOS_MOBILIARIO = ['Producto', 'Descripción', 'Cantidad']
+
+
+@functools.cache
+def estilos():
+    """Hoja de estilos de ReportLab, compartida por todos los documentos del proceso."""
+    return getSampleStyleSheet()
+
+
+def nombre_uso_evento(evento, formato):
+    """Nombre de archivo sin acentos ni caracteres problemáticos (ej: Evento Día Ñ -> Evento_Dia_N)."""
+    clean_name = unidecode.unidecode(evento.nombre).replace(" ", "_").replace("/", "-")
+    return f"reporte_evento_{clean_name}.{EXTENSIONES[formato]}"
+
+
+def lineas_de_eventos(evento_ids):
+    """
+    Mobiliario asignado a cada evento, con dos consultas sin importar cuántos sean.
+
+    El producto sale de la copia guardada en la línea; la descripción, del catálogo.
+
+    Returns:
+        dict: evento_id -> lista de (producto, descripcion, cantidad)
+    """
+    lineas = list(
+        EventoMobiliario.objects.filter(evento_id__in=evento_ids)
+        .values('evento_id', 'categoria', 'item_id', 'producto', 'cantidad')
+        .order_by('evento_id', 'id')
+    )
+    descripciones = {
+        (articulo['categoria'], articulo['item_id']): articulo['descripcion']
+        for articulo in catalog.por_llaves(
+            {(linea['categoria'], linea['item_id']) for linea in lineas},
+            campos=('categoria', 'item_id', 'descripcion'),
+        )
+    }
+    por_evento = {evento_id: [] for evento_id in evento_ids}
+    for linea in lineas:
+        por_evento[linea['evento_id']].append((
+            linea['producto'],
+            descripciones.get((linea['categoria'], linea['item_id']), ''),
+            linea['cantidad'],
+        ))
+    return por_evento
+
+
+def _detalles_evento(evento):
+    return [
+        ("Nombre del Evento:", evento.nombre),
+        ("Tipo de Evento:", evento.tipo_evento.nombre if evento.tipo_evento else 'N/A'),
+        ("Responsable:", evento.responsable),
+        ("Lugar:", evento.lugar),
+        ("Fecha:", evento.fecha_inicio.strftime('%d/%m/%Y')),
+    ]
+
+
+def pdf_uso_evento(evento, destino, lineas=None):
+    """
+    Reporte de uso de inventario de un evento en PDF.
+
+    Args:
+        lineas: Mobiliario del evento ya leído con `lineas_de_eventos`
+    """
+    if lineas is None:
+        lineas = lineas_de_eventos([evento.pk])[evento.pk]
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    styles = estilos()
+    story = []
+
+    # Título y detalles
+    story.append(Paragraph("Reporte de Uso de Inventario", styles['Title']))
+    story.append(Spacer(1, 12))
+    for etiqueta, valor in _detalles_evento(evento):
+        story.append(Paragraph(f"<b>{etiqueta}</b> {valor}", styles['Normal']))
+    story.append(Spacer(1, 24))
+
+    story.append(Paragraph("Inventario Utilizado", styles['h2']))
+
+    table = Table([ENCABEZADOS_MOBILIARIO, *(list(linea) for linea in lineas)])
+    table.setStyle(ESTILO_TABLA)
+    story.append(table)
+
+    doc.build(story)
+
+
+def excel_uso_evento(evento, destino, lineas=None):
+    """Reporte de uso de inventario de un evento en Excel."""
+    if lineas is None:
+        lineas = lineas_de_eventos([evento.pk])[evento.pk]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Reporte de Inventario"
+
+    # --- Header ---
+    ws.merge_cells('A1:C1')
+    title_cell = ws['A1']
+    title_cell.value = "Reporte de Uso de Inventario"
+    title_cell.font = Font(bold=True, size=16)
+    title_cell.alignment = Alignment(horizontal='center')
+
+    # --- Event Details ---
+    row = 3
+    for label, value in _detalles_evento(evento):
+        ws[f'A{row}'] = label
+        ws[f'A{row}'].font = Font(bold=True)
+        ws[f'B{row}'] = value
+        row += 1
+
+    # --- Inventory Table ---
+    table_header_row = row + 1
+    for col_num, header_title in enumerate(ENCABEZADOS_MOBILIARIO, 1):
+        cell = ws.cell(row=table_header_row, column=col_num)
+        cell.value = header_title
+        cell.font = Font(bold=True)
+
+    for producto, descripcion, cantidad in lineas:
+        table_header_row += 1
+        ws.cell(row=table_header_row, column=1).value = producto
+        ws.cell(row=table_header_row, column=2).value = descripcion
+        ws.cell(row=table_header_row, column=3).value = cantidad
+
+    wb.save(destino)
+
+
+def excel_eventos(eventos, destino, lineas):
+    """
+    Libro con una hoja "Resumen" (un evento por fila) y una hoja "Detalle" (una
+    fila por artículo de cada evento).
+
+    Usa el modo write-only de openpyxl: las filas se escriben al vuelo y la
+    memoria no crece con el número de eventos. Cada hoja write-only mantiene un
+    archivo temporal abierto, por eso no se crea una hoja por evento.
+
+    Args:
+        eventos: Eventos en el orden del reporte
+        lineas (dict): evento_id -> mobiliario, de `lineas_de_eventos`
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    negrita = Font(bold=True)
+
+    def encabezado(ws, titulos):
+        fila = []
+        for titulo in titulos:
+            celda = WriteOnlyCell(ws, value=titulo)
+            celda.font = negrita
+            fila.append(celda)
+        ws.append(fila)
+
+    resumen = wb.create_sheet("Resumen")
+    detalle = wb.create_sheet("Detalle")
+    encabezado(resumen, ["ID", "Evento", "Fecha", "Tipo de Evento", "Responsable", "Lugar", "Personas", "Artículos"])
+    encabezado(detalle, ["ID", "Evento", "Fecha", *ENCABEZADOS_MOBILIARIO])
+    for evento in eventos:
+        mobiliario = lineas.get(evento.pk, [])
+        resumen.append([
+            evento.pk, evento.nombre, evento.fecha_inicio,
+            evento.tipo_evento.nombre if evento.tipo_evento else 'N/A',
+            evento.responsable, evento.lugar, evento.cantidad_personas,
+            sum(cantidad for _, _, cantidad in mobiliario),
+        ])
+        for producto, descripcion, cantidad in mobiliario:
+            detalle.append([evento.pk, evento.nombre, evento.fecha_inicio, producto, descripcion, cantidad])
+
+    wb.save(destino)
+
+
+GENERADORES_USO_EVENTO = {'pdf': pdf_uso_evento, 'excel': excel_uso_evento}
@@ -0,0 +1,200 @@
+"""
+Exportación tabular (`?export=csv|xlsx|jsonl`) de los listados y reportes.
+
+Cada formato es un exportador registrado con `registrar`: recibe un iterable de
+filas (dicts) y devuelve un generador de bytes para un StreamingHttpResponse.
+
+* Viewsets (ExportarListaMixin): las filas salen de
+  ``queryset.iterator(chunk_size=...)`` y se serializan por bloques con el
+  serializer del viewset, así la memoria no depende del número de filas. Se
+  respetan los filtros del listado y se ignora la paginación.
+* Reportes (ExportarReporteMixin): se exporta la respuesta ya calculada (ver
+  report_cache.py); `filas_exportacion` indica qué lista del reporte son las
+  filas.
+
+XLSX usa el modo write-only de openpyxl: las filas se escriben a un archivo
+temporal y el libro terminado se envía en bloques, sin cargarlo en memoria. CSV
+se escribe con BOM para que Excel reconozca los acentos.
+"""
+import csv
+import itertools
+import json
+import os
+import tempfile
+
+import openpyxl
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+TAMANO_BLOQUE = 2000
+TAMANO_LECTURA = 64 * 1024
+PARAMETRO = 'export'
+
+
+class Exportador:
+    """
+    Formato de exportación.
+
+    Args:
+        generar: función(filas, columnas) -> generador de bytes
+        content_type (str): Tipo MIME de la respuesta
+        extension (str): Extensión del archivo descargado
+    """
+
+    def __init__(self, generar, content_type, extension):
+        self.generar = generar
+        self.content_type = content_type
+        self.extension = extension
+
+
+EXPORTADORES = {}
+
+
+def registrar(formato, content_type, extension):
+    """Decorador que registra una función generadora como exportador de `formato`."""
+    def decorador(generar):
+        EXPORTADORES[formato] = Exportador(generar, content_type, extension)
+        return generar
+    return decorador
+
+
+def _celda(valor):
+    """Valor plano para CSV/XLSX: las listas y dicts anidados van como JSON."""
+    if valor is None:
+        return ''
+    if isinstance(valor, (dict, list, tuple)):
+        return json.dumps(valor, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return valor
+
+
+def _con_columnas(filas, columnas):
+    """(columnas, filas): si no se indican, las columnas son las llaves de la primera fila."""
+    filas = iter(filas)
+    if columnas is not None:
+        return list(columnas), filas
+    primera = next(filas, None)
+    if primera is None:
+        return [], iter(())
+    return list(primera), itertools.chain([primera], filas)
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: `write` devuelve la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+@registrar('csv', 'text/csv; charset=utf-8', 'csv')
+def exportar_csv(filas, columnas=None):
+    columnas, filas = _con_columnas(filas, columnas)
+    escritor = csv.writer(_Eco())
+    yield ('\ufeff' + escritor.writerow(columnas)).encode('utf-8')
+    bloque = []
+    for fila in filas:
+        bloque.append(escritor.writerow([_celda(fila.get(columna)) for columna in columnas]))
+        if len(bloque) >= TAMANO_BLOQUE:
+            yield ''.join(bloque).encode('utf-8')
+            bloque = []
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+@registrar('jsonl', 'application/x-ndjson', 'jsonl')
+def exportar_jsonl(filas, columnas=None):
+    bloque = []
+    for fila in filas:
+        bloque.append(json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        if len(bloque) >= TAMANO_BLOQUE:
+            yield ''.join(bloque).encode('utf-8')
+            bloque = []
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+@registrar('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx')
+def exportar_xlsx(filas, columnas=None):
+    columnas, filas = _con_columnas(filas, columnas)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Datos')
+    ws.append(columnas)
+    for fila in filas:
+        ws.append([_celda(fila.get(columna)) for columna in columnas])
+
+    descriptor, ruta = tempfile.mkstemp(suffix='.xlsx')
+    os.close(descriptor)
+    try:
+        wb.save(ruta)
+        with open(ruta, 'rb') as archivo:
+            while True:
+                datos = archivo.read(TAMANO_LECTURA)
+                if not datos:
+                    break
+                yield datos
+    finally:
+        os.remove(ruta)
+
+
+def formato_solicitado(request):
+    return request.query_params.get(PARAMETRO)
+
+
+def respuesta(formato, filas, nombre, columnas=None):
+    """StreamingHttpResponse con `filas` en `formato`, o un 400 si el formato no existe."""
+    exportador = EXPORTADORES.get(formato)
+    if exportador is None:
+        return Response(
+            {'error': f"Formato de exportación no válido. Usa: {', '.join(EXPORTADORES)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    response = StreamingHttpResponse(exportador.generar(filas, columnas), content_type=exportador.content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.{exportador.extension}"'
+    return response
+
+
+def en_bloques(queryset, serializar, tamano=TAMANO_BLOQUE):
+    """Filas serializadas de `queryset`, leídas y serializadas de `tamano` en `tamano`."""
+    objetos = queryset.iterator(chunk_size=tamano)
+    while True:
+        bloque = list(itertools.islice(objetos, tamano))
+        if not bloque:
+            return
+        yield from serializar(bloque)
+
+
+class ExportarListaMixin:
+    """Agrega `?export=csv|xlsx|jsonl` al listado de un viewset."""
+
+    def nombre_exportacion(self):
+        return (self.basename or self.get_queryset().model._meta.model_name).replace(' ', '_')
+
+    def list(self, request, *args, **kwargs):
+        formato = formato_solicitado(request)
+        if not formato:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        columnas = [nombre for nombre, campo in serializer.fields.items() if not campo.write_only]
+        filas = en_bloques(queryset, lambda bloque: self.get_serializer(bloque, many=True).data)
+        return respuesta(formato, filas, self.nombre_exportacion(), columnas)
+
+
+class ExportarReporteMixin:
+    """
+    Agrega `?export=csv|xlsx|jsonl` a una APIView de reporte.
+
+    `filas_exportacion(data)` recibe los datos de la respuesta y devuelve las
+    filas; por defecto la respuesta debe ser una lista.
+    """
+    nombre_exportacion = 'reporte'
+
+    def filas_exportacion(self, data):
+        return data
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        formato = formato_solicitado(request)
+        if formato and isinstance(response, Response) and response.status_code == 200:
+            response = respuesta(formato, self.filas_exportacion(response.data), self.nombre_exportacion)
+        return super().finalize_response(request, response, *args, **kwargs)
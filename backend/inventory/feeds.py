@@ -0,0 +1,149 @@
+"""
+Feed iCalendar (.ics) de eventos y degustaciones para apps de calendario.
+
+Cada CalendarFeed tiene un token en la URL y sus filtros (estado, tipo de
+evento, responsable). `ics` es un generador: recorre las filas con
+``iterator(chunk_size=...)`` y produce un VEVENT a la vez, así la memoria no
+crece con los años de historial. `version` da el ETag de los datos filtrados
+para que los clientes que consultan cada pocos minutos reciban 304.
+
+Las horas se escriben como hora local "flotante" (sin zona), igual que se
+capturan en el sistema.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from .models import Degustacion, Evento
+from . import schedule
+
+PRODID = '-//Sistema de Gestion de Banquetes//Calendario//ES'
+TAMANO_BLOQUE = 500
+
+
+def eventos(feed):
+    queryset = Evento.objects.all()
+    if feed.estado:
+        queryset = queryset.filter(estado=feed.estado)
+    if feed.tipo_evento_id:
+        queryset = queryset.filter(tipo_evento_id=feed.tipo_evento_id)
+    if feed.responsable:
+        queryset = queryset.filter(responsable__iexact=feed.responsable)
+    return queryset
+
+
+def degustaciones(feed):
+    # Las degustaciones no tienen tipo de evento: un feed filtrado por tipo no las incluye
+    if not feed.incluir_degustaciones or feed.tipo_evento_id:
+        return Degustacion.objects.none()
+    queryset = Degustacion.objects.all()
+    if feed.estado:
+        queryset = queryset.filter(estado=feed.estado)
+    if feed.responsable:
+        queryset = queryset.filter(responsable__iexact=feed.responsable)
+    return queryset
+
+
+def version(feed):
+    """(etag, last_modified) de los datos del feed; cambia también si se editan sus filtros."""
+    return schedule.version(
+        {'evento': eventos(feed), 'degustacion': degustaciones(feed)},
+        feed.token, feed.updated_at.isoformat(),
+    )
+
+
+def escapar(texto):
+    """Escapa un valor TEXT según RFC 5545."""
+    return (
+        str(texto).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def plegar(linea):
+    """Divide una línea de contenido en tramos de a lo sumo 75 octetos (RFC 5545, 3.1)."""
+    datos = linea.encode('utf-8')
+    if len(datos) <= 75:
+        return linea + '\r\n'
+    partes = []
+    inicio = 0
+    limite = 75
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        # No cortar a la mitad de un carácter UTF-8
+        while fin < len(datos) and (datos[fin] & 0xC0) == 0x80:
+            fin -= 1
+        partes.append(datos[inicio:fin].decode('utf-8'))
+        inicio = fin
+        limite = 74  # las líneas de continuación empiezan con un espacio
+    return '\r\n '.join(partes) + '\r\n'
+
+
+def _fecha_local(valor):
+    return valor.strftime('%Y%m%dT%H%M%S')
+
+
+def _fecha_utc(valor):
+    return valor.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevento(uid, inicio, fin, actualizado, resumen, descripcion, lugar=None, estado=None):
+    lineas = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{_fecha_utc(actualizado)}',
+        f'LAST-MODIFIED:{_fecha_utc(actualizado)}',
+        f'DTSTART:{_fecha_local(inicio)}',
+        f'DTEND:{_fecha_local(fin)}',
+        f'SUMMARY:{escapar(resumen)}',
+        f'DESCRIPTION:{escapar(descripcion)}',
+    ]
+    if lugar:
+        lineas.append(f'LOCATION:{escapar(lugar)}')
+    lineas.append(f"STATUS:{'CANCELLED' if estado == 'Cancelado' else 'CONFIRMED'}")
+    lineas.append('END:VEVENT')
+    return ''.join(plegar(linea) for linea in lineas)
+
+
+def ics(feed, dominio='banquetes'):
+    """Generador con el contenido del calendario de `feed`, un VEVENT por fragmento."""
+    yield ''.join(plegar(linea) for linea in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escapar(feed.nombre)}',
+    ))
+
+    filas = eventos(feed).values(
+        'id', 'nombre', 'fecha_inicio', 'hora_inicio', 'cantidad_personas', 'responsable', 'lugar',
+        'estado', 'updated_at', 'tipo_evento__nombre'
+    ).order_by('fecha_inicio', 'id')
+    for evento in filas.iterator(chunk_size=TAMANO_BLOQUE):
+        inicio = datetime.combine(evento['fecha_inicio'], evento['hora_inicio'])
+        yield _vevento(
+            f"evento-{evento['id']}@{dominio}", inicio, inicio + schedule.DURACION_EVENTO, evento['updated_at'],
+            evento['nombre'],
+            f"Tipo de evento: {evento['tipo_evento__nombre'] or 'No especificado'}\n"
+            f"Personas: {evento['cantidad_personas']}\n"
+            f"Responsable: {evento['responsable']}\n"
+            f"Estado: {evento['estado']}",
+            lugar=evento['lugar'], estado=evento['estado'],
+        )
+
+    filas = degustaciones(feed).values(
+        'id', 'nombre', 'fecha_degustacion', 'hora_degustacion', 'cantidad_personas', 'responsable',
+        'estado', 'updated_at'
+    ).order_by('fecha_degustacion', 'id')
+    for degustacion in filas.iterator(chunk_size=TAMANO_BLOQUE):
+        inicio = datetime.combine(degustacion['fecha_degustacion'], degustacion['hora_degustacion'])
+        yield _vevento(
+            f"degustacion-{degustacion['id']}@{dominio}", inicio, inicio + schedule.DURACION_DEGUSTACION,
+            degustacion['updated_at'],
+            f"Degustación: {degustacion['nombre']}",
+            f"Personas: {degustacion['cantidad_personas']}\n"
+            f"Responsable: {degustacion['responsable']}\n"
+            f"Estado: {degustacion['estado']}",
+            estado=degustacion['estado'],
+        )
+
+    yield plegar('END:VCALENDAR')
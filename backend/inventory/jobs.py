@@ -0,0 +1,231 @@
+"""
+Trabajos de reportes en segundo plano (ReportJob).
+
+Los reportes pesados (PDF con ReportLab, Excel con openpyxl) no se generan en
+la petición: `encolar` guarda un ReportJob y el comando `run_report_jobs` los
+procesa con un grupo de procesos locales. El archivo queda en
+``MEDIA_ROOT/reportes/`` durante REPORT_JOBS_TTL_HOURS horas y después se
+borra (`vencer_expirados`).
+
+Deduplicación: la huella de un trabajo es el hash del tipo, el formato, los
+parámetros normalizados y la versión de los datos del reporte. Mientras un
+trabajo con esa huella esté pendiente, en proceso o listo y sin vencer, las
+peticiones iguales reciben ese mismo trabajo; una restricción única parcial lo
+garantiza aunque dos peticiones lleguen a la vez. Si los datos cambian, la
+versión cambia y se genera un archivo nuevo.
+
+Cada worker toma trabajos con un UPDATE condicional (``WHERE estado =
+'pendiente'``), así varios procesos o máquinas pueden compartir la cola sin
+``SELECT ... FOR UPDATE``.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, models, transaction
+from django.utils import timezone
+
+from . import documents, renders
+from .models import Evento, ReportJob
+
+logger = logging.getLogger(__name__)
+
+TTL_HORAS = 24
+MAX_INTENTOS = 3
+# Tiempo que un trabajo tomado por un worker queda apartado de los demás
+RESERVA_SEGUNDOS = 10 * 60
+DIRECTORIO = 'reportes'
+
+
+class TipoReporte:
+    """
+    Describe un reporte que se puede generar en segundo plano.
+
+    Args:
+        formatos (dict): formato -> función(objeto, destino) que escribe el documento
+        cargar: función(parametros) que valida los parámetros y devuelve
+            (parametros normalizados, objeto); lanza ValueError si no son válidos
+        version: función(objeto) con la versión de los datos, para la huella
+        nombre_archivo: función(objeto, formato) con el nombre de descarga
+    """
+
+    def __init__(self, formatos, cargar, version, nombre_archivo):
+        self.formatos = formatos
+        self.cargar = cargar
+        self.version = version
+        self.nombre_archivo = nombre_archivo
+
+
+def _cargar_evento(parametros):
+    try:
+        event_id = int(parametros.get('event_id'))
+    except (TypeError, ValueError):
+        raise ValueError("Se requiere 'event_id' numérico.")
+    evento = Evento.objects.select_related('tipo_evento').filter(pk=event_id).first()
+    if evento is None:
+        raise ValueError(f"Evento con ID {event_id} no encontrado.")
+    return {'event_id': event_id}, evento
+
+
+TIPOS = {
+    'uso_evento': TipoReporte(
+        formatos=documents.GENERADORES_USO_EVENTO,
+        cargar=_cargar_evento,
+        version=lambda evento: renders.version(evento, documents.lineas_de_eventos([evento.pk])[evento.pk]),
+        nombre_archivo=documents.nombre_uso_evento,
+    ),
+}
+
+
+def ttl():
+    return timedelta(hours=getattr(settings, 'REPORT_JOBS_TTL_HOURS', TTL_HORAS))
+
+
+def huella(tipo, formato, parametros, version):
+    datos = json.dumps([tipo, formato, parametros, version], sort_keys=True, default=str)
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+def _tipo(tipo, formato):
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de reporte no válido. Usa: {', '.join(TIPOS)}.")
+    if formato not in TIPOS[tipo].formatos:
+        raise ValueError(f"Formato no válido. Usa: {', '.join(TIPOS[tipo].formatos)}.")
+    return TIPOS[tipo]
+
+
+def encolar(tipo, formato, parametros, usuario=None):
+    """
+    Devuelve el trabajo vigente con los mismos datos o encola uno nuevo.
+
+    Returns:
+        tuple: (ReportJob, creado)
+
+    Raises:
+        ValueError: Tipo, formato o parámetros no válidos
+    """
+    reporte = _tipo(tipo, formato)
+    parametros, objeto = reporte.cargar(parametros or {})
+    valor = huella(tipo, formato, parametros, reporte.version(objeto))
+
+    vencer_expirados(ReportJob.objects.filter(huella=valor))
+    existente = ReportJob.objects.filter(huella=valor, estado__in=ReportJob.ESTADOS_VIGENTES).first()
+    if existente is not None:
+        return existente, False
+    try:
+        with transaction.atomic():
+            return ReportJob.objects.create(
+                tipo=tipo, formato=formato, parametros=parametros, huella=valor, solicitado_por=usuario,
+            ), True
+    except IntegrityError:
+        # Otra petición igual lo creó entre la consulta y el INSERT
+        return ReportJob.objects.get(huella=valor, estado__in=ReportJob.ESTADOS_VIGENTES), False
+
+
+def reclamar():
+    """
+    Toma el trabajo pendiente más antiguo para este worker, o None si no hay.
+
+    También se retoman los trabajos 'procesando' cuya reserva venció (el worker
+    que los tenía murió).
+    """
+    while True:
+        ahora = timezone.now()
+        disponibles = ReportJob.objects.filter(
+            models.Q(estado='pendiente') | models.Q(estado='procesando', reservado_hasta__lt=ahora)
+        )
+        job = disponibles.order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        tomado = disponibles.filter(pk=job.pk).update(
+            estado='procesando', reservado_hasta=ahora + timedelta(seconds=RESERVA_SEGUNDOS),
+            intentos=models.F('intentos') + 1,
+        )
+        if tomado:
+            job.refresh_from_db()
+            return job
+        # Otro worker lo tomó primero: se intenta con el siguiente
+
+
+def _ruta(job):
+    extension = documents.EXTENSIONES.get(job.formato, job.formato)
+    return f'{DIRECTORIO}/{job.huella}.{extension}'
+
+
+def ejecutar(job):
+    """Genera el archivo de `job` y lo marca listo; si falla, lo reintenta o lo marca fallido."""
+    reporte = TIPOS[job.tipo]
+    ruta = _ruta(job)
+    destino = os.path.join(settings.MEDIA_ROOT, ruta)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    try:
+        _, objeto = reporte.cargar(job.parametros)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        with open(temporal, 'wb') as archivo:
+            reporte.formatos[job.formato](objeto, archivo)
+        os.replace(temporal, destino)
+    except Exception as e:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        max_intentos = getattr(settings, 'REPORT_JOBS_MAX_ATTEMPTS', MAX_INTENTOS)
+        job.estado = 'fallido' if job.intentos >= max_intentos else 'pendiente'
+        job.ultimo_error = str(e)
+        job.reservado_hasta = None
+        job.save(update_fields=['estado', 'ultimo_error', 'reservado_hasta'])
+        logger.exception(f"Reporte {job.id} ({job.tipo} {job.formato}) falló en el intento {job.intentos}")
+        return False
+
+    ahora = timezone.now()
+    job.archivo.name = ruta
+    job.nombre_archivo = reporte.nombre_archivo(objeto, job.formato)
+    job.estado = 'listo'
+    job.terminado_at = ahora
+    job.expira_at = ahora + ttl()
+    job.reservado_hasta = None
+    job.save(update_fields=['archivo', 'nombre_archivo', 'estado', 'terminado_at', 'expira_at', 'reservado_hasta'])
+    return True
+
+
+def procesar_pendientes(continuo=False, intervalo=2.0):
+    """
+    Ciclo de un worker: toma y genera trabajos hasta vaciar la cola.
+
+    Con `continuo` espera `intervalo` segundos cuando la cola está vacía en lugar
+    de terminar. Pensada para correr en los procesos de `run_report_jobs`.
+
+    Returns:
+        dict: Número de reportes generados y fallidos
+    """
+    resultado = {'listos': 0, 'fallidos': 0}
+    try:
+        while True:
+            job = reclamar()
+            if job is None:
+                if not continuo:
+                    return resultado
+                time.sleep(intervalo)
+                continue
+            resultado['listos' if ejecutar(job) else 'fallidos'] += 1
+    finally:
+        connections.close_all()
+
+
+def vencer_expirados(queryset=None):
+    """
+    Borra los archivos de los trabajos listos cuyo TTL venció y los marca 'vencido'.
+
+    Returns:
+        int: Número de trabajos vencidos
+    """
+    queryset = ReportJob.objects.all() if queryset is None else queryset
+    vencidos = list(queryset.filter(estado='listo', expira_at__lte=timezone.now()))
+    for job in vencidos:
+        if job.archivo:
+            job.archivo.delete(save=False)
+    return ReportJob.objects.filter(pk__in=[job.pk for job in vencidos], estado='listo').update(
+        estado='vencido', archivo=''
+    )
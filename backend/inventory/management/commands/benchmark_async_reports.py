@@ -0,0 +1,130 @@
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from inventory import parallel
+from inventory.bench import base_de_prueba, percentil, poblar_inventario, usuario_de_prueba
+
+PREFIJO = '/api/inventory/items'
+REPORTES = [
+    ('bajo-stock', f'{PREFIJO}/bajo-stock/'),
+    ('mantenimiento', f'{PREFIJO}/maintenance-report/'),
+    ('bodegas', f'{PREFIJO}/warehouse-report/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Latencia p50/p99 de los reportes entre categorías bajo carga concurrente: vista sync '
+        'servida por WSGI con un hilo por cliente contra la vista async (…/async/) servida por '
+        'ASGI, que reparte las consultas por categoría en el grupo de hilos de parallel.py. '
+        'Base de prueba en archivo y caché de reportes desactivado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=2000, help='Artículos por categoría')
+        parser.add_argument('--bodegas', type=int, default=10)
+        parser.add_argument('--clientes', type=int, nargs='+', default=[1, 8, 32], help='Peticiones simultáneas')
+        parser.add_argument('--peticiones', type=int, default=10, help='Peticiones por cliente')
+        parser.add_argument('--hilos', type=int, default=parallel.HILOS, help='REPORT_FANOUT_THREADS')
+
+    def handle(self, *args, **options):
+        from backend.asgi import application as asgi
+        from backend.wsgi import application as wsgi
+
+        with base_de_prueba(en_archivo=True):
+            poblar_inventario(options['items'], options['bodegas'])
+            token = str(AccessToken.for_user(usuario_de_prueba()))
+
+            self.stdout.write(
+                f"{'reporte':<15}{'catálogo':<11}{'modo':<7}{'clientes':>9}"
+                f"{'p50 ms':>9}{'p99 ms':>9}{'pet/s':>8}"
+            )
+            for nombre, ruta in REPORTES:
+                for catalogo, unificado in (('tablas', False), ('unificado', True)):
+                    for clientes in options['clientes']:
+                        with override_settings(
+                            INVENTORY_UNIFIED_CATALOG=unificado, INVENTORY_REPORT_CACHE=False,
+                            REPORT_FANOUT_THREADS=options['hilos'],
+                        ):
+                            for modo, medir in (
+                                ('sync', lambda: self.medir_wsgi(wsgi, ruta, token, clientes, options['peticiones'])),
+                                ('async', lambda: asyncio.run(
+                                    self.medir_asgi(asgi, f'{ruta}async/', token, clientes, options['peticiones'])
+                                )),
+                            ):
+                                latencias, segundos = medir()
+                                self.stdout.write(
+                                    f"{nombre:<15}{catalogo:<11}{modo:<7}{clientes:>9}"
+                                    f"{percentil(latencias, 50):>9.1f}{percentil(latencias, 99):>9.1f}"
+                                    f"{len(latencias) / segundos:>8.1f}"
+                                )
+
+    def medir_wsgi(self, application, ruta, token, clientes, peticiones):
+        """Un hilo por cliente, como un servidor WSGI con hilos (ej. gunicorn --threads)."""
+        def cliente():
+            latencias = []
+            for _ in range(peticiones):
+                entorno = {
+                    'REQUEST_METHOD': 'GET', 'PATH_INFO': ruta, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+                    'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'HTTP_HOST': 'testserver',
+                    'HTTP_AUTHORIZATION': f'Bearer {token}', 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+                    'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.multithread': True,
+                    'wsgi.multiprocess': False, 'wsgi.run_once': False,
+                }
+                estado = []
+                inicio = time.perf_counter()
+                respuesta = application(entorno, lambda status, headers: estado.append(status))
+                try:
+                    b''.join(respuesta)
+                finally:
+                    respuesta.close()
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                assert estado[0].startswith('200'), estado[0]
+            return latencias
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clientes) as ejecutor:
+            resultados = [ejecutor.submit(cliente) for _ in range(clientes)]
+            latencias = [latencia for resultado in resultados for latencia in resultado.result()]
+        return latencias, time.perf_counter() - inicio
+
+    async def medir_asgi(self, application, ruta, token, clientes, peticiones):
+        """Todos los clientes en un solo ciclo de eventos, como un worker de uvicorn."""
+        async def pedir():
+            estado = []
+            mensajes = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if mensajes:
+                    return mensajes.pop()
+                # Cliente conectado hasta recibir la respuesta: Django cancela esta espera al terminar
+                await asyncio.Future()
+
+            async def send(mensaje):
+                if mensaje['type'] == 'http.response.start':
+                    estado.append(mensaje['status'])
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': ruta, 'raw_path': ruta.encode(), 'query_string': b'', 'root_path': '',
+                'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+                'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+            }
+            inicio = time.perf_counter()
+            await application(scope, receive, send)
+            assert estado[0] == 200, estado[0]
+            return (time.perf_counter() - inicio) * 1000
+
+        async def cliente():
+            return [await pedir() for _ in range(peticiones)]
+
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*(cliente() for _ in range(clientes)))
+        return [latencia for latencias in resultados for latencia in latencias], time.perf_counter() - inicio
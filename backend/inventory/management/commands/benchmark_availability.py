@@ -0,0 +1,67 @@
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory import catalog
+from inventory.availability import disponibilidad
+from inventory.bench import base_de_prueba, medir
+from inventory.categories import CATEGORIAS
+from inventory.models import Reserva
+
+
+class Command(BaseCommand):
+    help = 'Mide el motor de disponibilidad por fechas con muchas reservas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=50, help='Artículos por categoría')
+        parser.add_argument('--reservas', type=int, default=50000)
+        parser.add_argument('--dias', type=int, default=730, help='Días de historial cubiertos por las reservas')
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with base_de_prueba():
+            llaves = self.poblar(options['items'], options['reservas'], options['dias'])
+            ahora = timezone.now()
+            ventanas = [
+                ('1 día', ahora, ahora + timedelta(days=1)),
+                ('1 semana', ahora, ahora + timedelta(days=7)),
+                ('1 mes', ahora, ahora + timedelta(days=30)),
+            ]
+
+            self.stdout.write(f"{Reserva.objects.count()} reservas, {len(llaves)} artículos")
+            self.stdout.write(f"{'ventana':<12}{'artículos':>10}{'mediana ms':>12}{'max ms':>10}{'consultas':>11}")
+            for nombre, inicio, fin in ventanas:
+                for etiqueta, subconjunto in (('40', llaves[:40]), ('todos', None)):
+                    resultado = medir(
+                        lambda: disponibilidad(inicio, fin, llaves=subconjunto),
+                        options['repeticiones'],
+                    )
+                    self.stdout.write(
+                        f"{nombre:<12}{etiqueta:>10}{resultado['mediana_ms']:>12}"
+                        f"{resultado['max_ms']:>10}{resultado['consultas']:>11}"
+                    )
+
+    def poblar(self, por_categoria, num_reservas, dias):
+        rng = random.Random(7)
+        ahora = timezone.now()
+        llaves = []
+        for categoria in CATEGORIAS:
+            creados = categoria.modelo.objects.bulk_create(
+                categoria.modelo(producto=f'{categoria.slug} {i}', cantidad=500, created_at=ahora, updated_at=ahora)
+                for i in range(por_categoria)
+            )
+            llaves.extend((categoria.slug, item.pk) for item in creados)
+        catalog.reconstruir()
+
+        reservas = []
+        for _ in range(num_reservas):
+            categoria, item_id = rng.choice(llaves)
+            inicio = ahora + timedelta(hours=rng.randint(-dias * 24, dias * 24 // 4))
+            reservas.append(Reserva(
+                categoria=categoria, item_id=item_id, cantidad=rng.randint(1, 20),
+                inicio=inicio, fin=inicio + timedelta(hours=rng.randint(12, 48)),
+            ))
+        Reserva.objects.bulk_create(reservas, batch_size=2000)
+        return llaves
@@ -0,0 +1,72 @@
+import random
+import tracemalloc
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from inventory.bench import base_de_prueba, llamar_vista, medir, usuario_de_prueba
+from inventory.models import Evento
+from inventory.views import EventAnalysisReportView
+
+CONSULTAS = [
+    ('monthly', {'period': 'monthly'}),
+    ('quarterly', {'period': 'quarterly'}),
+    ('yearly', {'period': 'yearly'}),
+    ('monthly+eventos', {'period': 'monthly', 'include_events': 'true'}),
+    ('monthly 1 año', {'period': 'monthly', 'start_date': '2024-01-01', 'end_date': '2024-12-31'}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide EventAnalysisReportView (agregación en SQL) con distintos volúmenes de eventos: '
+        'tiempo, número de consultas y memoria máxima asignada durante la petición.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eventos', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        # Se mide el cálculo, no el caché de reportes
+        with base_de_prueba(), override_settings(INVENTORY_REPORT_CACHE=False):
+            usuario = usuario_de_prueba()
+            vista = EventAnalysisReportView.as_view()
+            rng = random.Random(42)
+            creados = 0
+
+            self.stdout.write(
+                f"{'eventos':>9}  {'consulta':<17}{'mediana ms':>12}{'max ms':>10}{'consultas':>11}{'memoria KB':>12}"
+            )
+            for total in sorted(options['eventos']):
+                self.poblar(rng, total - creados)
+                creados = total
+                for nombre, params in CONSULTAS:
+                    resultado = medir(lambda: llamar_vista(vista, usuario, params=params), options['repeticiones'])
+                    tracemalloc.start()
+                    llamar_vista(vista, usuario, params=params)
+                    _, pico = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    self.stdout.write(
+                        f"{total:>9}  {nombre:<17}{resultado['mediana_ms']:>12}{resultado['max_ms']:>10}"
+                        f"{resultado['consultas']:>11}{pico // 1024:>12}"
+                    )
+
+    def poblar(self, rng, cantidad):
+        inicio = date(2020, 1, 1)
+        Evento.objects.bulk_create(
+            (
+                Evento(
+                    nombre=f'Evento {i}',
+                    cantidad_personas=rng.randint(20, 500),
+                    responsable=rng.choice(['Ana', 'Luis', 'Marianna', 'Pedro']),
+                    lugar='Salón',
+                    estado='Finalizado',
+                    fecha_inicio=inicio + timedelta(days=rng.randint(0, 6 * 365)),
+                    hora_inicio=time(rng.randint(8, 22), 0),
+                )
+                for i in range(cantidad)
+            ),
+            batch_size=2000,
+        )
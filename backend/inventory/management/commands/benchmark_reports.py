@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from inventory.bench import base_de_prueba, llamar_vista, medir, poblar_inventario, usuario_de_prueba
+from inventory.views import LowStockInventoryView, MaintenanceReportView, WarehouseInventoryReportView
+
+REPORTES = [
+    ('bajo-stock', LowStockInventoryView),
+    ('mantenimiento', MaintenanceReportView),
+    ('bodegas', WarehouseInventoryReportView),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara los reportes entre categorías usando las tablas por categoría '
+        '(UNION ALL), el catálogo unificado inventory_item y el caché de reportes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=2000, help='Artículos por categoría')
+        parser.add_argument('--bodegas', type=int, default=10)
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with base_de_prueba():
+            poblar_inventario(options['items'], options['bodegas'])
+            usuario = usuario_de_prueba()
+
+            self.stdout.write(f"{'reporte':<15}{'modo':<12}{'mediana ms':>12}{'max ms':>10}{'consultas':>11}")
+            for nombre, vista in REPORTES:
+                for modo, unificado, en_cache in (
+                    ('tablas', False, False), ('unificado', True, False), ('caché', True, True),
+                ):
+                    # El caché del proceso ('default'), para no mezclar con el caché compartido
+                    with override_settings(
+                        INVENTORY_UNIFIED_CATALOG=unificado, INVENTORY_REPORT_CACHE=en_cache,
+                        INVENTORY_REPORT_CACHE_ALIAS='default',
+                    ):
+                        resultado = medir(
+                            lambda: llamar_vista(vista.as_view(), usuario),
+                            options['repeticiones'],
+                        )
+                    self.stdout.write(
+                        f"{nombre:<15}{modo:<12}{resultado['mediana_ms']:>12}"
+                        f"{resultado['max_ms']:>10}{resultado['consultas']:>11}"
+                    )
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from inventory.bench import base_de_prueba, percentil, usuario_de_prueba
+from inventory.models import Notification
+from inventory.sse import get_broadcaster
+
+RUTA = '/api/inventory/notifications/stream/'
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga del stream SSE de notificaciones: abre N suscriptores contra la '
+        'aplicación ASGI en este proceso y mide el reparto de notificaciones nuevas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suscriptores', type=int, nargs='+', default=[100, 500, 1000, 2000])
+        parser.add_argument('--notificaciones', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with base_de_prueba(en_archivo=True):
+            token = str(AccessToken.for_user(usuario_de_prueba()))
+            self.stdout.write(
+                f"{'suscriptores':>13}{'conexión s':>12}{'entregadas':>12}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+            )
+            for total in options['suscriptores']:
+                resultado = asyncio.run(self.medir(total, options['notificaciones'], token))
+                self.stdout.write(
+                    f"{total:>13}{resultado['conexion_s']:>12}{resultado['entregadas']:>12}"
+                    f"{resultado['p50']:>9}{resultado['p99']:>9}{resultado['max']:>9}"
+                )
+
+    async def medir(self, total, num_notificaciones, token):
+        from backend.asgi import application
+
+        broadcaster = get_broadcaster()
+        recibidos = {}  # id de notificación -> tiempos de llegada
+        desconectar = asyncio.Event()
+
+        async def cliente():
+            async def receive():
+                if not getattr(receive, 'enviado', False):
+                    receive.enviado = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await desconectar.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(mensaje):
+                if mensaje['type'] != 'http.response.body':
+                    return
+                ahora = time.perf_counter()
+                for linea in mensaje.get('body', b'').decode().splitlines():
+                    if linea.startswith('id: '):
+                        recibidos.setdefault(int(linea[4:]), []).append(ahora)
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': RUTA, 'raw_path': RUTA.encode(),
+                'query_string': f'token={token}'.encode(), 'root_path': '',
+                'headers': [(b'host', b'testserver'), (b'accept', b'text/event-stream')],
+                'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+            }
+            await application(scope, receive, send)
+
+        inicio = time.perf_counter()
+        tareas = [asyncio.create_task(cliente()) for _ in range(total)]
+        while broadcaster.total() < total:
+            await asyncio.sleep(0.01)
+        conexion_s = round(time.perf_counter() - inicio, 2)
+
+        latencias = []
+        crear = sync_to_async(lambda i: Notification.objects.create(message=f'Carga {i}'))
+        # La primera notificación espera a que todas las respuestas terminen de iniciar; no se mide
+        for i in range(num_notificaciones + 1):
+            enviado = time.perf_counter()
+            notificacion = await crear(i)
+            while len(recibidos.get(notificacion.id, ())) < total:
+                await asyncio.sleep(0.001)
+            if i:
+                latencias.extend((llegada - enviado) * 1000 for llegada in recibidos[notificacion.id])
+
+        desconectar.set()
+        await asyncio.gather(*tareas, return_exceptions=True)
+        return {
+            'conexion_s': conexion_s,
+            'entregadas': len(latencias),
+            'p50': round(percentil(latencias, 50), 1),
+            'p99': round(percentil(latencias, 99), 1),
+            'max': round(max(latencias), 1),
+        }
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import retention
+
+
+class Command(BaseCommand):
+    help = (
+        'Archiva en el resumen mensual y borra por lotes las notificaciones vencidas según '
+        'NOTIFICATIONS_RETENTION_READ_DAYS / NOTIFICATIONS_RETENTION_UNREAD_DAYS. Programarlo a diario (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=None, help='Notificaciones por transacción')
+        parser.add_argument(
+            '--pausa', type=float, default=0.05, help='Segundos entre lotes para ceder el candado de escritura'
+        )
+        parser.add_argument('--sin-resumen', action='store_true', help='Borrar sin archivar en el resumen mensual')
+        parser.add_argument('--simular', action='store_true', help='Sólo contar las notificaciones vencidas')
+
+    def handle(self, *args, **options):
+        if options['simular']:
+            self.stdout.write(f"Notificaciones vencidas: {retention.vencidas().count()}")
+            return
+
+        inicio = time.perf_counter()
+        borradas = lotes = 0
+        espera_lote_maxima = 0
+        marca = inicio
+        for cantidad in retention.purgar(
+            lote=options['lote'], pausa=options['pausa'], archivar_resumen=not options['sin_resumen']
+        ):
+            ahora = time.perf_counter()
+            # Tiempo del lote sin contar la pausa anterior: cuánto se retuvo el candado
+            espera_lote_maxima = max(espera_lote_maxima, ahora - marca - (options['pausa'] if lotes else 0))
+            marca = ahora
+            borradas += cantidad
+            lotes += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Lote {lotes}: {cantidad} notificaciones")
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"Borradas: {borradas} en {lotes} lotes, {segundos:.2f} s "
+            f"({borradas / segundos if segundos else 0:.0f} notificaciones/s, "
+            f"lote más lento {espera_lote_maxima * 1000:.0f} ms)"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory import catalog
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla unificada inventory_item a partir de las tablas de categorías.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = catalog.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f'Catálogo reconstruido: {total} artículos.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from inventory import report_cache, views  # noqa: F401 (registra los reportes en caché)
+
+
+class Command(BaseCommand):
+    help = 'Muestra los aciertos, obsoletos y fallos del caché de reportes por reporte (ver inventory/report_cache.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true', help='Poner los conteos en cero después de mostrarlos')
+
+    def handle(self, *args, **options):
+        conteos = report_cache.metricas(reiniciar=options['reiniciar'])
+        self.stdout.write(f"{'reporte':<18}{'hit':>8}{'stale':>8}{'miss':>8}{'aciertos %':>12}")
+        for nombre, conteo in sorted(conteos.items()):
+            total = sum(conteo.values())
+            aciertos = round((conteo['hit'] + conteo['stale']) / total * 100, 1) if total else 0
+            self.stdout.write(
+                f"{nombre:<18}{conteo['hit']:>8}{conteo['stale']:>8}{conteo['miss']:>8}{aciertos:>12}"
+            )
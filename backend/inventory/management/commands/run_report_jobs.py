@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from inventory import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera los reportes en cola (ReportJob) con un grupo de procesos y borra los archivos '
+        'vencidos según REPORT_JOBS_TTL_HOURS. Con --continuo queda atendiendo la cola.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos', type=int, default=2, help='Procesos que generan reportes (0 = en este proceso)'
+        )
+        parser.add_argument('--continuo', action='store_true', help='Seguir revisando la cola indefinidamente')
+        parser.add_argument('--intervalo', type=float, default=2, help='Segundos de espera cuando la cola está vacía')
+
+    def handle(self, *args, **options):
+        vencidos = jobs.vencer_expirados()
+        if vencidos:
+            self.stdout.write(f"Archivos vencidos borrados: {vencidos}")
+
+        if options['procesos'] <= 0:
+            resultados = [jobs.procesar_pendientes(options['continuo'], options['intervalo'])]
+        else:
+            # Los procesos hijos no deben heredar la conexión abierta de este proceso
+            connections.close_all()
+            # Con 'spawn' (macOS, Windows) los hijos arrancan sin Django configurado
+            with ProcessPoolExecutor(max_workers=options['procesos'], initializer=django.setup) as grupo:
+                futuros = [
+                    grupo.submit(jobs.procesar_pendientes, options['continuo'], options['intervalo'])
+                    for _ in range(options['procesos'])
+                ]
+                resultados = [futuro.result() for futuro in futuros]
+
+        self.stdout.write(
+            f"Reportes generados: {sum(r['listos'] for r in resultados)}, "
+            f"fallidos: {sum(r['fallidos'] for r in resultados)}"
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import outbox
+
+
+class Command(BaseCommand):
+    help = 'Envía los correos pendientes de la bandeja de salida (EmailOutbox).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help='Correos por conexión SMTP')
+        parser.add_argument('--continuo', action='store_true', help='Seguir revisando la bandeja indefinidamente')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos de espera cuando la bandeja está vacía')
+
+    def handle(self, *args, **options):
+        while True:
+            resultado = outbox.enviar_pendientes(lote=options['lote'])
+            procesados = sum(resultado.values())
+            if procesados:
+                self.stdout.write(
+                    f"Enviados: {resultado['enviados']}, reintentos: {resultado['reintentos']}, "
+                    f"fallidos: {resultado['fallidos']}"
+                )
+
+            if not options['continuo']:
+                # Sin --continuo se vacía lo que esté vencido y se termina
+                if procesados < options['lote']:
+                    break
+                continue
+            if procesados < options['lote']:
+                time.sleep(options['intervalo'])
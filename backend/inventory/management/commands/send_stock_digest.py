@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from inventory import alerts
+
+
+class Command(BaseCommand):
+    help = (
+        'Emite el resumen de alertas de bajo stock pendientes (una notificación y un correo). '
+        'Programarlo cada hora o cada día con INVENTORY_LOW_STOCK_ALERT_MODE = "programado".'
+    )
+
+    def handle(self, *args, **options):
+        notificacion = alerts.emitir_resumen()
+        if notificacion is None:
+            self.stdout.write('No hay alertas de bajo stock pendientes.')
+        else:
+            self.stdout.write(self.style.SUCCESS(notificacion.message))
@@ -0,0 +1,103 @@
+import random
+import threading
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from inventory.bench import base_de_prueba, usuario_de_prueba
+from inventory.models import Silla, StockMovement
+from inventory.views import INVENTARIO_VIEWSETS
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de estrés: varios hilos envían y reintegran unidades de mantenimiento '
+        'al mismo tiempo y se verifica que no se pierda ninguna actualización.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=8)
+        parser.add_argument('--operaciones', type=int, default=100, help='Operaciones por hilo')
+        parser.add_argument('--items', type=int, default=3)
+        parser.add_argument('--cantidad', type=int, default=40, help='Stock inicial de cada artículo')
+
+    def handle(self, *args, **options):
+        with base_de_prueba(en_archivo=True):
+            usuario = usuario_de_prueba()
+            items = [
+                Silla.objects.create(producto=f'Silla estrés {i}', cantidad=options['cantidad'])
+                for i in range(options['items'])
+            ]
+            exitos = defaultdict(int)
+            rechazos = defaultdict(int)
+            errores = []
+            candado = threading.Lock()
+
+            vistas = {
+                accion: INVENTARIO_VIEWSETS['silla'].as_view({'post': accion})
+                for accion in ('mantenimiento', 'reintegrar')
+            }
+
+            def trabajador(semilla):
+                rng = random.Random(semilla)
+                factory = APIRequestFactory()
+                try:
+                    for _ in range(options['operaciones']):
+                        item = rng.choice(items)
+                        accion = rng.choice(('mantenimiento', 'reintegrar'))
+                        cantidad = rng.randint(1, 5)
+                        request = factory.post('/', {'cantidad': cantidad}, format='json')
+                        force_authenticate(request, user=usuario)
+                        response = vistas[accion](request, pk=item.pk)
+                        with candado:
+                            if response.status_code == 200:
+                                signo = -1 if accion == 'mantenimiento' else 1
+                                exitos[item.pk] += signo * cantidad
+                            elif response.status_code == 400:
+                                rechazos[item.pk] += 1
+                            else:
+                                errores.append(response.status_code)
+                except Exception as exc:  # noqa: BLE001 - se reporta al final
+                    with candado:
+                        errores.append(repr(exc))
+                finally:
+                    connection.close()
+
+            hilos = [threading.Thread(target=trabajador, args=(semilla,)) for semilla in range(options['hilos'])]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+            bitacora = dict(
+                StockMovement.objects.filter(categoria='silla').values('item_id')
+                .annotate(total=Sum('delta')).values_list('item_id', 'total')
+            )
+            self.stdout.write(
+                f"{'artículo':<18}{'esperado':>10}{'cantidad':>10}{'mant.':>8}{'bitácora':>10}{'rechazos':>10}"
+            )
+            perdidas = 0
+            for item in items:
+                item.refresh_from_db()
+                esperado = options['cantidad'] + exitos[item.pk]
+                correcto = (
+                    item.cantidad == esperado
+                    and item.cantidad + item.cantidad_en_mantenimiento == options['cantidad']
+                    and options['cantidad'] + bitacora.get(item.pk, 0) == item.cantidad
+                )
+                perdidas += not correcto
+                self.stdout.write(
+                    f"{item.producto:<18}{esperado:>10}{item.cantidad:>10}{item.cantidad_en_mantenimiento:>8}"
+                    f"{options['cantidad'] + bitacora.get(item.pk, 0):>10}{rechazos[item.pk]:>10}"
+                )
+
+            if errores:
+                raise CommandError(f'{len(errores)} peticiones fallaron: {errores[:5]}')
+            if perdidas:
+                raise CommandError(f'{perdidas} artículos con actualizaciones perdidas.')
+            self.stdout.write(self.style.SUCCESS(
+                f"{options['hilos'] * options['operaciones']} operaciones, 0 actualizaciones perdidas."
+            ))
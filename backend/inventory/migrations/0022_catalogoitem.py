@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CATEGORIAS = [
+    'manteleria', 'cubierto', 'loza', 'cristaleria', 'silla', 'mesa',
+    'salalounge', 'periquera', 'carpa', 'pistatarima', 'extra',
+]
+
+
+def copiar_catalogo(apps, schema_editor):
+    CatalogoItem = apps.get_model('inventory', 'CatalogoItem')
+    filas = []
+    for categoria in CATEGORIAS:
+        Modelo = apps.get_model('inventory', categoria)
+        for item in Modelo.objects.all().iterator(chunk_size=2000):
+            filas.append(CatalogoItem(
+                categoria=categoria,
+                item_id=item.pk,
+                producto=item.producto,
+                descripcion=item.descripcion,
+                cantidad=item.cantidad,
+                cantidad_en_mantenimiento=item.cantidad_en_mantenimiento,
+                bodega_id=item.bodega_id,
+                created_at=item.created_at,
+                updated_at=item.updated_at,
+            ))
+    CatalogoItem.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0021_invitation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogoItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=30)),
+                ('item_id', models.PositiveIntegerField()),
+                ('producto', models.CharField(max_length=100)),
+                ('descripcion', models.TextField(blank=True, null=True)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('cantidad_en_mantenimiento', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('bodega', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='catalogo_items', to='inventory.bodega')),
+            ],
+            options={
+                'db_table': 'inventory_item',
+                'indexes': [models.Index(fields=['cantidad'], name='inventory_item_cantidad_idx'), models.Index(fields=['cantidad_en_mantenimiento'], name='inventory_item_mant_idx'), models.Index(fields=['bodega', 'categoria'], name='inventory_item_bodega_idx'), models.Index(fields=['producto'], name='inventory_item_producto_idx')],
+                'constraints': [models.UniqueConstraint(fields=('categoria', 'item_id'), name='inventory_item_categoria_item_uniq')],
+            },
+        ),
+        migrations.RunPython(copiar_catalogo, migrations.RunPython.noop),
+    ]
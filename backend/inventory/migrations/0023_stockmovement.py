@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:30
+
+import django.db.models.deletion
+import re
+
+from django.db import migrations, models
+
+
+def importar_historial_de_notificaciones(apps, schema_editor):
+    """Convierte las notificaciones de mantenimiento existentes en movimientos."""
+    Notification = apps.get_model('inventory', 'Notification')
+    CatalogoItem = apps.get_model('inventory', 'CatalogoItem')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+
+    notificaciones = Notification.objects.filter(
+        models.Q(message__icontains='ingresado al mantenimiento') |
+        models.Q(message__icontains='salido del mantenimiento')
+    )
+    for notificacion in notificaciones.iterator():
+        match = re.search(r'(\d+)\s+(.+?)\.$', notificacion.message)
+        if not match:
+            continue
+        cantidad = int(match.group(1))
+        producto = match.group(2).strip()
+        item = CatalogoItem.objects.filter(producto=producto).first()
+        if item is None:
+            continue
+        entrada = 'ingresado al mantenimiento' in notificacion.message.lower()
+        movimiento = StockMovement.objects.create(
+            categoria=item.categoria,
+            item_id=item.item_id,
+            producto=producto,
+            bodega_id=item.bodega_id,
+            delta=-cantidad if entrada else cantidad,
+            delta_mantenimiento=cantidad if entrada else -cantidad,
+            motivo='mantenimiento' if entrada else 'reintegro',
+        )
+        # created_at es auto_now_add: se conserva la fecha original con un UPDATE
+        StockMovement.objects.filter(pk=movimiento.pk).update(created_at=notificacion.created_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0022_catalogoitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=30)),
+                ('item_id', models.PositiveIntegerField()),
+                ('producto', models.CharField(max_length=100)),
+                ('delta', models.IntegerField(default=0)),
+                ('delta_mantenimiento', models.IntegerField(default=0)),
+                ('motivo', models.CharField(choices=[('mantenimiento', 'Ingreso a mantenimiento'), ('reintegro', 'Salida de mantenimiento'), ('reserva', 'Reserva'), ('liberacion', 'Liberación de reserva'), ('ajuste', 'Ajuste')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bodega', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos', to='inventory.bodega')),
+                ('degustacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos', to='inventory.degustacion')),
+                ('evento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimientos', to='inventory.evento')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['categoria', 'created_at'], name='stockmov_categoria_fecha_idx'), models.Index(fields=['motivo', 'created_at'], name='stockmov_motivo_fecha_idx'), models.Index(fields=['categoria', 'item_id', 'created_at'], name='stockmov_item_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(importar_historial_de_notificaciones, migrations.RunPython.noop),
+    ]
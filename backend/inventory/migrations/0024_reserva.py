@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:32
+
+import django.db.models.deletion
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Valores por defecto de INVENTORY_RESERVATION_HOURS y de los márgenes
+DURACION_HORAS = {'evento': 12, 'degustacion': 2}
+MARGEN_ANTES_HORAS = 12
+MARGEN_DESPUES_HORAS = 12
+
+
+def _ventana(fecha, hora, tipo):
+    inicio = timezone.make_aware(datetime.combine(fecha, hora))
+    fin = inicio + timedelta(hours=DURACION_HORAS[tipo] + MARGEN_DESPUES_HORAS)
+    return inicio - timedelta(hours=MARGEN_ANTES_HORAS), fin
+
+
+def convertir_a_reservas(apps, schema_editor):
+    """
+    Hasta ahora reservar descontaba `cantidad`. Para los eventos y degustaciones
+    activos se devuelve ese stock y se registra una Reserva con sus fechas.
+    """
+    Reserva = apps.get_model('inventory', 'Reserva')
+    CatalogoItem = apps.get_model('inventory', 'CatalogoItem')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    fuentes = [
+        ('evento', 'Evento', 'EventoMobiliario', 'fecha_inicio', 'hora_inicio'),
+        ('degustacion', 'Degustacion', 'DegustacionMobiliario', 'fecha_degustacion', 'hora_degustacion'),
+    ]
+    for tipo, modelo, modelo_linea, campo_fecha, campo_hora in fuentes:
+        Padre = apps.get_model('inventory', modelo)
+        Linea = apps.get_model('inventory', modelo_linea)
+        activos = Padre.objects.exclude(estado__in=['Finalizado', 'Cancelado'])
+        for padre in activos.iterator():
+            inicio, fin = _ventana(getattr(padre, campo_fecha), getattr(padre, campo_hora), tipo)
+            for linea in Linea.objects.filter(**{tipo: padre}):
+                categoria = ContentType.objects.get(pk=linea.content_type_id).model
+                Item = apps.get_model('inventory', categoria)
+                item = Item.objects.filter(pk=linea.object_id).first()
+                if item is None:
+                    continue
+                item.cantidad += linea.cantidad
+                item.save(update_fields=['cantidad'])
+                CatalogoItem.objects.filter(categoria=categoria, item_id=item.pk).update(cantidad=item.cantidad)
+                StockMovement.objects.create(
+                    categoria=categoria, item_id=item.pk, producto=item.producto, bodega_id=item.bodega_id,
+                    delta=linea.cantidad, motivo='liberacion', **{tipo: padre}
+                )
+                Reserva.objects.create(
+                    categoria=categoria, item_id=item.pk, cantidad=linea.cantidad,
+                    inicio=inicio, fin=fin, **{tipo: padre}
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('inventory', '0023_stockmovement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reserva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=30)),
+                ('item_id', models.PositiveIntegerField()),
+                ('cantidad', models.PositiveIntegerField()),
+                ('inicio', models.DateTimeField()),
+                ('fin', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('degustacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='inventory.degustacion')),
+                ('evento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='inventory.evento')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['categoria', 'item_id', 'fin', 'inicio'], name='reserva_item_ventana_idx'), models.Index(fields=['inicio', 'fin'], name='reserva_ventana_idx')],
+            },
+        ),
+        migrations.RunPython(convertir_a_reservas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0024_reserva'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='carpa',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_carpa_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='carpa',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_carpa_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='cristaleria',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_cristaleria_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='cristaleria',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_cristaleria_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='cubierto',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_cubierto_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='cubierto',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_cubierto_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='extra',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_extra_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='extra',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_extra_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='loza',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_loza_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='loza',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_loza_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='manteleria',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_manteleria_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='manteleria',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_manteleria_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='mesa',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_mesa_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='mesa',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_mesa_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='periquera',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_periquera_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='periquera',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_periquera_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='pistatarima',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_pistatarima_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='pistatarima',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_pistatarima_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='salalounge',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_salalounge_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='salalounge',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_salalounge_mantenimiento_no_negativo'),
+        ),
+        migrations.AddConstraint(
+            model_name='silla',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad__gte', 0)), name='inventory_silla_cantidad_no_negativa'),
+        ),
+        migrations.AddConstraint(
+            model_name='silla',
+            constraint=models.CheckConstraint(condition=models.Q(('cantidad_en_mantenimiento__gte', 0)), name='inventory_silla_mantenimiento_no_negativo'),
+        ),
+    ]
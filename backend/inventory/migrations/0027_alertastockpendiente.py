@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0026_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaStockPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=30)),
+                ('item_id', models.PositiveIntegerField()),
+                ('producto', models.CharField(max_length=100)),
+                ('cantidad', models.IntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('categoria', 'item_id'), name='alerta_stock_item_unico')],
+            },
+        ),
+    ]
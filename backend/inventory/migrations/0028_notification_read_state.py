@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def importar_is_read(apps, schema_editor):
+    """
+    `is_read` era un único indicador compartido por todos los usuarios. Se
+    traduce a la marca de cada usuario: leído hasta antes de la primera
+    notificación no leída, y las leídas posteriores como excepciones.
+    """
+    Notification = apps.get_model('inventory', 'Notification')
+    NotificationReadState = apps.get_model('inventory', 'NotificationReadState')
+    NotificationRead = apps.get_model('inventory', 'NotificationRead')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    primera_no_leida = Notification.objects.filter(is_read=False).order_by('id').values_list('id', flat=True).first()
+    if primera_no_leida is None:
+        leido_hasta = Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    else:
+        leido_hasta = primera_no_leida - 1
+    leidas_despues = list(
+        Notification.objects.filter(is_read=True, id__gt=leido_hasta).values_list('id', flat=True)
+    )
+
+    for user_id in User.objects.values_list('id', flat=True):
+        NotificationReadState.objects.create(user_id=user_id, leido_hasta=leido_hasta)
+        NotificationRead.objects.bulk_create(
+            NotificationRead(user_id=user_id, notification_id=notification_id) for notification_id in leidas_despues
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0027_alertastockpendiente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NotificationReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leido_hasta', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at', 'id'], name='notification_fecha_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationread',
+            name='notification',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lecturas', to='inventory.notification'),
+        ),
+        migrations.AddField(
+            model_name='notificationread',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_reads', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notificationreadstate',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_read_state', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationread',
+            constraint=models.UniqueConstraint(fields=('user', 'notification'), name='notification_read_unica'),
+        ),
+        migrations.RunPython(importar_is_read, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='notification',
+            name='is_read',
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Prefijos de los mensajes que se generaban antes de tener tipo
+TIPOS_POR_PREFIJO = [
+    ('Nuevo pedido creado', 'evento_nuevo', 'info'),
+    ('El evento ', 'evento_finalizado', 'info'),
+    ('La degustación ', 'degustacion_finalizada', 'info'),
+    ('Han ingresado al mantenimiento', 'mantenimiento_entrada', 'info'),
+    ('Han salido del mantenimiento', 'mantenimiento_salida', 'info'),
+    ('¡Alerta de bajo stock!', 'bajo_stock', 'aviso'),
+]
+
+
+def clasificar_existentes(apps, schema_editor):
+    """Asigna el tipo a las notificaciones existentes según el inicio de su mensaje (un UPDATE por tipo)."""
+    Notification = apps.get_model('inventory', 'Notification')
+    for prefijo, tipo, severidad in TIPOS_POR_PREFIJO:
+        Notification.objects.filter(tipo='general', message__startswith=prefijo).update(
+            tipo=tipo, severidad=severidad
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0028_notification_read_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='cantidad',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='categoria',
+            field=models.CharField(blank=True, default='', max_length=30),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='degustacion',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notificaciones', to='inventory.degustacion'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='evento',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notificaciones', to='inventory.evento'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='item_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='severidad',
+            field=models.CharField(choices=[('info', 'Información'), ('aviso', 'Aviso'), ('critico', 'Crítico')], default='info', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='tipo',
+            field=models.CharField(choices=[('evento_nuevo', 'Nuevo evento'), ('evento_finalizado', 'Evento finalizado'), ('degustacion_finalizada', 'Degustación finalizada'), ('mantenimiento_entrada', 'Ingreso a mantenimiento'), ('mantenimiento_salida', 'Salida de mantenimiento'), ('bajo_stock', 'Bajo stock'), ('general', 'General')], default='general', max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['tipo', 'created_at', 'id'], name='notification_tipo_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['categoria', 'item_id', 'created_at'], name='notification_item_fecha_idx'),
+        ),
+        migrations.RunPython(clasificar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0029_notification_tipo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationResumenMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('tipo', models.CharField(choices=[('evento_nuevo', 'Nuevo evento'), ('evento_finalizado', 'Evento finalizado'), ('degustacion_finalizada', 'Degustación finalizada'), ('mantenimiento_entrada', 'Ingreso a mantenimiento'), ('mantenimiento_salida', 'Salida de mantenimiento'), ('bajo_stock', 'Bajo stock'), ('general', 'General')], max_length=30)),
+                ('severidad', models.CharField(choices=[('info', 'Información'), ('aviso', 'Aviso'), ('critico', 'Crítico')], max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('primera', models.DateTimeField()),
+                ('ultima', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('mes', 'tipo', 'severidad'), name='notification_resumen_unico')],
+            },
+        ),
+    ]
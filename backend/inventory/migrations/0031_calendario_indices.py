@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0030_notification_resumen_mensual'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='degustacion',
+            index=models.Index(fields=['fecha_degustacion', 'updated_at'], name='degustacion_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['fecha_inicio', 'updated_at'], name='evento_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0032_calendar_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMinimoCategoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=30, unique=True)),
+                ('stock_minimo', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='carpa',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='catalogoitem',
+            name='umbral',
+            field=models.PositiveIntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name='catalogoitem',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cristaleria',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cubierto',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='extra',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='loza',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='manteleria',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mesa',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='periquera',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pistatarima',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='salalounge',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='silla',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='catalogoitem',
+            name='bajo_stock',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('cantidad__lt', models.F('umbral'))), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='catalogoitem',
+            index=models.Index(condition=models.Q(('bajo_stock', True)), fields=['categoria', 'cantidad'], name='inventory_item_bajo_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+MODELOS_LINEA = ('EventoMobiliario', 'DegustacionMobiliario')
+
+
+def copiar_articulos(apps, schema_editor):
+    """
+    Copia la categoría (ContentType.model), el producto y la etiqueta de la
+    categoría a las líneas existentes: un UPDATE por artículo, con los nombres
+    leídos en una consulta por categoría.
+    """
+    for nombre in MODELOS_LINEA:
+        Linea = apps.get_model('inventory', nombre)
+        articulos = {}
+        for fila in Linea.objects.values('content_type__model', 'item_id').distinct():
+            articulos.setdefault(fila['content_type__model'], set()).add(fila['item_id'])
+
+        for categoria, ids in articulos.items():
+            try:
+                modelo = apps.get_model('inventory', categoria)
+            except LookupError:
+                modelo = None
+            etiqueta = str(modelo._meta.verbose_name_plural).title() if modelo else ''
+            productos = dict(modelo.objects.filter(pk__in=ids).values_list('pk', 'producto')) if modelo else {}
+            for item_id in ids:
+                Linea.objects.filter(content_type__model=categoria, item_id=item_id).update(
+                    categoria=categoria,
+                    producto=productos.get(item_id, 'Artículo eliminado'),
+                    categoria_etiqueta=etiqueta,
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('inventory', '0034_report_jobs'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='eventomobiliario',
+            old_name='object_id',
+            new_name='item_id',
+        ),
+        migrations.RenameField(
+            model_name='degustacionmobiliario',
+            old_name='object_id',
+            new_name='item_id',
+        ),
+        migrations.AddField(
+            model_name='eventomobiliario',
+            name='categoria',
+            field=models.CharField(default='', max_length=30),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='eventomobiliario',
+            name='producto',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='eventomobiliario',
+            name='categoria_etiqueta',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='degustacionmobiliario',
+            name='categoria',
+            field=models.CharField(default='', max_length=30),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='degustacionmobiliario',
+            name='producto',
+            field=models.CharField(default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='degustacionmobiliario',
+            name='categoria_etiqueta',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.RunPython(copiar_articulos, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='eventomobiliario',
+            name='content_type',
+        ),
+        migrations.RemoveField(
+            model_name='degustacionmobiliario',
+            name='content_type',
+        ),
+        migrations.AddIndex(
+            model_name='eventomobiliario',
+            index=models.Index(fields=['categoria', 'item_id'], name='eventomob_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='degustacionmobiliario',
+            index=models.Index(fields=['categoria', 'item_id'], name='degustacionmob_item_idx'),
+        ),
+    ]
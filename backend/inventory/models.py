@@ -1,44 +1,33 @@
 from django.db import models
-from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.core.mail import send_mail
-from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils import timezone
 import logging
 
+from .tracking import RastreoCamposMixin
+
 logger = logging.getLogger(__name__)
 
 
 def send_notification_email(message):
     """
-    Envía un correo electrónico a todos los usuarios con rol 'admin' o 'Encargado'
-    
+    Encola un correo para todos los usuarios con rol 'admin' o 'Encargado'.
+
+    El correo se guarda en la bandeja de salida (EmailOutbox) dentro de la
+    transacción actual y lo envía el comando `send_outbox`; los destinatarios se
+    resuelven al enviarlo, así el guardado no consulta perfiles ni espera al
+    servidor SMTP.
+
     Args:
         message (str): El mensaje de la notificación a enviar
-    
+
     Returns:
-        int: Número de correos enviados exitosamente
+        EmailOutbox: El correo encolado
     """
-    try:
-        from posts.models import Profile
-        
-        # Obtener usuarios con rol 'admin' o 'Encargado' que tengan email
-        admin_profiles = Profile.objects.filter(rol__in=['admin', 'Encargado'])
-        admin_users = User.objects.filter(
-            profile__in=admin_profiles,
-            email__isnull=False
-        ).exclude(email='')
-        
-        if not admin_users.exists():
-            logger.warning("No se encontraron usuarios con rol admin o Encargado con correo electrónico")
-            return 0
-        
-        # Obtener lista de correos
-        recipient_list = [user.email for user in admin_users]
-        
-        # Configurar el asunto y cuerpo del correo
-        subject = '⚠️ Notificación de Inventario - Sistema de Banquetes'
-        email_message = f"""
+    from .outbox import GRUPO_ADMINS, encolar
+
+    subject = '⚠️ Notificación de Inventario - Sistema de Banquetes'
+    email_message = f"""
 Estimado(a) usuario(a),
 
 Se ha generado una nueva notificación en el sistema de inventario:
@@ -50,23 +39,7 @@ Por favor, revise el sistema para tomar las acciones necesarias.
 Atentamente,
 Sistema de Gestión de Banquetes
         """
-        
-        # Enviar el correo
-        sent_count = send_mail(
-            subject=subject,
-            message=email_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipient_list,
-            fail_silently=False,
-        )
-        
-        logger.info(f"Correos de notificación enviados exitosamente a {len(recipient_list)} usuarios")
-        return sent_count
-        
-    except Exception as e:
-        logger.error(f"Error al enviar correos de notificación: {str(e)}")
-        # No lanzar la excepción para no interrumpir el flujo del guardado
-        return 0
+    return encolar(subject, email_message, grupo=GRUPO_ADMINS)
 
 class TipoEvento(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
@@ -83,33 +56,56 @@ class Bodega(models.Model):
     def __str__(self):
         return self.nombre
 
-class InventarioItem(models.Model):
+# Stock mínimo cuando ni el artículo ni su categoría definen uno (ver thresholds.py)
+UMBRAL_BAJO_STOCK = 10
+
+
+def alertar_bajo_stock(item, cantidad_anterior, cantidad_actual):
+    """
+    Registra una alerta de bajo stock cuando la cantidad de un artículo cruza su
+    stock mínimo hacia abajo. Las alertas se agrupan en un resumen (ver alerts.py).
+    """
+    if cantidad_actual >= cantidad_anterior:
+        return
+    from . import thresholds
+    umbral = thresholds.de_item(item)
+    if cantidad_anterior >= umbral and cantidad_actual < umbral:
+        from . import alerts
+        alerts.registrar(item, cantidad_actual)
+
+
+class InventarioItem(RastreoCamposMixin, models.Model):
     producto = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True, null=True)
     cantidad = models.IntegerField(default=0)
     cantidad_en_mantenimiento = models.IntegerField(default=0)
+    # Stock mínimo propio; si es nulo se usa el de la categoría (StockMinimoCategoria)
+    stock_minimo = models.PositiveIntegerField(null=True, blank=True)
     bodega = models.ForeignKey(Bodega, on_delete=models.SET_NULL, null=True, blank=True, related_name='%(class)s_items')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
+        # La base de datos garantiza que el stock nunca quede negativo, aun con
+        # ajustes concurrentes (ver stock.ajustar)
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(cantidad__gte=0), name='%(app_label)s_%(class)s_cantidad_no_negativa'
+            ),
+            models.CheckConstraint(
+                condition=models.Q(cantidad_en_mantenimiento__gte=0),
+                name='%(app_label)s_%(class)s_mantenimiento_no_negativo',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.producto} - Disp: {self.cantidad} / Mant: {self.cantidad_en_mantenimiento}"
 
     def save(self, *args, **kwargs):
-        if self.pk is not None:
-            try:
-                old_item = self.__class__.objects.get(pk=self.pk)
-                if old_item.cantidad >= 10 and self.cantidad < 10:
-                    message = f"¡Alerta de bajo stock! El artículo '{self.producto}' tiene actualmente {self.cantidad} unidades. ¡Requiere reabastecimiento urgente!"
-                    Notification.objects.create(message=message)
-                    # Enviar correo a usuarios admin y Encargado
-                    send_notification_email(message)
-                    logger.info(f"Notificación creada y correo enviado para {self.producto}")
-            except self.__class__.DoesNotExist:
-                pass  # El objeto es nuevo, no hay nada que comparar
+        # La cantidad anterior sale de los valores leídos al cargar la fila (ver tracking.py)
+        if self.pk is not None and self.ha_cambiado('cantidad'):
+            alertar_bajo_stock(self, self.valor_original('cantidad'), self.cantidad)
 
         super().save(*args, **kwargs)
 
@@ -127,72 +123,129 @@ class Cliente(models.Model):
 
 class Manteleria(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Mantelería'
         verbose_name_plural = 'Mantelerías'
 
 class Cubierto(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Cubierto'
         verbose_name_plural = 'Cubiertos'
 
 class Loza(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Loza'
         verbose_name_plural = 'Lozas'
 
 class Cristaleria(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Cristalería'
         verbose_name_plural = 'Cristalerías'
 
 class Silla(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Silla'
         verbose_name_plural = 'Sillas'
 
 class Mesa(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Mesa'
         verbose_name_plural = 'Mesas'
 
 class SalaLounge(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Sala-Lounge'
         verbose_name_plural = 'Salas-Lounge'
 
 class Periquera(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Periquera'
         verbose_name_plural = 'Periqueras'
 
 class Carpa(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Carpa'
         verbose_name_plural = 'Carpas'
 
 class PistaTarima(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Pista y Tarima'
         verbose_name_plural = 'Pistas y Tarimas'
 
 class Extra(InventarioItem):
 
-    class Meta:
+    class Meta(InventarioItem.Meta):
         verbose_name = 'Extra'
         verbose_name_plural = 'Extras'
 
 
-class Evento(models.Model):
+class CatalogoItem(models.Model):
+    """
+    Copia unificada de los artículos de las 11 tablas de categorías.
+
+    Se mantiene sincronizada por señales (ver signals.py) y permite responder
+    preguntas entre categorías (bajo stock, mantenimiento, bodegas) con una sola
+    consulta indexada cuando INVENTORY_UNIFIED_CATALOG está activo.
+    """
+    categoria = models.CharField(max_length=30)
+    item_id = models.PositiveIntegerField()
+    producto = models.CharField(max_length=100)
+    descripcion = models.TextField(blank=True, null=True)
+    cantidad = models.IntegerField(default=0)
+    cantidad_en_mantenimiento = models.IntegerField(default=0)
+    bodega = models.ForeignKey(Bodega, on_delete=models.SET_NULL, null=True, blank=True, related_name='catalogo_items')
+    stock_minimo = models.PositiveIntegerField(null=True, blank=True)
+    # Stock mínimo efectivo: el del artículo, el de su categoría o el global
+    umbral = models.PositiveIntegerField(default=UMBRAL_BAJO_STOCK)
+    # La base de datos lo recalcula en cada cambio de cantidad o umbral: el
+    # conjunto de artículos en bajo stock se mantiene solo y se lee por índice
+    bajo_stock = models.GeneratedField(
+        expression=models.Q(cantidad__lt=models.F('umbral')),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'inventory_item'
+        constraints = [
+            models.UniqueConstraint(fields=['categoria', 'item_id'], name='inventory_item_categoria_item_uniq'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['categoria', 'cantidad'], condition=models.Q(bajo_stock=True), name='inventory_item_bajo_stock_idx'
+            ),
+            models.Index(fields=['cantidad'], name='inventory_item_cantidad_idx'),
+            models.Index(fields=['cantidad_en_mantenimiento'], name='inventory_item_mant_idx'),
+            models.Index(fields=['bodega', 'categoria'], name='inventory_item_bodega_idx'),
+            models.Index(fields=['producto'], name='inventory_item_producto_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.categoria}] {self.producto}"
+
+
+class StockMinimoCategoria(models.Model):
+    """Stock mínimo de los artículos de una categoría que no definen el suyo."""
+    categoria = models.CharField(max_length=30, unique=True)
+    stock_minimo = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.categoria}: {self.stock_minimo}"
+
+
+class Evento(RastreoCamposMixin, models.Model):
     ESTADO_CHOICES = [
         ('Por iniciar', 'Por iniciar'),
         ('En proceso', 'En proceso'),
@@ -211,6 +264,12 @@ class Evento(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Cubre la ventana del calendario y su validador (ver schedule.py)
+            models.Index(fields=['fecha_inicio', 'updated_at'], name='evento_fecha_idx'),
+        ]
+
     def __str__(self):
         return self.nombre
 
@@ -218,43 +277,65 @@ class Evento(models.Model):
         is_new = self.pk is None  # Comprobar si el objeto es nuevo
 
         # Lógica de actualización para eventos existentes
-        if not is_new:
-            try:
-                evento_anterior = Evento.objects.get(pk=self.pk)
-                if evento_anterior.estado not in ['Finalizado', 'Cancelado'] and self.estado in ['Finalizado', 'Cancelado']:
-                    for item_asignado in self.mobiliario_asignado.all():
-                        if item_asignado.content_object:
-                            item_asignado.content_object.cantidad += item_asignado.cantidad
-                            item_asignado.content_object.save()
+        if not is_new and self.ha_cambiado('estado'):
+            if self.valor_original('estado') not in ['Finalizado', 'Cancelado'] and self.estado in ['Finalizado', 'Cancelado']:
+                # Liberar las reservas; el mobiliario de un evento finalizado se conserva como historial
+                from . import availability, notifications
+                availability.liberar(self.reservas.all(), cancelado=self.estado == 'Cancelado')
+                if self.estado == 'Cancelado':
                     self.mobiliario_asignado.all().delete()
 
-                    if self.estado == 'Finalizado':
-                        message = f"El evento '{self.nombre}' en '{self.lugar}' ha terminado."
-                        Notification.objects.create(message=message)
-            except Evento.DoesNotExist:
-                pass
+                if self.estado == 'Finalizado':
+                    message = f"El evento '{self.nombre}' en '{self.lugar}' ha terminado."
+                    notifications.notificar('evento_finalizado', message, evento=self)
 
         super().save(*args, **kwargs)  # Guardar el objeto
 
         # Crear notificación para nuevos eventos
         if is_new and self.estado == 'Por iniciar':
             message = f"Nuevo pedido creado: Evento '{self.nombre}', Fecha: {self.fecha_inicio.strftime('%d/%m/%Y')}, Lugar: {self.lugar}."
-            Notification.objects.create(message=message)
+            from . import notifications
+            notifications.notificar('evento_nuevo', message, evento=self)
 
-class EventoMobiliario(models.Model):
-    evento = models.ForeignKey(Evento, related_name='mobiliario_asignado', on_delete=models.CASCADE)
+class LineaMobiliario(models.Model):
+    """
+    Mobiliario asignado a un evento o degustación.
+
+    El artículo se guarda como categoría (slug, ej. 'silla') + id, igual que en
+    Reserva y CatalogoItem, con un índice: las líneas se filtran y agrupan por
+    artículo en SQL. El producto y la etiqueta de la categoría se copian al
+    asignar la línea, así los listados no leen las tablas de categoría; al
+    renombrar un artículo se actualizan sus líneas (ver reservations.renombrar).
+    """
+    categoria = models.CharField(max_length=30)
+    item_id = models.PositiveIntegerField()
+    producto = models.CharField(max_length=100)
+    categoria_etiqueta = models.CharField(max_length=50, blank=True)
     cantidad = models.PositiveIntegerField()
 
-    # Generic foreign key to link to any inventory item model
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
-    object_id = models.PositiveIntegerField()
-    content_object = GenericForeignKey('content_type', 'object_id')
+    class Meta:
+        abstract = True
+
+    @property
+    def content_type_id(self):
+        # Id del ContentType de la categoría, como lo envía y recibe el frontend
+        # (ContentTypeManager lo guarda en memoria: no consulta por línea)
+        return ContentType.objects.get_by_natural_key(self._meta.app_label, self.categoria).pk
+
+
+class EventoMobiliario(LineaMobiliario):
+    evento = models.ForeignKey(Evento, related_name='mobiliario_asignado', on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['categoria', 'item_id'], name='eventomob_item_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.cantidad} x {self.content_object.producto} para {self.evento.nombre}'
+        return f'{self.cantidad} x {self.producto} para {self.evento.nombre}'
 
 
-class Degustacion(models.Model):
+class Degustacion(RastreoCamposMixin, models.Model):
     ESTADO_CHOICES = [
         ('Por iniciar', 'Por iniciar'),
         ('En proceso', 'En proceso'),
@@ -273,38 +354,103 @@ class Degustacion(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['fecha_degustacion', 'updated_at'], name='degustacion_fecha_idx'),
+        ]
+
     def __str__(self):
         return self.nombre
 
     def save(self, *args, **kwargs):
-        if self.pk:
-            try:
-                degustacion_anterior = Degustacion.objects.get(pk=self.pk)
-                if degustacion_anterior.estado not in ['Finalizado', 'Cancelado'] and self.estado in ['Finalizado', 'Cancelado']:
-                    for item_asignado in self.mobiliario_asignado.all():
-                        if item_asignado.content_object:
-                            item_asignado.content_object.cantidad += item_asignado.cantidad
-                            item_asignado.content_object.save()
+        if self.pk and self.ha_cambiado('estado'):
+            if self.valor_original('estado') not in ['Finalizado', 'Cancelado'] and self.estado in ['Finalizado', 'Cancelado']:
+                from . import availability, notifications
+                availability.liberar(self.reservas.all(), cancelado=self.estado == 'Cancelado')
+                if self.estado == 'Cancelado':
                     self.mobiliario_asignado.all().delete()
 
-                    if self.estado == 'Finalizado':
-                        message = f"La degustación del evento '{self.nombre}' ha finalizado."
-                        Notification.objects.create(message=message)
-            except Degustacion.DoesNotExist:
-                pass
+                if self.estado == 'Finalizado':
+                    message = f"La degustación del evento '{self.nombre}' ha finalizado."
+                    notifications.notificar('degustacion_finalizada', message, degustacion=self)
 
         super().save(*args, **kwargs)
 
-class DegustacionMobiliario(models.Model):
+class DegustacionMobiliario(LineaMobiliario):
     degustacion = models.ForeignKey(Degustacion, related_name='mobiliario_asignado', on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['categoria', 'item_id'], name='degustacionmob_item_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.cantidad} x {self.producto} para {self.degustacion.nombre}'
+
+
+class Reserva(models.Model):
+    """
+    Unidades de un artículo apartadas para un evento o degustación en un intervalo.
+
+    El intervalo [inicio, fin) ya incluye los márgenes de montaje y desmontaje
+    (ver availability.py). La disponibilidad de un artículo en una ventana es su
+    `cantidad` menos el máximo de unidades reservadas simultáneamente en ella.
+    """
+    categoria = models.CharField(max_length=30)
+    item_id = models.PositiveIntegerField()
     cantidad = models.PositiveIntegerField()
+    inicio = models.DateTimeField()
+    fin = models.DateTimeField()
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, null=True, blank=True, related_name='reservas')
+    degustacion = models.ForeignKey(Degustacion, on_delete=models.CASCADE, null=True, blank=True, related_name='reservas')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['categoria', 'item_id', 'fin', 'inicio'], name='reserva_item_ventana_idx'),
+            models.Index(fields=['inicio', 'fin'], name='reserva_ventana_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cantidad} x {self.categoria}#{self.item_id} ({self.inicio:%d/%m/%Y %H:%M} - {self.fin:%d/%m/%Y %H:%M})"
+
+
+class StockMovement(models.Model):
+    """
+    Bitácora de solo inserción con cada cambio de stock de un artículo.
+
+    `delta` es el cambio en `cantidad` y `delta_mantenimiento` el cambio en
+    `cantidad_en_mantenimiento`. El producto y la bodega se copian al momento del
+    movimiento para que el historial sobreviva a cambios o borrados del artículo.
+    """
+    MOTIVO_CHOICES = [
+        ('mantenimiento', 'Ingreso a mantenimiento'),
+        ('reintegro', 'Salida de mantenimiento'),
+        ('reserva', 'Reserva'),
+        ('liberacion', 'Liberación de reserva'),
+        ('ajuste', 'Ajuste'),
+    ]
+
+    categoria = models.CharField(max_length=30)
+    item_id = models.PositiveIntegerField()
+    producto = models.CharField(max_length=100)
+    bodega = models.ForeignKey(Bodega, on_delete=models.SET_NULL, null=True, blank=True, related_name='movimientos')
+    delta = models.IntegerField(default=0)
+    delta_mantenimiento = models.IntegerField(default=0)
+    motivo = models.CharField(max_length=20, choices=MOTIVO_CHOICES)
+    evento = models.ForeignKey(Evento, on_delete=models.SET_NULL, null=True, blank=True, related_name='movimientos')
+    degustacion = models.ForeignKey(Degustacion, on_delete=models.SET_NULL, null=True, blank=True, related_name='movimientos')
+    created_at = models.DateTimeField(auto_now_add=True)
 
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
-    object_id = models.PositiveIntegerField()
-    content_object = GenericForeignKey('content_type', 'object_id')
+    class Meta:
+        indexes = [
+            models.Index(fields=['categoria', 'created_at'], name='stockmov_categoria_fecha_idx'),
+            models.Index(fields=['motivo', 'created_at'], name='stockmov_motivo_fecha_idx'),
+            models.Index(fields=['categoria', 'item_id', 'created_at'], name='stockmov_item_fecha_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.cantidad} x {self.content_object.producto} para {self.degustacion.nombre}'
+        return f"{self.get_motivo_display()}: {self.delta:+d} {self.producto}"
 
 
 class Product(models.Model):
@@ -317,13 +463,234 @@ class Product(models.Model):
         return self.name
 
 class Notification(models.Model):
+    """
+    Notificación para los usuarios del inventario.
+
+    Además del texto guarda su tipo, severidad y referencias (artículo por
+    categoría + id, evento o degustación) para filtrarlas con índices en lugar de
+    buscar dentro de `message`. Se crean con `notifications.notificar`.
+    """
+    TIPO_CHOICES = [
+        ('evento_nuevo', 'Nuevo evento'),
+        ('evento_finalizado', 'Evento finalizado'),
+        ('degustacion_finalizada', 'Degustación finalizada'),
+        ('mantenimiento_entrada', 'Ingreso a mantenimiento'),
+        ('mantenimiento_salida', 'Salida de mantenimiento'),
+        ('bajo_stock', 'Bajo stock'),
+        ('general', 'General'),
+    ]
+    SEVERIDAD_CHOICES = [
+        ('info', 'Información'),
+        ('aviso', 'Aviso'),
+        ('critico', 'Crítico'),
+    ]
+
     message = models.TextField()
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES, default='general')
+    severidad = models.CharField(max_length=10, choices=SEVERIDAD_CHOICES, default='info')
+    categoria = models.CharField(max_length=30, blank=True, default='')
+    item_id = models.PositiveIntegerField(null=True, blank=True)
+    evento = models.ForeignKey(Evento, on_delete=models.SET_NULL, null=True, blank=True, related_name='notificaciones')
+    degustacion = models.ForeignKey(Degustacion, on_delete=models.SET_NULL, null=True, blank=True, related_name='notificaciones')
+    cantidad = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='notification_fecha_id_idx'),
+            models.Index(fields=['tipo', 'created_at', 'id'], name='notification_tipo_fecha_idx'),
+            models.Index(fields=['categoria', 'item_id', 'created_at'], name='notification_item_fecha_idx'),
+        ]
 
     def __str__(self):
         return self.message
 
+
+class NotificationReadState(models.Model):
+    """
+    Estado de lectura de las notificaciones de un usuario.
+
+    Todas las notificaciones con id <= `leido_hasta` están leídas; las leídas
+    una por una por encima de esa marca se guardan en NotificationRead. Marcar
+    todas como leídas sólo mueve la marca.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_read_state')
+    leido_hasta = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}: hasta {self.leido_hasta}"
+
+
+class NotificationRead(models.Model):
+    """Notificación leída individualmente por encima de la marca del usuario."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_reads')
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='lecturas')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'notification'], name='notification_read_unica'),
+        ]
+
+
+class NotificationResumenMensual(models.Model):
+    """
+    Conteo mensual de las notificaciones depuradas por tipo y severidad.
+
+    Lo llena `retention.purgar` antes de borrar las notificaciones vencidas, así
+    el historial se conserva sin que la tabla de notificaciones crezca.
+    """
+    mes = models.DateField()
+    tipo = models.CharField(max_length=30, choices=Notification.TIPO_CHOICES)
+    severidad = models.CharField(max_length=10, choices=Notification.SEVERIDAD_CHOICES)
+    total = models.PositiveIntegerField(default=0)
+    primera = models.DateTimeField()
+    ultima = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['mes', 'tipo', 'severidad'], name='notification_resumen_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%Y-%m} {self.tipo} ({self.severidad}): {self.total}"
+
+
+def generar_token_feed():
+    import secrets
+    return secrets.token_urlsafe(32)
+
+
+class CalendarFeed(models.Model):
+    """
+    Suscripción iCalendar (.ics) de un usuario, con sus filtros.
+
+    El `token` va en la URL porque las apps de calendario no envían encabezados
+    de autenticación; borrar el feed revoca el acceso.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='calendar_feeds')
+    nombre = models.CharField(max_length=100, default='Banquetes')
+    token = models.CharField(max_length=64, unique=True, default=generar_token_feed, editable=False)
+    estado = models.CharField(max_length=20, choices=Evento.ESTADO_CHOICES, blank=True, default='')
+    tipo_evento = models.ForeignKey(TipoEvento, on_delete=models.CASCADE, null=True, blank=True)
+    responsable = models.CharField(max_length=100, blank=True, default='')
+    incluir_degustaciones = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.user})"
+
+
+class AlertaStockPendiente(models.Model):
+    """
+    Alerta de bajo stock en espera de ser incluida en un resumen.
+
+    Hay a lo sumo una por artículo: si vuelve a cruzar el umbral antes del
+    resumen sólo se actualiza la cantidad.
+    """
+    categoria = models.CharField(max_length=30)
+    item_id = models.PositiveIntegerField()
+    producto = models.CharField(max_length=100)
+    cantidad = models.IntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['categoria', 'item_id'], name='alerta_stock_item_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.producto}: {self.cantidad}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Bandeja de salida de correos.
+
+    Los correos se encolan en la misma transacción que los origina y el comando
+    `send_outbox` los envía por lotes. Un correo que falla se reintenta con
+    espera exponencial y, al agotar los intentos, queda como 'fallido'.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    asunto = models.CharField(max_length=255)
+    cuerpo = models.TextField()
+    remitente = models.CharField(max_length=255, blank=True)
+    # Destinatarios explícitos o un grupo que se resuelve al enviar (ver outbox.py)
+    para = models.JSONField(default=list, blank=True)
+    grupo = models.CharField(max_length=30, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente')
+    intentos = models.PositiveIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    enviado_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='outbox_pendientes_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} ({self.estado})"
+
+
+class ReportJob(models.Model):
+    """
+    Reporte pesado (PDF/Excel) generado en segundo plano (ver jobs.py).
+
+    La `huella` resume el tipo, el formato, los parámetros y la versión de los
+    datos: peticiones idénticas comparten el trabajo y su archivo mientras no
+    venza. El comando `run_report_jobs` los procesa con un grupo de procesos.
+    """
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('listo', 'Listo'),
+        ('fallido', 'Fallido'),
+        ('vencido', 'Vencido'),
+    ]
+    # Estados en que un trabajo atiende a las peticiones con su huella
+    ESTADOS_VIGENTES = ('pendiente', 'procesando', 'listo')
+
+    tipo = models.CharField(max_length=30)
+    formato = models.CharField(max_length=10)
+    parametros = models.JSONField(default=dict, blank=True)
+    huella = models.CharField(max_length=64)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente')
+    solicitado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_jobs')
+    archivo = models.FileField(upload_to='reportes/', blank=True)
+    nombre_archivo = models.CharField(max_length=255, blank=True)
+    intentos = models.PositiveIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True)
+    # Un worker que muere deja el trabajo 'procesando'; al vencer la reserva lo toma otro
+    reservado_hasta = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    terminado_at = models.DateTimeField(null=True, blank=True)
+    expira_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'created_at'], name='report_job_cola_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['huella'], condition=models.Q(estado__in=['pendiente', 'procesando', 'listo']),
+                name='report_job_huella_vigente',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.formato} ({self.estado})"
+
+
 class HomeSection(models.Model):
     SECTION_CHOICES = [
         ('about', 'Sobre Nosotros'),
@@ -0,0 +1,96 @@
+"""
+Creación de notificaciones y su estado de lectura por usuario.
+
+Las notificaciones se crean con `notificar`, que les da un tipo, una severidad
+y referencias consultables (artículo, evento o degustación).
+
+Cada usuario tiene una marca `leido_hasta` (NotificationReadState) y una lista
+corta de excepciones (NotificationRead) con las notificaciones posteriores que
+leyó una por una. Una notificación está leída si su id es <= la marca o si está
+entre las excepciones, así:
+
+* marcar todas como leídas es O(1): se mueve la marca al id máximo y se borran
+  las excepciones que quedan debajo;
+* contar las no leídas recorre sólo el rango de la llave primaria por encima de
+  la marca, sin importar cuántas notificaciones haya en total.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Notification, NotificationRead, NotificationReadState
+
+# Severidad de cada tipo cuando quien notifica no indica otra
+SEVERIDAD_POR_TIPO = {
+    'bajo_stock': 'aviso',
+}
+
+
+def notificar(tipo, message, item=None, llave=None, evento=None, degustacion=None, cantidad=None, severidad=None):
+    """
+    Crea una notificación tipada.
+
+    Args:
+        tipo (str): Uno de Notification.TIPO_CHOICES
+        item: Instancia de un modelo de categoría de inventario al que se refiere
+        llave (tuple): (categoria, item_id) del artículo, si no se tiene la instancia
+        cantidad (int): Unidades involucradas (mantenimiento, stock restante)
+        severidad (str): Si se omite, la de SEVERIDAD_POR_TIPO o 'info'
+    """
+    if item is not None:
+        llave = (item._meta.model_name, item.pk)
+    categoria, item_id = llave or ('', None)
+    return Notification.objects.create(
+        message=message,
+        tipo=tipo,
+        severidad=severidad or SEVERIDAD_POR_TIPO.get(tipo, 'info'),
+        categoria=categoria,
+        item_id=item_id,
+        evento=evento,
+        degustacion=degustacion,
+        cantidad=cantidad,
+    )
+
+
+def estado_de(user):
+    estado, _ = NotificationReadState.objects.get_or_create(user=user)
+    return estado
+
+
+def excepciones(user, leido_hasta):
+    """Ids leídos individualmente por encima de la marca."""
+    return set(
+        NotificationRead.objects.filter(user=user, notification_id__gt=leido_hasta)
+        .values_list('notification_id', flat=True)
+    )
+
+
+def no_leidas(user, estado=None):
+    """Queryset de las notificaciones que `user` no ha leído."""
+    estado = estado or estado_de(user)
+    return Notification.objects.filter(id__gt=estado.leido_hasta).exclude(
+        id__in=NotificationRead.objects.filter(user=user, notification_id__gt=estado.leido_hasta)
+        .values('notification_id')
+    )
+
+
+def contar_no_leidas(user):
+    return no_leidas(user).count()
+
+
+@transaction.atomic
+def marcar_todas(user):
+    """Marca como leídas todas las notificaciones existentes para `user`."""
+    ultimo = Notification.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+    estado = estado_de(user)
+    if ultimo > estado.leido_hasta:
+        estado.leido_hasta = ultimo
+        estado.save(update_fields=['leido_hasta', 'updated_at'])
+    NotificationRead.objects.filter(user=user, notification_id__lte=ultimo).delete()
+    return estado
+
+
+def marcar(user, notification):
+    """Marca una notificación como leída para `user`."""
+    estado = estado_de(user)
+    if notification.id > estado.leido_hasta:
+        NotificationRead.objects.get_or_create(user=user, notification=notification)
@@ -0,0 +1,158 @@
+"""
+Bandeja de salida de correos (EmailOutbox).
+
+Las vistas y los modelos sólo encolan: `encolar` inserta una fila en la
+transacción actual, así que si la transacción se revierte el correo tampoco se
+envía. El comando `send_outbox` llama a `enviar_pendientes`, que toma un lote de
+correos vencidos y los envía por una sola conexión SMTP reutilizada.
+
+Un envío fallido se reintenta después de EMAIL_OUTBOX_BACKOFF_SECONDS * 2^(intentos - 1)
+segundos; al llegar a EMAIL_OUTBOX_MAX_ATTEMPTS el correo queda 'fallido'.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+GRUPO_ADMINS = 'admins'
+
+MAX_INTENTOS = 5
+BACKOFF_SEGUNDOS = 60
+BACKOFF_MAXIMO_SEGUNDOS = 6 * 60 * 60
+# Tiempo que un lote tomado por un worker queda apartado de los demás
+RESERVA_SEGUNDOS = 5 * 60
+
+
+def encolar(asunto, cuerpo, para=None, grupo='', remitente=None):
+    """
+    Guarda un correo en la bandeja de salida.
+
+    Args:
+        para (list): Correos destinatarios
+        grupo (str): Grupo de destinatarios resuelto al enviar (ej. GRUPO_ADMINS)
+    """
+    return EmailOutbox.objects.create(
+        asunto=asunto,
+        cuerpo=cuerpo,
+        para=list(para or []),
+        grupo=grupo,
+        remitente=remitente or '',
+    )
+
+
+def destinatarios_de_grupo(grupo):
+    """Correos de los usuarios de un grupo de destinatarios."""
+    if grupo == GRUPO_ADMINS:
+        return list(
+            User.objects.filter(profile__rol__in=['admin', 'Encargado'], email__isnull=False)
+            .exclude(email='').values_list('email', flat=True)
+        )
+    return []
+
+
+def espera_reintento(intentos):
+    base = getattr(settings, 'EMAIL_OUTBOX_BACKOFF_SECONDS', BACKOFF_SEGUNDOS)
+    return timedelta(seconds=min(base * 2 ** (intentos - 1), BACKOFF_MAXIMO_SEGUNDOS))
+
+
+def reclamar(lote):
+    """
+    Aparta hasta `lote` correos vencidos para este worker.
+
+    Se les mueve `proximo_intento` hacia adelante para que otro worker no los
+    tome mientras se envían; si el worker muere, vuelven a estar disponibles al
+    vencer la reserva.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(estado='pendiente', proximo_intento__lte=ahora)
+            .order_by('proximo_intento', 'id')
+            .values_list('id', flat=True)[:lote]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(
+            proximo_intento=ahora + timedelta(seconds=RESERVA_SEGUNDOS)
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by('id'))
+
+
+def enviar_pendientes(lote=50, conexion=None):
+    """
+    Envía un lote de correos pendientes usando una sola conexión.
+
+    Returns:
+        dict: Número de correos enviados, reintentados y fallidos
+    """
+    correos = reclamar(lote)
+    resultado = {'enviados': 0, 'reintentos': 0, 'fallidos': 0}
+    if not correos:
+        return resultado
+
+    max_intentos = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', MAX_INTENTOS)
+    grupos = {}
+    conexion = conexion or get_connection()
+
+    try:
+        conexion.open()
+    except Exception as e:
+        # Sin conexión no se intenta ningún correo; se liberan para el siguiente ciclo
+        logger.error(f"No se pudo abrir la conexión de correo: {e}")
+        EmailOutbox.objects.filter(id__in=[c.id for c in correos]).update(proximo_intento=timezone.now())
+        return resultado
+
+    try:
+        for correo in correos:
+            para = list(correo.para)
+            if correo.grupo:
+                if correo.grupo not in grupos:
+                    grupos[correo.grupo] = destinatarios_de_grupo(correo.grupo)
+                para += grupos[correo.grupo]
+
+            if not para:
+                logger.warning(f"Correo {correo.id} sin destinatarios; se descarta")
+                correo.estado = 'fallido'
+                correo.ultimo_error = 'Sin destinatarios'
+                correo.save(update_fields=['estado', 'ultimo_error'])
+                resultado['fallidos'] += 1
+                continue
+
+            mensaje = EmailMessage(
+                subject=correo.asunto,
+                body=correo.cuerpo,
+                from_email=correo.remitente or settings.DEFAULT_FROM_EMAIL,
+                to=para,
+                connection=conexion,
+            )
+            try:
+                mensaje.send(fail_silently=False)
+            except Exception as e:
+                correo.intentos += 1
+                correo.ultimo_error = str(e)
+                if correo.intentos >= max_intentos:
+                    correo.estado = 'fallido'
+                    resultado['fallidos'] += 1
+                    logger.error(f"Correo {correo.id} descartado tras {correo.intentos} intentos: {e}")
+                else:
+                    correo.proximo_intento = timezone.now() + espera_reintento(correo.intentos)
+                    resultado['reintentos'] += 1
+                correo.save(update_fields=['intentos', 'ultimo_error', 'estado', 'proximo_intento'])
+                continue
+
+            correo.estado = 'enviado'
+            correo.intentos += 1
+            correo.enviado_at = timezone.now()
+            correo.save(update_fields=['estado', 'intentos', 'enviado_at'])
+            resultado['enviados'] += 1
+    finally:
+        conexion.close()
+
+    return resultado
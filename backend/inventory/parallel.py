@@ -0,0 +1,85 @@
+"""
+Consultas de los reportes en paralelo, para las vistas async (ASGI).
+
+Las vistas async de los reportes entre categorías (rutas ``.../async/``) no
+bloquean el ciclo de eventos: cada consulta corre en un grupo de hilos acotado
+(REPORT_FANOUT_THREADS) y las consultas independientes de un reporte, las de
+las categorías (una por tabla sin el catálogo unificado) y las generales (ver
+reports.ReporteCategorias), se lanzan a la vez y se combinan al terminar.
+
+El grupo es compartido por todas las peticiones del proceso, así las conexiones
+a la base de datos abiertas por reportes no pasan de REPORT_FANOUT_THREADS
+aunque lleguen muchas peticiones juntas: las demás consultas esperan turno en la
+cola del grupo. Las vistas sync (WSGI) no cambian.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from . import catalog
+from .categories import CATEGORIAS
+
+HILOS = 4
+
+_grupo = None
+_candado = threading.Lock()
+
+
+def hilos():
+    return getattr(settings, 'REPORT_FANOUT_THREADS', HILOS)
+
+
+def grupo():
+    """Grupo de hilos compartido por las peticiones de este proceso."""
+    global _grupo
+    with _candado:
+        if _grupo is None:
+            _grupo = ThreadPoolExecutor(max_workers=hilos(), thread_name_prefix='reportes')
+        return _grupo
+
+
+def _con_conexion(funcion, *args):
+    try:
+        return funcion(*args)
+    finally:
+        # Cada hilo del grupo conserva su conexión entre consultas (a lo sumo una
+        # por hilo): abrirla en cada consulta costaba más que la consulta misma.
+        # Sólo se descarta si quedó inutilizable.
+        for conexion in connections.all(initialized_only=True):
+            if conexion.errors_occurred and not conexion.is_usable():
+                conexion.close()
+
+
+async def en_hilo(funcion, *args):
+    """Ejecuta `funcion(*args)` en el grupo de hilos sin bloquear el ciclo de eventos."""
+    return await asyncio.get_running_loop().run_in_executor(grupo(), _con_conexion, funcion, *args)
+
+
+async def reunir(*llamadas):
+    """Ejecuta a la vez las llamadas (funcion, *args) y devuelve sus resultados en orden."""
+    return await asyncio.gather(*(en_hilo(*llamada) for llamada in llamadas))
+
+
+def grupos_de_categorias():
+    """
+    Cómo se reparten las categorías entre consultas: con tablas por categoría,
+    una consulta por tabla; con el catálogo unificado, una sola sobre su índice
+    (partirla sólo recorrería la misma tabla varias veces).
+    """
+    if catalog.catalogo_unificado():
+        return [CATEGORIAS]
+    return [[categoria] for categoria in CATEGORIAS]
+
+
+async def calcular(reporte):
+    """Datos de un reports.ReporteCategorias con todas sus consultas a la vez."""
+    grupos = grupos_de_categorias()
+    resultados = await reunir(
+        *((reporte.por_categoria, categorias) for categorias in grupos),
+        *((consulta,) for consulta in reporte.generales),
+    )
+    filas = [fila for parte in resultados[:len(grupos)] for fila in parte]
+    return reporte.combinar(filas, *resultados[len(grupos):])
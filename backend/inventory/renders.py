@@ -0,0 +1,116 @@
+"""
+Caché en disco de los reportes PDF/Excel de cada evento.
+
+El reporte de un evento sólo cambia cuando cambian el evento o su mobiliario.
+`Render` calcula la versión del contenido (hash de los campos del evento que
+salen en el documento, su `updated_at` y las líneas de mobiliario ya resueltas
+en el catálogo) con las mismas dos consultas que necesita el documento, y el
+archivo se guarda en ``REPORT_RENDER_CACHE_DIR/evento_<id>/<versión>.<ext>``.
+La versión sirve también de ETag: si el cliente ya tiene el archivo se responde
+304 sin generar nada.
+
+Al guardar o borrar un evento o sus líneas (señales y reservations.asignar) se
+borra el directorio del evento al confirmarse la transacción; las versiones
+viejas no se volverían a servir de todas formas, sólo se libera el disco.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+
+from . import documents
+
+# Cambiar al modificar el diseño de los documentos para descartar los archivos guardados
+VERSION_PLANTILLA = 1
+
+
+def directorio():
+    return str(getattr(settings, 'REPORT_RENDER_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'renders')))
+
+
+def _directorio_evento(evento_id):
+    return os.path.join(directorio(), f'evento_{evento_id}')
+
+
+def version(evento, lineas):
+    """Hash del contenido del reporte de `evento` con sus `lineas` (ver documents.lineas_de_eventos)."""
+    datos = [
+        VERSION_PLANTILLA, evento.pk, evento.updated_at, evento.nombre,
+        evento.tipo_evento.nombre if evento.tipo_evento else None,
+        evento.responsable, evento.lugar, evento.fecha_inicio, lineas,
+    ]
+    return hashlib.sha256(json.dumps(datos, default=str).encode()).hexdigest()[:32]
+
+
+class Render:
+    """
+    Reporte de un evento en un formato, servido desde el disco.
+
+    Args:
+        evento: Evento (con `tipo_evento` ya cargado de preferencia)
+        formato (str): 'pdf' o 'excel'
+    """
+
+    def __init__(self, evento, formato):
+        self.evento = evento
+        self.formato = formato
+        self.lineas = documents.lineas_de_eventos([evento.pk])[evento.pk]
+        self.version = version(evento, self.lineas)
+        self.ruta = os.path.join(
+            _directorio_evento(evento.pk), f'{self.version}.{documents.EXTENSIONES[formato]}'
+        )
+
+    @property
+    def etag(self):
+        return f'"{self.version}-{self.formato}"'
+
+    @property
+    def nombre_archivo(self):
+        return documents.nombre_uso_evento(self.evento, self.formato)
+
+    @property
+    def content_type(self):
+        return documents.CONTENT_TYPES[self.formato]
+
+    def modificado(self):
+        """Fecha en que se generó el archivo, o None si aún no existe."""
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(self.ruta), tz=dt_timezone.utc)
+        except OSError:
+            return None
+
+    def generar(self):
+        """Genera el archivo si no está en el disco y devuelve su ruta."""
+        if os.path.exists(self.ruta):
+            return self.ruta
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        # Un temporal único por llamada (los hilos de un proceso comparten el pid)
+        temporal = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(self.ruta), suffix='.tmp', delete=False) as archivo:
+                temporal = archivo.name
+                documents.GENERADORES_USO_EVENTO[self.formato](self.evento, archivo, self.lineas)
+            # Dos peticiones simultáneas escriben archivos idénticos; el último reemplazo gana
+            os.replace(temporal, self.ruta)
+        finally:
+            if temporal is not None and os.path.exists(temporal):
+                os.remove(temporal)
+        return self.ruta
+
+
+def invalidar(evento_id):
+    """Borra los archivos guardados del evento al confirmarse la transacción."""
+    transaction.on_commit(lambda: shutil.rmtree(_directorio_evento(evento_id), ignore_errors=True))
+
+
+def invalidar_por_evento(sender, instance, **kwargs):
+    invalidar(instance.pk)
+
+
+def invalidar_por_linea(sender, instance, **kwargs):
+    invalidar(instance.evento_id)
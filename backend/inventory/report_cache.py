@@ -0,0 +1,279 @@
+"""
+Caché de resultados de los reportes de inventario.
+
+Cada reporte declara las tablas que lee (`en_cache`). El resultado se guarda en
+el caché de Django junto con la versión de esas tablas en el momento de
+calcularlo, y sólo se sirve mientras las versiones sigan iguales: cualquier
+escritura en una de las tablas invalida exactamente los reportes que la leen.
+
+Versiones:
+
+* Cada tabla tiene una llave de versión en el mismo caché, así todos los
+  workers (gunicorn/uvicorn) comparten la invalidación si el backend es
+  compartido (archivo o base de datos; locmem es por proceso).
+* `invalidar` escribe un valor nuevo y único al confirmarse la transacción. No
+  se usa ``incr`` porque en los backends de archivo y base de datos no es
+  atómico: con un valor único, dos escrituras concurrentes nunca dejan la misma
+  versión que vio un lector.
+* post_save/post_delete invalidan los modelos de `MODELOS_OBSERVADOS`; las
+  escrituras masivas que no disparan señales (stock.ajustar, stock.registrar,
+  catalog.reconstruir, thresholds.recalcular_categoria) llaman a `invalidar`.
+* Las tablas de categoría cuentan como la tabla unificada CatalogoItem: los
+  reportes leen una u otra según INVENTORY_UNIFIED_CATALOG.
+
+Stale-while-revalidate: con INVENTORY_REPORT_CACHE_STALE_SECONDS > 0 un
+resultado obsoleto de a lo sumo esa antigüedad se sirve de inmediato y se
+recalcula en un hilo aparte (uno por reporte y parámetros, con candado en el
+caché). Con 0, el valor por defecto, nunca se sirve un resultado obsoleto.
+
+Las respuestas llevan ``X-Report-Cache: HIT | STALE | MISS`` y los conteos por
+reporte se consultan con ``manage.py report_cache_stats``.
+"""
+import functools
+import hashlib
+import logging
+import secrets
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from rest_framework.response import Response
+
+from .categories import CATEGORIAS
+from .models import Bodega, CatalogoItem, Evento, StockMovement
+
+logger = logging.getLogger(__name__)
+
+ALIAS = 'reports'
+TIMEOUT = 3600
+STALE_SEGUNDOS = 0
+PREFIJO = 'inventory:reportes'
+RESULTADOS = ('hit', 'stale', 'miss')
+PARAMETROS_IGNORADOS = ('export',)
+
+MODELOS_CATEGORIA = tuple(categoria.modelo for categoria in CATEGORIAS)
+MODELOS_OBSERVADOS = (Bodega, CatalogoItem, Evento, StockMovement) + MODELOS_CATEGORIA
+
+# Nombres de los reportes registrados con `en_cache`, para las métricas
+REPORTES = {}
+
+
+def activo():
+    return getattr(settings, 'INVENTORY_REPORT_CACHE', True)
+
+
+def get_cache():
+    alias = getattr(settings, 'INVENTORY_REPORT_CACHE_ALIAS', ALIAS)
+    return caches[alias if alias in settings.CACHES else 'default']
+
+
+def timeout():
+    return getattr(settings, 'INVENTORY_REPORT_CACHE_TIMEOUT', TIMEOUT)
+
+
+def stale_segundos():
+    return getattr(settings, 'INVENTORY_REPORT_CACHE_STALE_SECONDS', STALE_SEGUNDOS)
+
+
+def _tabla(modelo):
+    if modelo in MODELOS_CATEGORIA:
+        return CatalogoItem._meta.db_table
+    return modelo._meta.db_table
+
+
+def _llave_version(tabla):
+    return f'{PREFIJO}:version:{tabla}'
+
+
+def versiones(modelos):
+    """Versión actual de la tabla de cada modelo, con una lectura del caché."""
+    cache = get_cache()
+    llaves = [_llave_version(_tabla(modelo)) for modelo in modelos]
+    valores = cache.get_many(llaves)
+    for llave in llaves:
+        if llave not in valores:
+            # Llave nueva o desalojada: un valor nuevo nunca coincide con uno ya guardado
+            cache.add(llave, secrets.token_hex(8), timeout=None)
+            valores[llave] = cache.get(llave)
+    return tuple(valores[llave] for llave in llaves)
+
+
+def invalidar(*modelos):
+    """Cambia la versión de las tablas de `modelos` al confirmarse la transacción."""
+    llaves = {_llave_version(_tabla(modelo)) for modelo in modelos}
+
+    def cambiar():
+        get_cache().set_many({llave: secrets.token_hex(8) for llave in llaves}, timeout=None)
+
+    transaction.on_commit(cambiar)
+
+
+def invalidar_por_senal(sender, **kwargs):
+    invalidar(sender)
+
+
+def _llave_resultado(nombre, params):
+    # ?export= sólo cambia cómo se entrega el mismo resultado (ver exports.py)
+    params = sorted((llave, valores) for llave, valores in params.lists() if llave not in PARAMETROS_IGNORADOS)
+    firma = hashlib.sha1(repr(params).encode()).hexdigest()
+    return f'{PREFIJO}:resultado:{nombre}:{firma}'
+
+
+def _contar(nombre, resultado):
+    cache = get_cache()
+    llave = f'{PREFIJO}:metricas:{nombre}:{resultado}'
+    # Aproximado en backends sin incr atómico; suficiente para una tasa de aciertos
+    if not cache.add(llave, 1, timeout=None):
+        try:
+            cache.incr(llave)
+        except ValueError:
+            cache.add(llave, 1, timeout=None)
+
+
+def metricas(reiniciar=False):
+    """{reporte: {'hit': n, 'stale': n, 'miss': n}} de los reportes registrados."""
+    cache = get_cache()
+    llaves = {
+        (nombre, resultado): f'{PREFIJO}:metricas:{nombre}:{resultado}'
+        for nombre in REPORTES for resultado in RESULTADOS
+    }
+    valores = cache.get_many(llaves.values())
+    if reiniciar:
+        cache.delete_many(llaves.values())
+    conteos = {nombre: dict.fromkeys(RESULTADOS, 0) for nombre in REPORTES}
+    for (nombre, resultado), llave in llaves.items():
+        conteos[nombre][resultado] = valores.get(llave, 0)
+    return conteos
+
+
+def _guardar(llave, version, datos):
+    get_cache().set(llave, {'versiones': version, 'datos': datos, 'calculado': time.time()}, timeout())
+
+
+def _datos(respuesta):
+    """Datos de la respuesta si se deben guardar (sólo las exitosas), o None."""
+    return respuesta.data if respuesta.status_code == 200 else None
+
+
+def _revalidar(llave, modelos, calcular):
+    """
+    Recalcula en un hilo aparte, a lo sumo uno a la vez por llave.
+
+    `calcular()` devuelve los datos a guardar, o None si no se deben guardar.
+    """
+    cache = get_cache()
+    candado = f'{llave}:recalculando'
+    if not cache.add(candado, 1, timeout=60):
+        return
+
+    def recalcular():
+        try:
+            version = versiones(modelos)
+            datos = calcular()
+            if datos is not None:
+                _guardar(llave, version, datos)
+        except Exception:
+            logger.exception('No se pudo recalcular el reporte %s', llave)
+        finally:
+            cache.delete(candado)
+            connections.close_all()
+
+    threading.Thread(target=recalcular, daemon=True).start()
+
+
+def _buscar(nombre, modelos, params, recalcular):
+    """
+    Busca el resultado guardado del reporte y cuenta si fue hit, stale o miss.
+
+    Con 'stale' lanza `recalcular` en segundo plano (ver `_revalidar`).
+
+    Returns:
+        tuple: (llave, versión actual, entrada guardada o None, resultado)
+    """
+    llave = _llave_resultado(nombre, params)
+    version = versiones(modelos)
+    entrada = get_cache().get(llave)
+
+    if entrada is not None and entrada['versiones'] == version:
+        resultado = 'hit'
+    elif entrada is not None and time.time() - entrada['calculado'] <= stale_segundos():
+        resultado = 'stale'
+        _revalidar(llave, modelos, recalcular)
+    else:
+        resultado = 'miss'
+
+    _contar(nombre, resultado)
+    return llave, version, entrada, resultado
+
+
+def servir(nombre, modelos, request, calcular):
+    """
+    Respuesta del reporte `nombre` desde el caché, o calculada con `calcular()`.
+
+    La versión se lee antes de calcular: si una escritura llega durante el
+    cálculo, el resultado queda guardado con la versión anterior y la siguiente
+    petición lo recalcula.
+    """
+    if not activo():
+        return calcular()
+
+    llave, version, entrada, resultado = _buscar(
+        nombre, modelos, request.query_params, lambda: _datos(calcular())
+    )
+    if resultado == 'miss':
+        respuesta = calcular()
+        datos = _datos(respuesta)
+        if datos is not None:
+            _guardar(llave, version, datos)
+    else:
+        respuesta = Response(entrada['datos'])
+    respuesta['X-Report-Cache'] = resultado.upper()
+    return respuesta
+
+
+async def servir_async(nombre, modelos, request, calcular, *args):
+    """
+    Como `servir`, para las vistas async: `calcular(*args)` es una función
+    ``async def`` que devuelve los datos del reporte. Los accesos al caché (que
+    puede estar en la base de datos) corren en el grupo de hilos de parallel.py.
+
+    Returns:
+        tuple: (datos, resultado) con resultado 'hit', 'stale', 'miss' o None si
+        el caché está desactivado
+    """
+    # parallel importa catalog, que importa este módulo
+    from . import parallel
+
+    if not activo():
+        return await calcular(*args), None
+
+    # La versión sync sólo se construye si hay que revalidar en segundo plano
+    llave, version, entrada, resultado = await parallel.en_hilo(
+        _buscar, nombre, modelos, request.GET, lambda: async_to_sync(calcular)(*args)
+    )
+    if resultado != 'miss':
+        return entrada['datos'], resultado
+    datos = await calcular(*args)
+    await parallel.en_hilo(_guardar, llave, version, datos)
+    return datos, resultado
+
+
+def en_cache(nombre, modelos):
+    """
+    Decorador para el método ``get`` de una APIView de reporte.
+
+    Args:
+        nombre (str): Nombre del reporte en las llaves y las métricas
+        modelos: Modelos cuyas tablas lee el reporte
+    """
+    REPORTES[nombre] = tuple(modelos)
+
+    def decorador(get):
+        @functools.wraps(get)
+        def envoltura(vista, request, *args, **kwargs):
+            return servir(nombre, modelos, request, lambda: get(vista, request, *args, **kwargs))
+        return envoltura
+    return decorador
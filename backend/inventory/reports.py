@@ -0,0 +1,421 @@
+"""
+Consultas de los reportes, agregadas en la base de datos.
+
+Cada función devuelve los datos ya agrupados con un número fijo de consultas,
+sin importar cuántas filas haya en las tablas.
+
+Los reportes entre categorías (`ReporteCategorias`) separan sus consultas en
+una por categoría y otras generales, independientes entre sí: las vistas sync
+las hacen con una consulta para todas las categorías (ver catalog.py) y las
+vistas async las lanzan a la vez (ver parallel.py). Ambas combinan las filas
+con la misma función, así responden lo mismo.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import models
+from django.db.models.functions import RowNumber, TruncMonth, TruncQuarter, TruncYear
+from django.utils import timezone
+
+from . import availability, catalog
+from .categories import CATEGORIAS, get_categoria
+from .models import Bodega, CatalogoItem, Evento, EventoMobiliario, StockMovement
+
+MESES = [
+    'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+    'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre',
+]
+
+TRUNC_POR_PERIODO = {
+    'monthly': TruncMonth,
+    'quarterly': TruncQuarter,
+    'yearly': TruncYear,
+}
+
+
+def etiqueta_periodo(inicio, period_type):
+    """Nombre del periodo que empieza en `inicio`: "Enero 2024", "Q1 2024" o "2024"."""
+    if period_type == 'monthly':
+        return f"{MESES[inicio.month - 1]} {inicio.year}"
+    if period_type == 'quarterly':
+        return f"Q{(inicio.month - 1) // 3 + 1} {inicio.year}"
+    return str(inicio.year)
+
+
+def eventos_en_rango(desde=None, hasta=None):
+    queryset = Evento.objects.all()
+    if desde:
+        queryset = queryset.filter(fecha_inicio__gte=desde)
+    if hasta:
+        queryset = queryset.filter(fecha_inicio__lte=hasta)
+    return queryset
+
+
+def inicio_periodo(fecha, period_type):
+    """Primer día del mes, trimestre o año de `fecha`."""
+    if period_type == 'monthly':
+        return fecha.replace(day=1)
+    if period_type == 'quarterly':
+        return fecha.replace(month=(fecha.month - 1) // 3 * 3 + 1, day=1)
+    return fecha.replace(month=1, day=1)
+
+
+def eventos_por_periodo(period_type, desde=None, hasta=None):
+    """
+    Número de eventos por periodo en orden cronológico, con un solo GROUP BY.
+
+    La base de datos agrupa por día sobre el índice de `fecha_inicio` (a lo
+    sumo 366 filas por año, sin importar cuántos eventos haya) y los días se
+    suman aquí a su periodo. En SQLite, TruncMonth y compañía se evalúan con una
+    función de Python por fila; agrupar por la columna indexada es ~14 veces más
+    rápido con 100k eventos.
+
+    Returns:
+        list: dicts con `period_start` (date) y `count`
+    """
+    por_dia = (
+        eventos_en_rango(desde, hasta)
+        .values('fecha_inicio')
+        .annotate(count=models.Count('id'))
+        .order_by('fecha_inicio')
+    )
+    periodos = {}
+    for fila in por_dia:
+        inicio = inicio_periodo(fila['fecha_inicio'], period_type)
+        periodos[inicio] = periodos.get(inicio, 0) + fila['count']
+    return [{'period_start': inicio, 'count': count} for inicio, count in periodos.items()]
+
+
+def detalle_por_periodo(period_type, desde=None, hasta=None, pagina=1, por_pagina=20):
+    """
+    Página `pagina` de los eventos de cada periodo, con una sola consulta.
+
+    Se numeran los eventos dentro de su periodo con ROW_NUMBER() y se filtra por
+    el rango de la página, así cada periodo trae a lo sumo `por_pagina` eventos.
+
+    Returns:
+        dict: period_start (date) -> lista de eventos
+    """
+    trunc = TRUNC_POR_PERIODO[period_type]
+    primero = (pagina - 1) * por_pagina + 1
+    filas = (
+        eventos_en_rango(desde, hasta)
+        .annotate(
+            period_start=trunc('fecha_inicio'),
+            posicion=models.Window(
+                RowNumber(), partition_by=[trunc('fecha_inicio')], order_by=['fecha_inicio', 'id']
+            ),
+        )
+        .filter(posicion__gte=primero, posicion__lt=primero + por_pagina)
+        .values('period_start', 'id', 'nombre', 'fecha_inicio', 'responsable', 'cantidad_personas')
+        .order_by('period_start', 'fecha_inicio', 'id')
+    )
+    detalle = {}
+    for fila in filas:
+        detalle.setdefault(fila['period_start'], []).append({
+            'id': fila['id'],
+            'nombre': fila['nombre'],
+            'fecha': fila['fecha_inicio'].isoformat(),
+            'responsable': fila['responsable'],
+            'cantidad_personas': fila['cantidad_personas'],
+        })
+    return detalle
+
+
+
+def lineas_en_rango(desde, hasta):
+    """Mobiliario asignado a los eventos con `fecha_inicio` entre `desde` y `hasta` (inclusive)."""
+    return EventoMobiliario.objects.filter(evento__fecha_inicio__range=(desde, hasta))
+
+
+def uso_por_categoria(desde, hasta):
+    """Unidades, eventos y artículos distintos por categoría, en un GROUP BY."""
+    return (
+        lineas_en_rango(desde, hasta)
+        .values('categoria')
+        .annotate(
+            unidades=models.Sum('cantidad'),
+            eventos=models.Count('evento', distinct=True),
+            articulos=models.Count('item_id', distinct=True),
+        )
+        .order_by('categoria')
+    )
+
+
+def uso_por_articulo(desde, hasta):
+    """Unidades y eventos por artículo, en un GROUP BY; los más usados primero."""
+    return (
+        lineas_en_rango(desde, hasta)
+        .values('categoria', 'item_id')
+        .annotate(unidades=models.Sum('cantidad'), eventos=models.Count('evento', distinct=True))
+        .order_by('-unidades', 'categoria', 'item_id')
+    )
+
+
+def _intervalos(filas):
+    # Cada fila es el total de unidades de los eventos que empiezan a la misma hora
+    for fila in filas:
+        inicio, fin = availability.ventana(fila['evento__fecha_inicio'], fila['evento__hora_inicio'])
+        yield inicio, fin, fila['unidades']
+
+
+def picos_por_articulo(desde, hasta, llaves=None):
+    """
+    Máximo de unidades de cada artículo en uso al mismo tiempo, según la
+    ventana de cada evento (con montaje y desmontaje, ver availability.ventana).
+
+    SQL agrupa las líneas por artículo y hora de inicio; el barrido recorre esos
+    grupos, no las líneas.
+
+    Args:
+        llaves: Pares (categoria, item_id) a calcular (por defecto, todos)
+
+    Returns:
+        dict: {(categoria, item_id): (unidades, fecha en que empieza el pico)}
+    """
+    lineas = lineas_en_rango(desde, hasta)
+    if llaves is not None:
+        lineas = lineas.filter(catalog.filtro_llaves(llaves))
+    por_articulo = defaultdict(list)
+    for fila in (
+        lineas.values('categoria', 'item_id', 'evento__fecha_inicio', 'evento__hora_inicio')
+        .annotate(unidades=models.Sum('cantidad'))
+        .order_by()
+    ):
+        por_articulo[(fila['categoria'], fila['item_id'])].append(fila)
+
+    picos = {}
+    for llave, filas in por_articulo.items():
+        instante, unidades = max(availability.barrido(_intervalos(filas)), key=lambda punto: punto[1])
+        picos[llave] = (unidades, timezone.localtime(instante).date())
+    return picos
+
+
+def picos_por_dia(desde, hasta):
+    """
+    Máximo de unidades (de todos los artículos) fuera de bodega al mismo tiempo
+    en cada día del rango, con el mismo barrido sobre las líneas agrupadas por
+    hora de inicio de los eventos.
+
+    Returns:
+        dict: fecha -> unidades, para cada día entre `desde` y `hasta`
+    """
+    filas = (
+        lineas_en_rango(desde, hasta)
+        .values('evento__fecha_inicio', 'evento__hora_inicio')
+        .annotate(unidades=models.Sum('cantidad'))
+        .order_by()
+    )
+    dias = {desde + timedelta(days=n): 0 for n in range((hasta - desde).days + 1)}
+    puntos = list(availability.barrido(_intervalos(filas)))
+    # Las unidades de cada punto se mantienen hasta el siguiente; un tramo puede abarcar varios días
+    for (instante, unidades), (siguiente, _) in zip(puntos, puntos[1:]):
+        if not unidades:
+            continue
+        dia = max(timezone.localtime(instante).date(), desde)
+        ultimo = min(timezone.localtime(siguiente - timedelta(microseconds=1)).date(), hasta)
+        while dia <= ultimo:
+            dias[dia] = max(dias[dia], unidades)
+            dia += timedelta(days=1)
+    return dias
+
+class ReporteCategorias:
+    """
+    Reporte que cruza las categorías de inventario.
+
+    Args:
+        por_categoria: función(categorias) -> lista de filas de esas categorías
+        combinar: función(filas, *generales) -> datos del reporte
+        generales: funciones sin argumentos con las demás consultas; sus
+            resultados llegan a `combinar` después de las filas
+    """
+
+    def __init__(self, por_categoria, combinar, generales=()):
+        self.por_categoria = por_categoria
+        self.combinar = combinar
+        self.generales = tuple(generales)
+
+    def calcular(self):
+        """Datos del reporte con las consultas una tras otra."""
+        return self.combinar(self.por_categoria(CATEGORIAS), *(consulta() for consulta in self.generales))
+
+
+def _bajo_stock(categorias):
+    return list(catalog.bajo_stock(categorias=categorias))
+
+
+def _combinar_bajo_stock(items):
+    low_stock_items = []
+    for item in items:
+        categoria = get_categoria(item['categoria'])
+        low_stock_items.append({
+            'id': item['item_id'],
+            'categoria': categoria.etiqueta,
+            'nombre': item['producto'],
+            'descripcion': item['descripcion'],
+            'cantidad_actual': item['cantidad'],
+            'stock_minimo': item['umbral'],
+            'bodega_id': item['bodega_id'],
+            'bodega_nombre': item['bodega__nombre'] or 'No especificada',
+            'tipo': categoria.slug
+        })
+
+    # Sort by category and then by current quantity (ascending)
+    low_stock_items.sort(key=lambda x: (x['categoria'], x['cantidad_actual']))
+    return low_stock_items
+
+
+BAJO_STOCK = ReporteCategorias(_bajo_stock, _combinar_bajo_stock)
+
+
+def _en_mantenimiento(categorias):
+    return list(catalog.consultar(models.Q(cantidad_en_mantenimiento__gt=0), categorias=categorias))
+
+
+def _actividad_mantenimiento():
+    """Entradas y salidas de mantenimiento de los últimos 30 días: un recorrido por rango del historial."""
+    end_date = timezone.now()
+    start_date = end_date - timedelta(days=30)
+    disponible = CatalogoItem.objects.filter(
+        categoria=models.OuterRef('categoria'), item_id=models.OuterRef('item_id')
+    )
+    return list(StockMovement.objects.filter(
+        motivo__in=['mantenimiento', 'reintegro'],
+        created_at__range=(start_date, end_date)
+    ).annotate(
+        cantidad_disponible=models.Subquery(disponible.values('cantidad')[:1]),
+        bodega_actual_id=models.Subquery(disponible.values('bodega_id')[:1]),
+        bodega_actual=models.Subquery(disponible.values('bodega__nombre')[:1]),
+    ).order_by('-created_at').values(
+        'id', 'categoria', 'item_id', 'producto', 'delta_mantenimiento', 'motivo', 'created_at',
+        'cantidad_disponible', 'bodega_actual_id', 'bodega_actual'
+    ))
+
+
+def _combinar_mantenimiento(items, movimientos):
+    maintenance_items = []
+
+    # 1. Items currently in maintenance
+    for item in items:
+        categoria = get_categoria(item['categoria'])
+        maintenance_items.append({
+            'id': item['item_id'],
+            'categoria': categoria.etiqueta,
+            'nombre': item['producto'],
+            'descripcion': item['descripcion'],
+            'cantidad_en_mantenimiento': item['cantidad_en_mantenimiento'],
+            'cantidad_disponible': item['cantidad'],
+            'bodega_id': item['bodega_id'],
+            'bodega_nombre': item['bodega__nombre'] or 'No especificada',
+            'estado': 'En Mantenimiento',
+            'fecha': item['updated_at'].isoformat() if item['updated_at'] else None,
+            'tipo': categoria.slug
+        })
+
+    # 2. Maintenance activity in the last 30 days
+    en_mantenimiento = {(item['tipo'], item['id']) for item in maintenance_items}
+    for movimiento in movimientos:
+        # Avoid duplicates with items currently in maintenance
+        if (movimiento['categoria'], movimiento['item_id']) in en_mantenimiento:
+            continue
+        categoria = get_categoria(movimiento['categoria'])
+        maintenance_items.append({
+            'id': f"mov_{movimiento['id']}",
+            'categoria': categoria.etiqueta if categoria else movimiento['categoria'],
+            'nombre': movimiento['producto'],
+            'descripcion': '',
+            'cantidad_en_mantenimiento': abs(movimiento['delta_mantenimiento']),
+            'cantidad_disponible': movimiento['cantidad_disponible'] or 0,
+            'bodega_id': movimiento['bodega_actual_id'],
+            'bodega_nombre': movimiento['bodega_actual'] or 'No especificada',
+            'estado': 'Ingresó a Mantenimiento' if movimiento['motivo'] == 'mantenimiento' else 'Salió de Mantenimiento',
+            'fecha': movimiento['created_at'].isoformat(),
+            'tipo': movimiento['categoria']
+        })
+
+    # Sort by date (most recent first) and then by category
+    maintenance_items.sort(key=lambda x: (x.get('fecha', ''), x['categoria']), reverse=True)
+    return maintenance_items
+
+
+MANTENIMIENTO = ReporteCategorias(_en_mantenimiento, _combinar_mantenimiento, [_actividad_mantenimiento])
+
+
+def _totales_bodegas(categorias):
+    return list(catalog.totales(
+        ('bodega_id', 'categoria'),
+        categorias=categorias,
+        cantidad=models.Sum('cantidad'),
+        mantenimiento=models.Sum('cantidad_en_mantenimiento'),
+    ))
+
+
+def _bodegas():
+    return list(Bodega.objects.order_by('id').values('id', 'nombre', 'ubicacion'))
+
+
+def _combinar_bodegas(filas, bodegas):
+    por_bodega = {}
+    por_categoria = {}
+    total_inventory = total_mantenimiento = 0
+    for fila in filas:
+        cantidad, mantenimiento = fila['cantidad'] or 0, fila['mantenimiento'] or 0
+        por_bodega[(fila['bodega_id'], fila['categoria'])] = (cantidad, mantenimiento)
+        acumulado = por_categoria.get(fila['categoria'], (0, 0))
+        por_categoria[fila['categoria']] = (acumulado[0] + cantidad, acumulado[1] + mantenimiento)
+        total_inventory += cantidad
+        total_mantenimiento += mantenimiento
+
+    def porcentaje(parte, total):
+        return round((parte / total) * 100, 2) if total > 0 else 0
+
+    report_data = []
+    asignado = 0
+    for bodega in bodegas:
+        category_details = []
+        bodega_total = bodega_mantenimiento = 0
+        for categoria in CATEGORIAS:
+            cantidad, mantenimiento = por_bodega.get((bodega['id'], categoria.slug), (0, 0))
+            bodega_total += cantidad
+            bodega_mantenimiento += mantenimiento
+            category_details.append({
+                'categoria': categoria.nombre,
+                'cantidad': cantidad,
+                'cantidad_en_mantenimiento': mantenimiento,
+            })
+        # Category percentages within this warehouse
+        for category in category_details:
+            category['percentage'] = porcentaje(category['cantidad'], bodega_total)
+        asignado += bodega_total
+
+        report_data.append({
+            **bodega,
+            'total_items': bodega_total,
+            'total_mantenimiento': bodega_mantenimiento,
+            'percentage': porcentaje(bodega_total, total_inventory),
+            'categories': category_details
+        })
+
+    categories = [
+        {
+            'categoria': categoria.nombre,
+            'slug': categoria.slug,
+            'cantidad': por_categoria.get(categoria.slug, (0, 0))[0],
+            'cantidad_en_mantenimiento': por_categoria.get(categoria.slug, (0, 0))[1],
+            'percentage': porcentaje(por_categoria.get(categoria.slug, (0, 0))[0], total_inventory),
+        }
+        for categoria in CATEGORIAS
+    ]
+
+    return {
+        'total_inventory': total_inventory,
+        'total_mantenimiento': total_mantenimiento,
+        # Artículos sin bodega asignada: cuentan en el total pero en ninguna bodega
+        'sin_bodega': total_inventory - asignado,
+        'warehouses': report_data,
+        'categories': categories,
+    }
+
+
+# Totales por (bodega, categoría) en un GROUP BY; la otra consulta sólo lee los nombres de las bodegas
+BODEGAS = ReporteCategorias(_totales_bodegas, _combinar_bodegas, [_bodegas])
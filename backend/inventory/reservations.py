@@ -0,0 +1,139 @@
+"""
+Servicio de reservas de mobiliario compartido por eventos y degustaciones.
+
+Un pedido de N líneas cuesta O(categorías) consultas:
+
+1. Los artículos se leen con ``select_for_update().in_bulk()`` una vez por
+   categoría. Las categorías se recorren por slug y los ids en orden ascendente,
+   así dos pedidos concurrentes bloquean las filas en el mismo orden y no pueden
+   interbloquearse.
+2. Con las filas bloqueadas se calcula la disponibilidad en la ventana con una
+   sola consulta de reservas. Un segundo pedido sobre los mismos artículos espera
+   al primero, por lo que no se puede sobrevender.
+3. Las líneas de mobiliario y las reservas se crean con ``bulk_create``. Cada
+   línea lleva copiados el producto y la etiqueta de la categoría, tomados de
+   los artículos ya bloqueados (o, sin validación, de una consulta al catálogo).
+
+En SQLite ``select_for_update`` no hace nada; ahí la serialización la da el modo
+de transacción IMMEDIATE configurado en DATABASES.
+"""
+from . import availability, catalog, renders
+from .categories import get_categoria
+from .models import DegustacionMobiliario, EventoMobiliario
+
+TIPOS = {
+    'evento': ('evento', EventoMobiliario),
+    'degustacion': ('degustacion', DegustacionMobiliario),
+}
+
+ARTICULO_ELIMINADO = 'Artículo eliminado'
+
+
+def _etiqueta(slug):
+    categoria = get_categoria(slug)
+    return categoria.etiqueta if categoria else ''
+
+
+def bloquear(llaves):
+    """
+    Lee y bloquea los artículos indicados, en orden determinista.
+
+    Returns:
+        dict: {(categoria, item_id): item}. Los artículos inexistentes no aparecen.
+    """
+    articulos = {}
+    agrupadas = catalog.agrupar_llaves(llaves)
+    for slug in sorted(agrupadas):
+        categoria = get_categoria(slug)
+        if categoria is None:
+            continue
+        ids = sorted(agrupadas[slug])
+        encontrados = categoria.modelo.objects.select_for_update().order_by('pk').in_bulk(ids)
+        for item_id, item in encontrados.items():
+            articulos[(slug, item_id)] = item
+    return articulos
+
+
+class Pedido:
+    """
+    Mobiliario solicitado para un evento o una degustación en una fecha.
+
+    Uso dentro de una transacción:
+
+        pedido = Pedido('evento', mobiliario_data, fecha, hora)
+        error = pedido.validar()
+        ...
+        pedido.asignar(evento)
+    """
+
+    def __init__(self, tipo, mobiliario_data, fecha, hora, excluir=None):
+        self.tipo = tipo
+        self.lineas = availability.lineas_de_mobiliario(mobiliario_data)
+        self.inicio, self.fin = availability.ventana(fecha, hora, tipo)
+        self.excluir = excluir
+        # {(categoria, item_id): item} leídos y bloqueados por `validar`
+        self.articulos = None
+
+    def validar(self):
+        """
+        Bloquea los artículos del pedido y verifica su disponibilidad.
+
+        Returns:
+            str | None: Mensaje de error si algún artículo no alcanza
+        """
+        if not self.lineas:
+            return None
+        self.articulos = bloquear(availability.solicitado_por_llave(self.lineas).keys())
+        excluir = {f'excluir_{self.tipo}': self.excluir} if self.excluir is not None else {}
+        return availability.validar(self.lineas, self.inicio, self.fin, articulos=self.articulos, **excluir)
+
+    def productos(self):
+        """{(categoria, item_id): producto} de las líneas, sin consultas si ya se validó."""
+        if self.articulos is not None:
+            return {llave: item.producto for llave, item in self.articulos.items()}
+        return {
+            (articulo['categoria'], articulo['item_id']): articulo['producto']
+            for articulo in catalog.por_llaves(
+                availability.solicitado_por_llave(self.lineas).keys(), campos=('categoria', 'item_id', 'producto'),
+            )
+        }
+
+    def asignar(self, destino, reservar=True, reemplazar=True):
+        """
+        Asigna las líneas del pedido a `destino` y, si `reservar`, crea sus
+        reservas en la ventana. Con `reemplazar` se eliminan antes las líneas y
+        reservas que ya tenía.
+        """
+        campo, modelo_linea = TIPOS[self.tipo]
+        if reemplazar:
+            destino.mobiliario_asignado.all().delete()
+        productos = self.productos() if self.lineas else {}
+        modelo_linea.objects.bulk_create([
+            modelo_linea(
+                **{campo: destino},
+                categoria=linea['categoria'],
+                item_id=linea['item_id'],
+                producto=productos.get((linea['categoria'], linea['item_id']), ARTICULO_ELIMINADO),
+                categoria_etiqueta=_etiqueta(linea['categoria']),
+                cantidad=linea['cantidad'],
+            )
+            for linea in self.lineas
+        ])
+        if self.tipo == 'evento':
+            # bulk_create no dispara post_save
+            renders.invalidar(destino.pk)
+        if reservar:
+            if reemplazar:
+                destino.reservas.all().delete()
+            availability.reservar(self.lineas, self.inicio, self.fin, **{campo: destino})
+
+
+def renombrar(item):
+    """
+    Copia el nombre actual de `item` a las líneas de mobiliario que lo tienen
+    asignado, con un UPDATE por tipo de línea sobre el índice (categoria, item_id).
+    """
+    for _, modelo_linea in TIPOS.values():
+        modelo_linea.objects.filter(
+            categoria=item._meta.model_name, item_id=item.pk,
+        ).exclude(producto=item.producto).update(producto=item.producto)
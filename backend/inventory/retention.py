@@ -0,0 +1,94 @@
+"""
+Retención de notificaciones.
+
+Las notificaciones vencen según su antigüedad y su estado de lectura:
+
+* leídas por todos los usuarios activos (id <= la menor marca `leido_hasta`,
+  ver notifications.py): después de NOTIFICATIONS_RETENTION_READ_DAYS días;
+* cualquiera, leída o no: después de NOTIFICATIONS_RETENTION_UNREAD_DAYS días.
+
+`purgar` las cuenta en NotificationResumenMensual y las borra por lotes de
+NOTIFICATIONS_PURGE_BATCH_SIZE, cada uno en su propia transacción corta. Entre
+lotes se libera el candado de escritura de SQLite, así las reservas y los
+ajustes de stock concurrentes no esperan a que termine toda la depuración.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.functions import Greatest, Least, TruncMonth
+from django.utils import timezone
+
+from .models import Notification, NotificationReadState, NotificationResumenMensual
+
+DIAS_LEIDAS = 90
+DIAS_NO_LEIDAS = 365
+LOTE = 500
+
+
+def leidas_por_todos():
+    """Id máximo leído por todos los usuarios activos que tienen estado de lectura (0 si no hay)."""
+    marca = NotificationReadState.objects.filter(user__is_active=True).aggregate(
+        marca=models.Min('leido_hasta')
+    )['marca']
+    return marca or 0
+
+
+def vencidas(ahora=None):
+    """Queryset de las notificaciones que la política de retención permite borrar."""
+    ahora = ahora or timezone.now()
+    dias_leidas = getattr(settings, 'NOTIFICATIONS_RETENTION_READ_DAYS', DIAS_LEIDAS)
+    dias_no_leidas = getattr(settings, 'NOTIFICATIONS_RETENTION_UNREAD_DAYS', DIAS_NO_LEIDAS)
+    return Notification.objects.filter(
+        models.Q(created_at__lt=ahora - timedelta(days=dias_leidas), id__lte=leidas_por_todos())
+        | models.Q(created_at__lt=ahora - timedelta(days=dias_no_leidas))
+    )
+
+
+def archivar(ids):
+    """Suma las notificaciones `ids` al resumen mensual por tipo y severidad."""
+    grupos = (
+        Notification.objects.filter(id__in=ids)
+        .annotate(mes=TruncMonth('created_at', output_field=models.DateField()))
+        .values('mes', 'tipo', 'severidad')
+        .annotate(total=models.Count('id'), primera=models.Min('created_at'), ultima=models.Max('created_at'))
+        .order_by()
+    )
+    for grupo in grupos:
+        actualizados = NotificationResumenMensual.objects.filter(
+            mes=grupo['mes'], tipo=grupo['tipo'], severidad=grupo['severidad']
+        ).update(
+            total=models.F('total') + grupo['total'],
+            primera=Least('primera', models.Value(grupo['primera'])),
+            ultima=Greatest('ultima', models.Value(grupo['ultima'])),
+        )
+        if not actualizados:
+            NotificationResumenMensual.objects.create(**grupo)
+
+
+def purgar(queryset=None, lote=None, pausa=0, archivar_resumen=True):
+    """
+    Borra las notificaciones de `queryset` (por defecto las vencidas) por lotes.
+
+    Cada lote toma los `lote` ids más antiguos, los archiva y los borra en una
+    transacción; después se espera `pausa` segundos antes del siguiente.
+
+    Yields:
+        int: Notificaciones borradas en cada lote
+    """
+    queryset = vencidas() if queryset is None else queryset
+    lote = lote or getattr(settings, 'NOTIFICATIONS_PURGE_BATCH_SIZE', LOTE)
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:lote])
+            if not ids:
+                return
+            if archivar_resumen:
+                archivar(ids)
+            Notification.objects.filter(id__in=ids).delete()
+        yield len(ids)
+        if len(ids) < lote:
+            return
+        if pausa:
+            time.sleep(pausa)
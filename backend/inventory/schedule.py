@@ -0,0 +1,135 @@
+"""
+Actividades del calendario (eventos y degustaciones) por ventana de fechas.
+
+`actividades` lee sólo las filas de la ventana visible, con las columnas que
+muestra el calendario y el tipo de evento en el mismo JOIN. `validadores`
+calcula con una consulta sobre los índices (fecha, updated_at) un ETag y un
+Last-Modified de la ventana: si nada cambió, la vista responde 304 sin leer las
+actividades.
+"""
+import hashlib
+from datetime import date, datetime, timedelta
+
+from django.db import models
+from rest_framework import serializers
+
+from .models import Degustacion, Evento
+
+DURACION_EVENTO = timedelta(hours=2)  # Asumir duración de 2 horas
+DURACION_DEGUSTACION = timedelta(hours=1)  # Asumir duración de 1 hora
+MARGEN_DIAS = 7
+
+_fecha_hora = serializers.DateTimeField()
+
+
+def ventana(params, hoy=None):
+    """
+    Días [inicio, fin) a mostrar según `start` y `end` (AAAA-MM-DD o ISO 8601).
+
+    Sin parámetros se usa el mes actual con una semana de margen a cada lado,
+    como la vista mensual del calendario.
+
+    Raises:
+        ValueError: Si las fechas no son válidas o `end` no es posterior a `start`
+    """
+    if params.get('start') or params.get('end'):
+        inicio = date.fromisoformat(params['start'][:10])
+        fin = date.fromisoformat(params['end'][:10])
+        if len(params['end']) == 10:
+            fin += timedelta(days=1)  # una fecha sin hora incluye el día completo
+    else:
+        hoy = hoy or date.today()
+        primero = hoy.replace(day=1)
+        siguiente = (primero + timedelta(days=32)).replace(day=1)
+        inicio, fin = primero - timedelta(days=MARGEN_DIAS), siguiente + timedelta(days=MARGEN_DIAS)
+    if fin <= inicio:
+        raise ValueError('La ventana está vacía')
+    return inicio, fin
+
+
+def _eventos(inicio, fin):
+    # Un evento que empieza la víspera puede terminar dentro de la ventana
+    return Evento.objects.filter(fecha_inicio__gte=inicio - timedelta(days=1), fecha_inicio__lt=fin)
+
+
+def _degustaciones(inicio, fin):
+    return Degustacion.objects.filter(fecha_degustacion__gte=inicio - timedelta(days=1), fecha_degustacion__lt=fin)
+
+
+def version(querysets, *extra):
+    """
+    (etag, last_modified) de los datos de `querysets` ({nombre: queryset}), con
+    una sola consulta (UNION ALL de un agregado por queryset). El conteo cubre
+    los borrados, que no cambian el `updated_at` máximo; `extra` se agrega a la
+    clave del ETag (ej. la ventana o los filtros).
+    """
+    def agregado(nombre, queryset):
+        return (
+            queryset.annotate(tabla=models.Value(nombre)).values('tabla')
+            .annotate(total=models.Count('id'), ultimo=models.Max('updated_at'))
+            .values_list('tabla', 'total', 'ultimo').order_by()
+        )
+
+    consultas = [agregado(nombre, queryset) for nombre, queryset in querysets.items()]
+    filas = {
+        tabla: (total, ultimo)
+        for tabla, total, ultimo in consultas[0].union(*consultas[1:], all=True)
+    }
+    resumen = [str(valor) for valor in extra]
+    last_modified = None
+    for nombre in querysets:
+        total, ultimo = filas.get(nombre, (0, None))
+        resumen.append(f"{total}:{ultimo.isoformat() if ultimo else ''}")
+        if ultimo and (last_modified is None or ultimo > last_modified):
+            last_modified = ultimo
+    return f'"{hashlib.md5("|".join(resumen).encode()).hexdigest()}"', last_modified
+
+
+def validadores(inicio, fin):
+    """(etag, last_modified) de la ventana del calendario."""
+    return version(
+        {'evento': _eventos(inicio, fin), 'degustacion': _degustaciones(inicio, fin)}, inicio, fin
+    )
+
+
+def actividades(inicio, fin):
+    """Actividades de la ventana ordenadas por inicio, en el formato de CalendarActivitySerializer."""
+    resultado = []
+
+    eventos = _eventos(inicio, fin).values(
+        'nombre', 'fecha_inicio', 'hora_inicio', 'cantidad_personas', 'lugar', 'tipo_evento__nombre'
+    )
+    for evento in eventos:
+        start = datetime.combine(evento['fecha_inicio'], evento['hora_inicio'])
+        resultado.append((start, {
+            'title': evento['nombre'],
+            'start': _fecha_hora.to_representation(start),
+            'end': _fecha_hora.to_representation(start + DURACION_EVENTO),
+            'type': 'Evento',
+            'details': {
+                'Tipo de Evento': evento['tipo_evento__nombre'] or 'No especificado',
+                'Hora del Evento': evento['hora_inicio'].strftime('%H:%M'),
+                'Cantidad de Personas': evento['cantidad_personas'],
+                'Ubicación': evento['lugar'],
+            },
+        }))
+
+    degustaciones = _degustaciones(inicio, fin).values(
+        'nombre', 'fecha_degustacion', 'hora_degustacion', 'cantidad_personas'
+    )
+    for degustacion in degustaciones:
+        start = datetime.combine(degustacion['fecha_degustacion'], degustacion['hora_degustacion'])
+        resultado.append((start, {
+            'title': degustacion['nombre'],
+            'start': _fecha_hora.to_representation(start),
+            'end': _fecha_hora.to_representation(start + DURACION_DEGUSTACION),
+            'type': 'Degustación',
+            'details': {
+                'Nombre de la Degustación': degustacion['nombre'],
+                'Hora': degustacion['hora_degustacion'].strftime('%H:%M'),
+                'Cantidad de Personas': degustacion['cantidad_personas'],
+            },
+        }))
+
+    resultado.sort(key=lambda actividad: actividad[0])
+    return [actividad for _, actividad in resultado]
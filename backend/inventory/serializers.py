@@ -2,9 +2,10 @@ from rest_framework import serializers
 from .models import (
     TipoEvento, Bodega, Cliente, Manteleria, Cubierto, Loza, Cristaleria, Silla, Mesa, SalaLounge, 
     Periquera, Carpa, PistaTarima, Extra, Evento, EventoMobiliario, Degustacion, DegustacionMobiliario, Product, Notification,
-    HomeSection, HomeSectionImage, Invitation
+    HomeSection, HomeSectionImage, Invitation, StockMovement, CalendarFeed, StockMinimoCategoria, ReportJob
 )
 from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
 
 class TipoEventoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,8 +21,28 @@ class InventarioItemSerializer(serializers.ModelSerializer):
     bodega_nombre = serializers.CharField(source='bodega.nombre', read_only=True)
 
     class Meta:
-        fields = ['id', 'producto', 'descripcion', 'cantidad', 'cantidad_en_mantenimiento', 'bodega', 'bodega_nombre', 'created_at', 'updated_at']
+        fields = [
+            'id', 'producto', 'descripcion', 'cantidad', 'cantidad_en_mantenimiento', 'stock_minimo', 'bodega',
+            'bodega_nombre', 'created_at', 'updated_at'
+        ]
         read_only_fields = ['created_at', 'updated_at', 'bodega_nombre']
+        extra_kwargs = {
+            'cantidad': {'min_value': 0},
+            'cantidad_en_mantenimiento': {'min_value': 0},
+        }
+
+
+class StockMinimoCategoriaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockMinimoCategoria
+        fields = ['id', 'categoria', 'stock_minimo', 'updated_at']
+        read_only_fields = ['updated_at']
+
+    def validate_categoria(self, value):
+        from .categories import get_categoria  # categories importa este módulo
+        if get_categoria(value) is None:
+            raise serializers.ValidationError('Categoría no válida.')
+        return value
 
 
 class ClienteSerializer(serializers.ModelSerializer):
@@ -74,15 +95,25 @@ class ExtraSerializer(InventarioItemSerializer):
         model = Extra
 
 
-class EventoMobiliarioSerializer(serializers.ModelSerializer):
-    # Campo para obtener el nombre del producto del mobiliario (solo lectura)
-    producto_nombre = serializers.CharField(source='content_object.producto', read_only=True)
-    # Campo para identificar el tipo de modelo de mobiliario (ej. 'silla', 'mesa')
-    content_type_name = serializers.CharField(source='content_type.model', read_only=True)
+class LineaMobiliarioSerializer(serializers.ModelSerializer):
+    # Mismos campos que con la antigua GenericForeignKey: id del ContentType e id del artículo
+    content_type = serializers.IntegerField(source='content_type_id', read_only=True)
+    object_id = serializers.IntegerField(source='item_id', read_only=True)
+    # Nombre del producto copiado en la línea (solo lectura)
+    producto_nombre = serializers.CharField(source='producto', read_only=True)
+    # Tipo de modelo de mobiliario (ej. 'silla', 'mesa')
+    content_type_name = serializers.CharField(source='categoria', read_only=True)
 
     class Meta:
+        fields = [
+            'id', 'cantidad', 'content_type', 'object_id', 'producto_nombre', 'content_type_name',
+            'categoria_etiqueta',
+        ]
+
+
+class EventoMobiliarioSerializer(LineaMobiliarioSerializer):
+    class Meta(LineaMobiliarioSerializer.Meta):
         model = EventoMobiliario
-        fields = ['id', 'cantidad', 'content_type', 'object_id', 'producto_nombre', 'content_type_name']
 
 
 class MobiliarioField(serializers.Field):
@@ -113,13 +144,9 @@ class EventoSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class DegustacionMobiliarioSerializer(serializers.ModelSerializer):
-    producto_nombre = serializers.CharField(source='content_object.producto', read_only=True)
-    content_type_name = serializers.CharField(source='content_type.model', read_only=True)
-
-    class Meta:
+class DegustacionMobiliarioSerializer(LineaMobiliarioSerializer):
+    class Meta(LineaMobiliarioSerializer.Meta):
         model = DegustacionMobiliario
-        fields = ['id', 'cantidad', 'content_type', 'object_id', 'producto_nombre', 'content_type_name']
 
 
 class DegustacionSerializer(serializers.ModelSerializer):
@@ -143,9 +170,70 @@ class ProductSerializer(serializers.ModelSerializer):
 
 
 class NotificationSerializer(serializers.ModelSerializer):
+    # Leída por el usuario de la petición (ver notifications.py); la vista pasa
+    # en el contexto su marca `leido_hasta` y los ids `leidas` por encima de ella
+    is_read = serializers.SerializerMethodField()
+
     class Meta:
         model = Notification
-        fields = ['id', 'message', 'created_at', 'is_read']
+        fields = [
+            'id', 'message', 'tipo', 'severidad', 'categoria', 'item_id', 'evento', 'degustacion',
+            'cantidad', 'created_at', 'is_read'
+        ]
+
+    def get_is_read(self, obj):
+        return obj.id <= self.context.get('leido_hasta', 0) or obj.id in self.context.get('leidas', ())
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    bodega_nombre = serializers.CharField(source='bodega.nombre', read_only=True, default=None)
+
+    class Meta:
+        model = StockMovement
+        fields = [
+            'id', 'categoria', 'item_id', 'producto', 'bodega', 'bodega_nombre', 'delta',
+            'delta_mantenimiento', 'motivo', 'evento', 'degustacion', 'created_at'
+        ]
+
+
+class CalendarFeedSerializer(serializers.ModelSerializer):
+    # URL pública del .ics para suscribirse desde la app de calendario
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CalendarFeed
+        fields = [
+            'id', 'nombre', 'estado', 'tipo_evento', 'responsable', 'incluir_degustaciones', 'url',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['created_at', 'updated_at']
+
+    def get_url(self, obj):
+        ruta = reverse('calendar-feed-ics', kwargs={'token': obj.token})
+        request = self.context.get('request')
+        return request.build_absolute_uri(ruta) if request else ruta
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    # URL de descarga cuando el archivo está listo
+    descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'tipo', 'formato', 'parametros', 'estado', 'nombre_archivo', 'intentos', 'ultimo_error',
+            'descarga', 'created_at', 'terminado_at', 'expira_at'
+        ]
+        read_only_fields = [
+            'estado', 'nombre_archivo', 'intentos', 'ultimo_error', 'created_at', 'terminado_at', 'expira_at'
+        ]
+
+    def get_descarga(self, obj):
+        if obj.estado != 'listo':
+            return None
+        ruta = reverse('report-job-descargar', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(ruta) if request else ruta
 
 
 class CalendarActivitySerializer(serializers.Serializer):
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import catalog, renders, report_cache, reservations, sse
+from .categories import CATEGORIAS
+from .models import Evento, EventoMobiliario, Notification
+
+
+def sincronizar_catalogo(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return  # loaddata: el catálogo se reconstruye con `rebuild_catalog`
+    catalog.sincronizar(instance, campos=None if created else update_fields)
+
+
+def eliminar_del_catalogo(sender, instance, **kwargs):
+    catalog.eliminar(instance)
+
+
+def renombrar_lineas(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Las líneas de mobiliario guardan una copia del producto (ver models.LineaMobiliario)
+    if created or raw:
+        return
+    if update_fields is None or 'producto' in update_fields:
+        reservations.renombrar(instance)
+
+
+def publicar_notificacion(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        datos = sse.datos_de(instance)
+        transaction.on_commit(lambda: sse.get_broadcaster().publicar(datos))
+
+
+def conectar():
+    post_save.connect(publicar_notificacion, sender=Notification, dispatch_uid='notificacion_sse')
+    for categoria in CATEGORIAS:
+        post_save.connect(sincronizar_catalogo, sender=categoria.modelo, dispatch_uid=f'catalogo_save_{categoria.slug}')
+        post_delete.connect(eliminar_del_catalogo, sender=categoria.modelo, dispatch_uid=f'catalogo_delete_{categoria.slug}')
+        post_save.connect(renombrar_lineas, sender=categoria.modelo, dispatch_uid=f'lineas_save_{categoria.slug}')
+    # Archivos de los reportes por evento guardados en disco (ver renders.py)
+    post_save.connect(renders.invalidar_por_evento, sender=Evento, dispatch_uid='render_evento_save')
+    post_delete.connect(renders.invalidar_por_evento, sender=Evento, dispatch_uid='render_evento_delete')
+    post_save.connect(renders.invalidar_por_linea, sender=EventoMobiliario, dispatch_uid='render_linea_save')
+    post_delete.connect(renders.invalidar_por_linea, sender=EventoMobiliario, dispatch_uid='render_linea_delete')
+    # Versiones de las tablas que leen los reportes en caché (ver report_cache.py)
+    for modelo in report_cache.MODELOS_OBSERVADOS:
+        uid = f'reportes_{modelo._meta.db_table}'
+        post_save.connect(report_cache.invalidar_por_senal, sender=modelo, dispatch_uid=f'{uid}_save')
+        post_delete.connect(report_cache.invalidar_por_senal, sender=modelo, dispatch_uid=f'{uid}_delete')
@@ -0,0 +1,187 @@
+"""
+Notificaciones en vivo por Server-Sent Events (SSE).
+
+Cada pestaña del navegador abre una sola conexión a
+``/api/inventory/notifications/stream/`` (servida por ``backend/asgi.py``) y
+recibe las notificaciones nuevas conforme se crean. Al reconectar, el navegador
+envía ``Last-Event-ID`` y se reenvían desde la base de datos las que se
+perdieron.
+
+El reparto a los suscriptores lo hace un *broadcaster* configurable
+(NOTIFICATIONS_SSE_BROADCASTER):
+
+* LocalBroadcaster (por defecto): reparte en memoria a las conexiones del mismo
+  proceso. Las notificaciones se publican al confirmarse la transacción que las
+  crea (ver signals.py). Sirve con un solo worker ASGI.
+* DatabaseBroadcaster: cada proceso consulta periódicamente las notificaciones
+  nuevas y las reparte localmente. Funciona con varios workers o cuando las
+  notificaciones se crean desde otro proceso (comandos, cron), sin servicios
+  adicionales.
+"""
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import Notification
+
+RETRY_MS = 5000
+LATIDO_SEGUNDOS = 15
+MAX_REENVIO = 200
+MAX_PENDIENTES = 100
+INTERVALO_CONSULTA_SEGUNDOS = 2
+
+# Marca puesta en la cola de un suscriptor que se atrasó demasiado: su conexión
+# se cierra y el navegador se pone al día con Last-Event-ID al reconectar
+DESBORDE = object()
+
+
+def datos_de(notificacion):
+    return {
+        'id': notificacion.id,
+        'message': notificacion.message,
+        'tipo': notificacion.tipo,
+        'severidad': notificacion.severidad,
+        'categoria': notificacion.categoria,
+        'item_id': notificacion.item_id,
+        'evento': notificacion.evento_id,
+        'degustacion': notificacion.degustacion_id,
+        'cantidad': notificacion.cantidad,
+        'created_at': notificacion.created_at.isoformat(),
+        'is_read': False,
+    }
+
+
+def formato_sse(datos):
+    return f"id: {datos['id']}\nevent: notification\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+
+
+class LocalBroadcaster:
+    """Reparte eventos a las conexiones abiertas en este proceso."""
+
+    def __init__(self):
+        self._suscriptores = {}
+        self._candado = threading.Lock()
+
+    def suscribir(self):
+        """Registra una cola para la conexión actual (debe llamarse dentro del event loop)."""
+        cola = asyncio.Queue(maxsize=MAX_PENDIENTES)
+        with self._candado:
+            self._suscriptores[cola] = asyncio.get_running_loop()
+        return cola
+
+    def desuscribir(self, cola):
+        with self._candado:
+            self._suscriptores.pop(cola, None)
+
+    def total(self):
+        return len(self._suscriptores)
+
+    def publicar(self, datos):
+        """Envía `datos` a todos los suscriptores. Puede llamarse desde cualquier hilo."""
+        self.repartir(datos)
+
+    def repartir(self, datos):
+        with self._candado:
+            suscriptores = list(self._suscriptores.items())
+        for cola, loop in suscriptores:
+            try:
+                loop.call_soon_threadsafe(_entregar, cola, datos)
+            except RuntimeError:
+                self.desuscribir(cola)  # el event loop ya se cerró
+
+
+def _entregar(cola, datos):
+    try:
+        cola.put_nowait(datos)
+    except asyncio.QueueFull:
+        while not cola.empty():
+            cola.get_nowait()
+        cola.put_nowait(DESBORDE)
+
+
+class DatabaseBroadcaster(LocalBroadcaster):
+    """
+    Reparte las notificaciones nuevas leyéndolas de la base de datos.
+
+    Una sola tarea por proceso consulta ``Notification.id > último`` cada
+    NOTIFICATIONS_SSE_POLL_SECONDS, sin importar cuántas conexiones haya.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tarea = None
+
+    def suscribir(self):
+        cola = super().suscribir()
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.get_running_loop().create_task(self._consultar())
+        return cola
+
+    def publicar(self, datos):
+        pass  # La tarea de consulta las encontrará en la base de datos
+
+    async def _consultar(self):
+        intervalo = getattr(settings, 'NOTIFICATIONS_SSE_POLL_SECONDS', INTERVALO_CONSULTA_SEGUNDOS)
+        ultimo = await sync_to_async(_ultimo_id)()
+        while self.total():
+            await asyncio.sleep(intervalo)
+            for datos in await sync_to_async(notificaciones_desde)(ultimo):
+                ultimo = datos['id']
+                self.repartir(datos)
+
+
+def _ultimo_id():
+    return Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def notificaciones_desde(ultimo_id, limite=MAX_REENVIO):
+    """Notificaciones posteriores a `ultimo_id` (las más recientes si son demasiadas)."""
+    recientes = list(Notification.objects.filter(id__gt=ultimo_id).order_by('-id')[:limite])
+    return [datos_de(notificacion) for notificacion in reversed(recientes)]
+
+
+_broadcaster = None
+_broadcaster_candado = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    with _broadcaster_candado:
+        if _broadcaster is None:
+            ruta = getattr(settings, 'NOTIFICATIONS_SSE_BROADCASTER', 'inventory.sse.LocalBroadcaster')
+            _broadcaster = import_string(ruta)()
+        return _broadcaster
+
+
+async def eventos(broadcaster, cola, ultimo_id=None):
+    """
+    Generador asíncrono con el cuerpo del stream SSE de una conexión.
+
+    Primero reenvía lo perdido desde `ultimo_id` y después lo que llega a la cola.
+    La suscripción se hace antes del reenvío, así nada se pierde entre ambos.
+    """
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if ultimo_id is not None:
+            for datos in await sync_to_async(notificaciones_desde)(ultimo_id):
+                ultimo_id = datos['id']
+                yield formato_sse(datos)
+
+        while True:
+            try:
+                datos = await asyncio.wait_for(cola.get(), timeout=LATIDO_SEGUNDOS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if datos is DESBORDE:
+                break
+            if ultimo_id is not None and datos['id'] <= ultimo_id:
+                continue
+            ultimo_id = datos['id']
+            yield formato_sse(datos)
+    finally:
+        broadcaster.desuscribir(cola)
@@ -0,0 +1,134 @@
+"""
+Movimientos de stock de los artículos de inventario.
+
+Toda mutación de `cantidad` / `cantidad_en_mantenimiento` debe hacerse con
+`ajustar`, que aplica el cambio con un único UPDATE condicional
+(``SET cantidad = cantidad + n WHERE cantidad + n >= 0``) y deja registro en la
+bitácora StockMovement. Las restricciones CHECK de InventarioItem respaldan la
+misma regla en la base de datos. Los cambios de cantidades hechos con PUT/PATCH
+en la API se aplican también con `ajustar` (motivo 'ajuste').
+"""
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import report_cache
+from .models import CatalogoItem, StockMovement, alertar_bajo_stock
+
+
+def movimiento(item, motivo, delta=0, delta_mantenimiento=0, evento=None, degustacion=None):
+    """
+    Construye (sin guardar) un movimiento de stock para `item`.
+
+    Args:
+        item: Instancia de un modelo de categoría de inventario
+        motivo (str): Uno de StockMovement.MOTIVO_CHOICES
+        delta (int): Cambio en `cantidad`
+        delta_mantenimiento (int): Cambio en `cantidad_en_mantenimiento`
+    """
+    return StockMovement(
+        categoria=item._meta.model_name,
+        item_id=item.pk,
+        producto=item.producto,
+        bodega_id=item.bodega_id,
+        delta=delta,
+        delta_mantenimiento=delta_mantenimiento,
+        motivo=motivo,
+        evento=evento,
+        degustacion=degustacion,
+    )
+
+
+def registrar(*movimientos):
+    """Guarda los movimientos en la bitácora con un solo INSERT."""
+    movimientos = [m for m in movimientos if m is not None]
+    if movimientos:
+        StockMovement.objects.bulk_create(movimientos)
+        report_cache.invalidar(StockMovement)
+    return movimientos
+
+
+def _update_returning():
+    """
+    Si la base de datos acepta ``UPDATE ... RETURNING``. No sirve
+    `can_return_columns_from_insert`: habla de INSERT y MariaDB >= 10.5 lo
+    activa sin soportar RETURNING en UPDATE.
+    """
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def _actualizar(modelo, pk, delta, delta_mantenimiento, ahora):
+    """
+    Ejecuta el UPDATE condicional y devuelve (cantidad, cantidad_en_mantenimiento)
+    nuevos, o None si la fila no existe o el stock no alcanza.
+
+    Donde la base de datos soporta RETURNING (PostgreSQL, SQLite >= 3.35) los
+    saldos nuevos salen de la misma sentencia; si no, se leen en la misma
+    transacción, con la fila ya bloqueada por el UPDATE.
+    """
+    if _update_returning():
+        qn = connection.ops.quote_name
+        cantidad, mantenimiento = qn('cantidad'), qn('cantidad_en_mantenimiento')
+        sql = (
+            f"UPDATE {qn(modelo._meta.db_table)} "
+            f"SET {cantidad} = {cantidad} + %s, {mantenimiento} = {mantenimiento} + %s, {qn('updated_at')} = %s "
+            f"WHERE {qn(modelo._meta.pk.column)} = %s AND {cantidad} + %s >= 0 AND {mantenimiento} + %s >= 0 "
+            f"RETURNING {cantidad}, {mantenimiento}"
+        )
+        parametros = [
+            delta, delta_mantenimiento, connection.ops.adapt_datetimefield_value(ahora),
+            pk, delta, delta_mantenimiento,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            return cursor.fetchone()
+
+    actualizados = modelo.objects.filter(
+        pk=pk, cantidad__gte=-delta, cantidad_en_mantenimiento__gte=-delta_mantenimiento,
+    ).update(
+        cantidad=F('cantidad') + delta,
+        cantidad_en_mantenimiento=F('cantidad_en_mantenimiento') + delta_mantenimiento,
+        updated_at=ahora,
+    )
+    if not actualizados:
+        return None
+    return modelo.objects.filter(pk=pk).values_list('cantidad', 'cantidad_en_mantenimiento').get()
+
+
+@transaction.atomic
+def ajustar(item, motivo, delta=0, delta_mantenimiento=0, evento=None, degustacion=None):
+    """
+    Aplica un cambio de stock de forma atómica y lo registra en la bitácora.
+
+    El saldo de `item` en memoria sólo se usa para identificar la fila; la
+    validación la hace el propio UPDATE, así dos peticiones concurrentes no
+    pueden perder actualizaciones ni dejar el stock negativo.
+
+    Returns:
+        tuple | None: (cantidad, cantidad_en_mantenimiento) resultantes, o None si
+        el stock no alcanza (no se modifica nada)
+    """
+    ahora = timezone.now()
+    saldos = _actualizar(item.__class__, item.pk, delta, delta_mantenimiento, ahora)
+    if saldos is None:
+        return None
+
+    cantidad, cantidad_en_mantenimiento = saldos
+    item.cantidad, item.cantidad_en_mantenimiento, item.updated_at = cantidad, cantidad_en_mantenimiento, ahora
+    item.actualizar_instantanea('cantidad', 'cantidad_en_mantenimiento', 'updated_at')
+
+    # El UPDATE no dispara post_save: se sincroniza la tabla unificada aquí
+    CatalogoItem.objects.filter(categoria=item._meta.model_name, item_id=item.pk).update(
+        cantidad=cantidad, cantidad_en_mantenimiento=cantidad_en_mantenimiento, updated_at=ahora,
+    )
+    report_cache.invalidar(CatalogoItem)
+    registrar(movimiento(
+        item, motivo, delta=delta, delta_mantenimiento=delta_mantenimiento,
+        evento=evento, degustacion=degustacion,
+    ))
+    alertar_bajo_stock(item, cantidad - delta, cantidad)
+    return saldos
@@ -0,0 +1,776 @@
+import codecs
+import csv
+import datetime
+import io
+import json
+import os
+import shutil
+import smtplib
+import tempfile
+import threading
+import zipfile
+from unittest import mock
+
+import openpyxl
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import availability, bundles, documents, jobs, outbox, renders, report_cache, retention, stock, thresholds
+from .models import (
+    AlertaStockPendiente, CatalogoItem, DegustacionMobiliario, EmailOutbox, Evento, EventoMobiliario,
+    Notification, NotificationReadState, NotificationResumenMensual, ReportJob, Reserva, Silla,
+    StockMinimoCategoria, StockMovement,
+)
+
+
+class RastreoCamposTests(TestCase):
+    """Guardado parcial de RastreoCamposMixin (ver tracking.py)."""
+
+    def setUp(self):
+        self.evento = Evento.objects.create(
+            nombre='Boda', cantidad_personas=80, responsable='Ana', lugar='Jardín',
+            fecha_inicio=datetime.date(2030, 5, 1), hora_inicio=datetime.time(18),
+        )
+        self.silla = Silla.objects.create(producto='Silla tiffany', descripcion='Blanca', cantidad=10)
+
+    def test_guarda_campo_diferido_asignado(self):
+        evento = Evento.objects.only('id').get(pk=self.evento.pk)
+        evento.responsable = 'Luis'
+        evento.save()
+        self.assertEqual(Evento.objects.get(pk=self.evento.pk).responsable, 'Luis')
+
+        silla = Silla.objects.defer('descripcion').get(pk=self.silla.pk)
+        silla.descripcion = 'Dorada'
+        silla.save()
+        self.assertEqual(Silla.objects.get(pk=self.silla.pk).descripcion, 'Dorada')
+
+    def test_campo_diferido_sin_asignar_no_se_guarda(self):
+        evento = Evento.objects.only('id', 'nombre').get(pk=self.evento.pk)
+        Evento.objects.filter(pk=self.evento.pk).update(responsable='Otro')
+        evento.nombre = 'Boda civil'
+        evento.save()
+        guardado = Evento.objects.get(pk=self.evento.pk)
+        self.assertEqual((guardado.nombre, guardado.responsable), ('Boda civil', 'Otro'))
+
+    def test_refresh_from_db_actualiza_valores_originales(self):
+        silla = Silla.objects.get(pk=self.silla.pk)
+        Silla.objects.filter(pk=self.silla.pk).update(cantidad=4)
+        silla.refresh_from_db()
+        self.assertEqual(silla.valor_original('cantidad'), 4)
+        self.assertEqual(silla.campos_modificados(), [])
+
+        # Campo diferido cargado al leerlo: entra a los valores originales
+        silla = Silla.objects.defer('descripcion').get(pk=self.silla.pk)
+        self.assertEqual(silla.descripcion, 'Blanca')
+        self.assertEqual(silla.valor_original('descripcion'), 'Blanca')
+        self.assertEqual(silla.campos_modificados(), [])
+        silla.descripcion = 'Negra'
+        self.assertEqual(silla.campos_modificados(), ['descripcion'])
+        silla.save()
+        self.assertEqual(Silla.objects.get(pk=self.silla.pk).descripcion, 'Negra')
+
+
+class AjusteStockTests(TestCase):
+    """PUT/PATCH de cantidades en /api/inventory/<categoría>/ (InventarioItemViewSet.perform_update)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        self.silla = Silla.objects.create(producto='Silla tiffany', cantidad=10)
+        inicio = timezone.now() + datetime.timedelta(days=30)
+        Reserva.objects.create(
+            categoria='silla', item_id=self.silla.pk, cantidad=8, inicio=inicio, fin=inicio + datetime.timedelta(hours=36),
+        )
+        self.url = f'/api/inventory/sillas/{self.silla.pk}/'
+
+    def test_ajuste_registra_movimiento(self):
+        respuesta = self.client.patch(self.url, {'cantidad': 12, 'cantidad_en_mantenimiento': 1}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual((respuesta.data['cantidad'], respuesta.data['cantidad_en_mantenimiento']), (12, 1))
+        movimiento = StockMovement.objects.get()
+        self.assertEqual((movimiento.motivo, movimiento.delta, movimiento.delta_mantenimiento), ('ajuste', 2, 1))
+
+    def test_no_baja_de_lo_reservado(self):
+        respuesta = self.client.patch(self.url, {'cantidad': 3}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(Silla.objects.get(pk=self.silla.pk).cantidad, 10)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_sin_cambio_de_cantidad_no_registra_movimiento(self):
+        respuesta = self.client.patch(self.url, {'cantidad': 10, 'producto': 'Silla chiavari'}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(Silla.objects.get(pk=self.silla.pk).producto, 'Silla chiavari')
+        self.assertFalse(StockMovement.objects.exists())
+
+
+class ResumenBajoStockTests(TestCase):
+    """Alertas de bajo stock agrupadas en un resumen por transacción (ver alerts.py)."""
+
+    def test_un_resumen_por_transaccion(self):
+        sillas = [Silla.objects.create(producto=f'Silla {n}', cantidad=20, stock_minimo=5) for n in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for silla in sillas:
+                    stock.ajustar(silla, 'ajuste', delta=-18)
+        self.assertEqual(Notification.objects.filter(tipo='bajo_stock').count(), 1)
+        self.assertFalse(AlertaStockPendiente.objects.exists())
+
+
+class StockMovementViewSetTests(TestCase):
+    """Listado de la bitácora /api/inventory/movimientos/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        silla = Silla.objects.create(producto='Silla tiffany', cantidad=10)
+        for _ in range(3):
+            stock.ajustar(silla, 'ajuste', delta=1)
+        self.silla = silla
+
+    def test_paginado_por_cursor(self):
+        respuesta = self.client.get('/api/inventory/movimientos/', {'page_size': 2})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data['results']), 2)
+        siguiente = self.client.get(respuesta.data['next'])
+        self.assertEqual(len(siguiente.data['results']), 1)
+
+    def test_filtro_numerico_invalido(self):
+        for campo in ('item_id', 'evento', 'degustacion'):
+            self.assertEqual(self.client.get('/api/inventory/movimientos/', {campo: 'abc'}).status_code, 400)
+        respuesta = self.client.get('/api/inventory/movimientos/', {'item_id': self.silla.pk})
+        self.assertEqual(len(respuesta.data['results']), 3)
+
+
+class NotificationViewSetTests(TestCase):
+    def test_filtro_numerico_invalido(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('encargado'))
+        for campo in ('item_id', 'evento', 'degustacion'):
+            self.assertEqual(client.get('/api/inventory/notifications/', {campo: 'x'}).status_code, 400)
+        self.assertEqual(client.get('/api/inventory/notifications/', {'item_id': '1'}).status_code, 200)
+
+
+def crear_evento(nombre='Boda', fecha=datetime.date(2030, 5, 1), hora=datetime.time(18), **kwargs):
+    return Evento.objects.create(
+        nombre=nombre, cantidad_personas=80, responsable='Ana', lugar='Jardín',
+        fecha_inicio=fecha, hora_inicio=hora, **kwargs,
+    )
+
+
+class RenderTests(TestCase):
+    """Caché en disco de los reportes por evento (ver renders.py)."""
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        ajustes = override_settings(REPORT_RENDER_CACHE_DIR=self.directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.evento = crear_evento()
+
+    def test_generar_concurrente(self):
+        # Los hilos de un proceso comparten el pid: cada generación necesita su propio temporal
+        errores = []
+
+        def generar(render):
+            try:
+                render.generar()
+            except Exception as e:
+                errores.append(e)
+
+        for _ in range(5):
+            shutil.rmtree(self.directorio, ignore_errors=True)
+            hilos = [
+                threading.Thread(target=generar, args=(renders.Render(self.evento, 'pdf'),)) for _ in range(6)
+            ]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+        self.assertEqual(errores, [])
+        render = renders.Render(self.evento, 'pdf')
+        with open(render.ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        self.assertTrue(contenido.startswith(b'%PDF') and contenido.rstrip().endswith(b'%%EOF'))
+        self.assertEqual(os.listdir(os.path.dirname(render.ruta)), [os.path.basename(render.ruta)])
+
+
+def hora(n):
+    return timezone.make_aware(datetime.datetime(2030, 5, 1)) + datetime.timedelta(hours=n)
+
+
+class DisponibilidadTests(TestCase):
+    """Motor de disponibilidad por fechas (ver availability.py)."""
+
+    def setUp(self):
+        self.silla = Silla.objects.create(producto='Silla tiffany', cantidad=10)
+        self.llave = ('silla', self.silla.pk)
+
+    def reservar(self, cantidad, inicio, fin, **destino):
+        linea = {'categoria': 'silla', 'item_id': self.silla.pk, 'cantidad': cantidad}
+        return availability.reservar([linea], hora(inicio), hora(fin), **destino)
+
+    def test_barrido_reservas_consecutivas_no_se_suman(self):
+        intervalos = [(hora(0), hora(4), 6), (hora(4), hora(8), 6)]
+        self.assertEqual(availability.pico(intervalos, hora(0), hora(8)), 6)
+
+    def test_barrido_reservas_traslapadas_se_suman(self):
+        intervalos = [(hora(0), hora(4), 6), (hora(3), hora(8), 3), (hora(7), hora(9), 1)]
+        self.assertEqual(
+            list(availability.barrido(intervalos)),
+            [(hora(0), 6), (hora(3), 9), (hora(4), 3), (hora(7), 4), (hora(8), 1), (hora(9), 0)],
+        )
+        self.assertEqual(availability.pico(intervalos, hora(0), hora(9)), 9)
+
+    def test_pico_dentro_de_la_ventana(self):
+        self.reservar(6, 0, 4)
+        self.reservar(3, 3, 8)
+        # Fuera de [5, 10) sólo queda la segunda reserva
+        self.assertEqual(availability.reservado_por_llave(hora(5), hora(10)), {self.llave: 3})
+        self.assertEqual(availability.reservado_por_llave(hora(0), hora(10)), {self.llave: 9})
+        self.assertEqual(availability.reservado_por_llave(hora(8), hora(10)), {})
+
+    def test_validar_rechaza_lo_que_excede_el_stock(self):
+        self.reservar(8, 0, 10)
+        linea = {'categoria': 'silla', 'item_id': self.silla.pk, 'cantidad': 3}
+        error = availability.validar([linea], hora(5), hora(15))
+        self.assertIn('Disponible: 2', error)
+        self.assertIsNone(availability.validar([{**linea, 'cantidad': 2}], hora(5), hora(15)))
+        # Consecutiva a la reserva existente: todo el stock está libre
+        self.assertIsNone(availability.validar([{**linea, 'cantidad': 10}], hora(10), hora(20)))
+
+    def test_comprometido_desde_ahora(self):
+        ahora = timezone.now()
+        linea = {'categoria': 'silla', 'item_id': self.silla.pk, 'cantidad': 4}
+        availability.reservar([linea], ahora - datetime.timedelta(days=3), ahora - datetime.timedelta(days=2))
+        availability.reservar([linea], ahora + datetime.timedelta(days=1), ahora + datetime.timedelta(days=2))
+        availability.reservar([{**linea, 'cantidad': 3}], ahora + datetime.timedelta(days=1), ahora + datetime.timedelta(days=3))
+        self.assertEqual(availability.comprometido(self.llave), 7)
+
+    def test_cancelar_libera_las_reservas(self):
+        evento = crear_evento()
+        self.reservar(8, 0, 10, evento=evento)
+        evento.estado = 'Cancelado'
+        evento.save()
+        self.assertFalse(Reserva.objects.exists())
+
+    def test_finalizar_conserva_el_historial(self):
+        ahora = timezone.now()
+        evento = crear_evento()
+        linea = {'categoria': 'silla', 'item_id': self.silla.pk, 'cantidad': 5}
+        availability.reservar([linea], ahora - datetime.timedelta(hours=2), ahora + datetime.timedelta(hours=10), evento=evento)
+        evento.estado = 'Finalizado'
+        evento.save()
+        reserva = Reserva.objects.get()
+        self.assertLessEqual(reserva.fin, timezone.now())
+        self.assertEqual(availability.comprometido(self.llave), 0)
+
+
+class PedidoMobiliarioTests(TestCase):
+    """Alta y edición de eventos y degustaciones con mobiliario (ver reservations.py)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        self.silla = Silla.objects.create(producto='Silla tiffany', cantidad=10)
+        self.content_type = ContentType.objects.get_for_model(Silla).pk
+
+    def mobiliario(self, cantidad):
+        return [{'content_type_id': self.content_type, 'object_id': self.silla.pk, 'cantidad': cantidad}]
+
+    def crear(self, cantidad, fecha='2031-05-01'):
+        return self.client.post('/api/inventory/eventos/', {
+            'nombre': 'Boda', 'cantidad_personas': 80, 'responsable': 'Ana', 'lugar': 'Jardín',
+            'fecha_inicio': fecha, 'hora_inicio': '18:00', 'mobiliario': self.mobiliario(cantidad),
+        }, format='json')
+
+    def test_crear_reserva_el_mobiliario(self):
+        respuesta = self.crear(6)
+        self.assertEqual(respuesta.status_code, 201)
+        reserva = Reserva.objects.get()
+        self.assertEqual((reserva.evento_id, reserva.cantidad), (respuesta.data['id'], 6))
+        self.assertEqual(Silla.objects.get(pk=self.silla.pk).cantidad, 10)
+
+    def test_crear_sin_stock_no_deja_lineas_ni_reservas(self):
+        self.assertEqual(self.crear(6).status_code, 201)
+        respuesta = self.crear(5)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(Evento.objects.count(), 1)
+        self.assertEqual(EventoMobiliario.objects.count(), 1)
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_degustacion_sin_stock(self):
+        self.assertEqual(self.crear(6).status_code, 201)
+        respuesta = self.client.post('/api/inventory/degustaciones/', {
+            'nombre': 'Prueba de menú', 'cantidad_personas': 4, 'responsable': 'Ana', 'alimentos': 'Menú 1',
+            'fecha_degustacion': '2031-05-01', 'hora_degustacion': '18:00', 'fecha_evento': '2031-06-01',
+            'mobiliario': self.mobiliario(5),
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(DegustacionMobiliario.objects.exists())
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_cambiar_fecha_valida_la_nueva_ventana(self):
+        self.assertEqual(self.crear(6, fecha='2031-05-10').status_code, 201)
+        evento = self.crear(5).data['id']
+        url = f'/api/inventory/eventos/{evento}/'
+
+        # El 10 de mayo sólo quedan 4 sillas libres
+        respuesta = self.client.patch(url, {'fecha_inicio': '2031-05-10'}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(Evento.objects.get(pk=evento).fecha_inicio, datetime.date(2031, 5, 1))
+        self.assertEqual(Reserva.objects.get(evento=evento).inicio.date(), datetime.date(2031, 5, 1))
+
+        respuesta = self.client.patch(url, {'fecha_inicio': '2031-05-20'}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        reserva = Reserva.objects.get(evento=evento)
+        self.assertEqual((reserva.inicio.date(), reserva.cantidad), (datetime.date(2031, 5, 20), 5))
+        self.assertEqual(EventoMobiliario.objects.get(evento=evento).cantidad, 5)
+
+    def test_cancelar_elimina_reservas_y_lineas(self):
+        evento = self.crear(6).data['id']
+        respuesta = self.client.patch(f'/api/inventory/eventos/{evento}/', {'estado': 'Cancelado'}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(Reserva.objects.exists())
+        self.assertFalse(EventoMobiliario.objects.exists())
+
+
+class LineaMobiliarioTests(TestCase):
+    """Líneas de mobiliario con categoría, id y producto copiado (ver models.LineaMobiliario)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        self.silla = Silla.objects.create(producto='Silla tiffany', descripcion='Blanca', cantidad=10)
+        self.content_type = ContentType.objects.get_for_model(Silla).pk
+
+    def test_payload_del_frontend_y_renombrar(self):
+        respuesta = self.client.post('/api/inventory/eventos/', {
+            'nombre': 'Boda', 'cantidad_personas': 80, 'responsable': 'Ana', 'lugar': 'Jardín',
+            'fecha_inicio': '2031-05-01', 'hora_inicio': '18:00',
+            'mobiliario': [{'content_type_id': self.content_type, 'object_id': self.silla.pk, 'cantidad': 4}],
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        evento = respuesta.data['id']
+        linea = respuesta.data['mobiliario_asignado'][0]
+        self.assertEqual(
+            {campo: linea[campo] for campo in (
+                'cantidad', 'content_type', 'object_id', 'producto_nombre', 'content_type_name', 'categoria_etiqueta'
+            )},
+            {
+                'cantidad': 4, 'content_type': self.content_type, 'object_id': self.silla.pk,
+                'producto_nombre': 'Silla tiffany', 'content_type_name': 'silla', 'categoria_etiqueta': 'Sillas',
+            },
+        )
+
+        respuesta = self.client.put(f'/api/inventory/sillas/{self.silla.pk}/', {
+            'producto': 'Silla chiavari', 'descripcion': 'Blanca', 'cantidad': 10, 'cantidad_en_mantenimiento': 0,
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(EventoMobiliario.objects.get().producto, 'Silla chiavari')
+
+        respuesta = self.client.get(f'/api/inventory/eventos/{evento}/')
+        self.assertEqual(respuesta.data['mobiliario_asignado'][0]['producto_nombre'], 'Silla chiavari')
+
+
+class MigracionLineasTests(TransactionTestCase):
+    """Migración 0035: líneas con GenericForeignKey a categoria/item_id/producto."""
+
+    antes = [('inventory', '0034_report_jobs')]
+    despues = [('inventory', '0035_mobiliario_sin_gfk')]
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_copia_categoria_y_producto(self):
+        ejecutor = MigrationExecutor(connection)
+        ejecutor.migrate(self.antes)
+        apps = ejecutor.loader.project_state(self.antes).apps
+        ContentTypeAntes = apps.get_model('contenttypes', 'ContentType')
+        silla = apps.get_model('inventory', 'Silla').objects.create(producto='Silla tiffany', cantidad=10)
+        evento = apps.get_model('inventory', 'Evento').objects.create(
+            nombre='Boda', cantidad_personas=80, responsable='Ana', lugar='Jardín',
+            fecha_inicio=datetime.date(2031, 5, 1), hora_inicio=datetime.time(18),
+        )
+        content_type, _ = ContentTypeAntes.objects.get_or_create(app_label='inventory', model='silla')
+        Linea = apps.get_model('inventory', 'EventoMobiliario')
+        Linea.objects.create(evento=evento, content_type=content_type, object_id=silla.pk, cantidad=4)
+        Linea.objects.create(evento=evento, content_type=content_type, object_id=silla.pk + 100, cantidad=1)
+
+        ejecutor = MigrationExecutor(connection)
+        ejecutor.migrate(self.despues)
+        Linea = ejecutor.loader.project_state(self.despues).apps.get_model('inventory', 'EventoMobiliario')
+        self.assertEqual(
+            list(Linea.objects.order_by('id').values_list('categoria', 'item_id', 'producto', 'categoria_etiqueta')),
+            [
+                ('silla', silla.pk, 'Silla tiffany', 'Sillas'),
+                ('silla', silla.pk + 100, 'Artículo eliminado', 'Sillas'),
+            ],
+        )
+
+
+class ReportCacheTests(TestCase):
+    """Caché de reportes con versión por tabla (ver report_cache.py)."""
+
+    url = '/api/inventory/items/bajo-stock/'
+
+    def setUp(self):
+        report_cache.get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        Silla.objects.create(producto='Silla tiffany', cantidad=2, stock_minimo=5)
+
+    def nombres(self, respuesta):
+        return sorted(item['nombre'] for item in respuesta.data)
+
+    def test_escritura_invalida_el_reporte(self):
+        self.assertEqual(self.client.get(self.url)['X-Report-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url)['X-Report-Cache'], 'HIT')
+
+        version = report_cache.versiones([CatalogoItem])
+        with self.captureOnCommitCallbacks(execute=True):
+            Silla.objects.create(producto='Silla chiavari', cantidad=1, stock_minimo=5)
+        self.assertNotEqual(report_cache.versiones([CatalogoItem]), version)
+
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Report-Cache'], 'MISS')
+        self.assertEqual(self.nombres(respuesta), ['Silla chiavari', 'Silla tiffany'])
+
+    def test_rollback_no_cambia_la_version(self):
+        self.client.get(self.url)
+        version = report_cache.versiones([CatalogoItem])
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Silla.objects.create(producto='Silla chiavari', cantidad=1, stock_minimo=5)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(report_cache.versiones([CatalogoItem]), version)
+
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Report-Cache'], 'HIT')
+        self.assertEqual(self.nombres(respuesta), ['Silla tiffany'])
+
+    @override_settings(INVENTORY_REPORT_CACHE_STALE_SECONDS=600)
+    def test_obsoleto_se_sirve_y_se_recalcula_aparte(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Silla.objects.create(producto='Silla chiavari', cantidad=1, stock_minimo=5)
+
+        with mock.patch.object(report_cache, '_revalidar') as revalidar:
+            respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Report-Cache'], 'STALE')
+        self.assertEqual(self.nombres(respuesta), ['Silla tiffany'])
+        revalidar.assert_called_once()
+
+        # El recálculo en segundo plano guarda el resultado con la versión nueva
+        llave, modelos, recalcular = revalidar.call_args.args
+        report_cache._guardar(llave, report_cache.versiones(modelos), recalcular())
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Report-Cache'], 'HIT')
+        self.assertEqual(self.nombres(respuesta), ['Silla chiavari', 'Silla tiffany'])
+
+
+class ReportJobTests(TestCase):
+    """Cola de reportes en segundo plano (ver jobs.py)."""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=self.media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        self.evento = crear_evento()
+
+    def encolar(self, formato='pdf', evento=None):
+        return jobs.encolar('uso_evento', formato, {'event_id': (evento or self.evento).pk})[0]
+
+    def test_post_duplicado_devuelve_el_mismo_trabajo(self):
+        datos = {'tipo': 'uso_evento', 'formato': 'pdf', 'parametros': {'event_id': self.evento.pk}}
+        primera = self.client.post('/api/inventory/report-jobs/', datos, format='json')
+        segunda = self.client.post('/api/inventory/report-jobs/', datos, format='json')
+        self.assertEqual((primera.status_code, segunda.status_code), (202, 200))
+        self.assertEqual(primera.data['id'], segunda.data['id'])
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+        # Con otros datos del evento la huella cambia y se encola otro
+        self.evento.nombre = 'Boda civil'
+        self.evento.save()
+        tercera = self.client.post('/api/inventory/report-jobs/', datos, format='json')
+        self.assertEqual(tercera.status_code, 202)
+        self.assertNotEqual(tercera.data['id'], primera.data['id'])
+
+    def test_reclamar_no_entrega_el_mismo_trabajo_dos_veces(self):
+        primero, segundo = self.encolar('pdf'), self.encolar('excel')
+        tomados = [jobs.reclamar(), jobs.reclamar()]
+        self.assertEqual(sorted(job.pk for job in tomados), sorted([primero.pk, segundo.pk]))
+        self.assertIsNone(jobs.reclamar())
+
+        # La reserva de un worker que murió vence y el trabajo se retoma
+        ReportJob.objects.filter(pk=primero.pk).update(reservado_hasta=timezone.now() - datetime.timedelta(seconds=1))
+        retomado = jobs.reclamar()
+        self.assertEqual((retomado.pk, retomado.intentos), (primero.pk, 2))
+        self.assertIsNone(jobs.reclamar())
+
+    @override_settings(REPORT_JOBS_MAX_ATTEMPTS=2)
+    def test_reintenta_hasta_el_limite(self):
+        job = self.encolar()
+
+        def falla(evento, destino, lineas=None):
+            raise RuntimeError('sin fuente')
+
+        with mock.patch.dict(documents.GENERADORES_USO_EVENTO, {'pdf': falla}), self.assertLogs('inventory.jobs'):
+            self.assertEqual(jobs.procesar_pendientes(), {'listos': 0, 'fallidos': 2})
+        job.refresh_from_db()
+        self.assertEqual((job.estado, job.intentos, job.ultimo_error), ('fallido', 2, 'sin fuente'))
+        # No quedan temporales del intento fallido
+        self.assertEqual(os.listdir(os.path.join(self.media, jobs.DIRECTORIO)), [])
+
+    def test_vencer_expirados_borra_el_archivo(self):
+        job = self.encolar()
+        self.assertEqual(jobs.procesar_pendientes(), {'listos': 1, 'fallidos': 0})
+        job.refresh_from_db()
+        ruta = job.archivo.path
+        self.assertTrue(os.path.exists(ruta))
+
+        self.assertEqual(jobs.vencer_expirados(), 0)
+        ReportJob.objects.filter(pk=job.pk).update(expira_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(jobs.vencer_expirados(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.estado, job.archivo.name), ('vencido', ''))
+        self.assertFalse(os.path.exists(ruta))
+        # Vencido, una nueva petición igual encola otro trabajo
+        self.assertNotEqual(self.encolar().pk, job.pk)
+
+
+class ExportacionTests(TestCase):
+    """`?export=csv|xlsx|jsonl` en listados y reportes (ver exports.py)."""
+
+    url = '/api/inventory/movimientos/'
+    columnas = [
+        'id', 'categoria', 'item_id', 'producto', 'bodega', 'bodega_nombre', 'delta',
+        'delta_mantenimiento', 'motivo', 'evento', 'degustacion', 'created_at',
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        self.silla = Silla.objects.create(producto='Silla tiffany', cantidad=10)
+        otra = Silla.objects.create(producto='Silla chiavari', cantidad=10)
+        for _ in range(3):
+            stock.ajustar(self.silla, 'ajuste', delta=1)
+        stock.ajustar(otra, 'ajuste', delta=1)
+
+    def descargar(self, url, **params):
+        respuesta = self.client.get(url, params)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.streaming)
+        return respuesta, b''.join(respuesta.streaming_content)
+
+    def test_csv_respeta_los_filtros(self):
+        respuesta, contenido = self.descargar(self.url, export='csv', item_id=self.silla.pk, page_size=1)
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(respuesta['Content-Disposition'], 'attachment; filename="movimiento.csv"')
+        self.assertTrue(contenido.startswith(codecs.BOM_UTF8))
+        filas = list(csv.reader(io.StringIO(contenido.decode('utf-8-sig'))))
+        self.assertEqual(filas[0], self.columnas)
+        # Sin paginación y solo los movimientos del artículo filtrado
+        self.assertEqual([fila[2] for fila in filas[1:]], [str(self.silla.pk)] * 3)
+
+    def test_xlsx(self):
+        respuesta, contenido = self.descargar(self.url, export='xlsx', item_id=self.silla.pk)
+        self.assertEqual(
+            respuesta['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        filas = list(openpyxl.load_workbook(io.BytesIO(contenido), read_only=True)['Datos'].values)
+        self.assertEqual(list(filas[0]), self.columnas)
+        self.assertEqual(len(filas), 4)
+
+    def test_jsonl(self):
+        respuesta, contenido = self.descargar(self.url, export='jsonl', item_id=self.silla.pk)
+        self.assertEqual(respuesta['Content-Type'], 'application/x-ndjson')
+        filas = [json.loads(linea) for linea in contenido.decode('utf-8').splitlines()]
+        self.assertEqual([list(fila) for fila in filas], [self.columnas] * 3)
+
+    def test_formato_invalido(self):
+        self.assertEqual(self.client.get(self.url, {'export': 'pdf'}).status_code, 400)
+
+    def test_reporte(self):
+        report_cache.get_cache().clear()
+        Silla.objects.create(producto='Silla plegable', cantidad=2, stock_minimo=5)
+        datos = self.client.get('/api/inventory/items/bajo-stock/').data
+        respuesta, contenido = self.descargar('/api/inventory/items/bajo-stock/', export='csv')
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(respuesta['Content-Disposition'], 'attachment; filename="bajo_stock.csv"')
+        filas = list(csv.reader(io.StringIO(contenido.decode('utf-8-sig'))))
+        self.assertEqual(filas[0], list(datos[0]))
+        self.assertEqual(len(filas), len(datos) + 1)
+        self.assertIn('Silla plegable', filas[1])
+
+
+@override_settings(REPORT_BUNDLE_PROCESSES=0)
+class ZipEventosTests(TestCase):
+    """Paquete ZIP de reportes de varios eventos (ver bundles.py)."""
+
+    def test_un_pdf_por_evento_y_el_libro(self):
+        lista = [crear_evento(f'Evento {n}', fecha=datetime.date(2030, 5, n + 1)) for n in range(3)]
+        with mock.patch.object(bundles, 'TAMANO_BLOQUE', 2):
+            fragmentos = list(bundles.zip_eventos([evento.pk for evento in lista]))
+        # Libro, dos bloques de PDF y el directorio central
+        self.assertEqual(len(fragmentos), 5)
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(fragmentos))) as archivo:
+            self.assertIsNone(archivo.testzip())
+            nombres = archivo.namelist()
+            self.assertEqual(nombres[0], 'reporte_eventos.xlsx')
+            self.assertEqual(sorted(nombres[1:]), sorted(bundles._nombre_pdf(evento) for evento in lista))
+            for nombre in nombres[1:]:
+                self.assertTrue(archivo.read(nombre).startswith(b'%PDF'))
+            libro = openpyxl.load_workbook(io.BytesIO(archivo.read('reporte_eventos.xlsx')))
+            self.assertTrue(libro.sheetnames)
+
+
+class RetencionTests(TestCase):
+    """Depuración de notificaciones vencidas (ver retention.py)."""
+
+    def setUp(self):
+        self.ahora = timezone.now()
+
+    def notificacion(self, dias, **kwargs):
+        notificacion = Notification.objects.create(message='Aviso', **kwargs)
+        Notification.objects.filter(pk=notificacion.pk).update(created_at=self.ahora - datetime.timedelta(days=dias))
+        return notificacion
+
+    def leido_hasta(self, nombre, notificacion, **kwargs):
+        usuario = User.objects.create_user(nombre, **kwargs)
+        NotificationReadState.objects.create(user=usuario, leido_hasta=notificacion.pk if notificacion else 0)
+
+    def test_vencidas(self):
+        muy_antigua = self.notificacion(400)
+        leida, sin_leer, tambien_sin_leer = self.notificacion(200), self.notificacion(200), self.notificacion(200)
+        reciente = self.notificacion(10)
+        self.leido_hasta('ana', reciente)
+        self.leido_hasta('beto', leida)
+        # Los usuarios inactivos no retienen notificaciones
+        self.leido_hasta('carla', None, is_active=False)
+
+        vencidas = set(retention.vencidas(self.ahora).values_list('pk', flat=True))
+        self.assertEqual(vencidas, {muy_antigua.pk, leida.pk})
+        self.assertNotIn(sin_leer.pk, vencidas)
+        self.assertNotIn(tambien_sin_leer.pk, vencidas)
+
+        # Sin estados de lectura sólo vence por la antigüedad máxima
+        NotificationReadState.objects.all().delete()
+        self.assertEqual(list(retention.vencidas(self.ahora).values_list('pk', flat=True)), [muy_antigua.pk])
+
+    def test_purgar_suma_al_resumen(self):
+        notificaciones = [self.notificacion(400, tipo='bajo_stock', severidad='aviso') for _ in range(3)]
+        creada = Notification.objects.get(pk=notificaciones[0].pk).created_at
+        mes = timezone.localdate(creada).replace(day=1)
+        anterior = creada - datetime.timedelta(hours=1)
+        NotificationResumenMensual.objects.create(
+            mes=mes, tipo='bajo_stock', severidad='aviso', total=5, primera=anterior, ultima=anterior,
+        )
+
+        self.assertEqual(list(retention.purgar(lote=2)), [2, 1])
+        self.assertFalse(Notification.objects.exists())
+        resumen = NotificationResumenMensual.objects.get()
+        self.assertEqual((resumen.mes, resumen.total), (mes, 8))
+        self.assertEqual((resumen.primera, resumen.ultima), (anterior, creada))
+
+
+class OutboxTests(TestCase):
+    """Bandeja de salida de correos (ver outbox.py)."""
+
+    def encolar(self):
+        return outbox.encolar('Aviso', 'Cuerpo', para=['ana@example.com'])
+
+    def test_transaccion_revertida_no_envia(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.encolar()
+            raise RuntimeError
+        self.assertFalse(EmailOutbox.objects.exists())
+        self.assertEqual(outbox.enviar_pendientes(), {'enviados': 0, 'reintentos': 0, 'fallidos': 0})
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(EMAIL_OUTBOX_BACKOFF_SECONDS=10)
+    def test_espera_exponencial(self):
+        self.assertEqual(
+            [outbox.espera_reintento(n).total_seconds() for n in (1, 2, 3, 4)], [10, 20, 40, 80],
+        )
+        self.assertEqual(outbox.espera_reintento(30).total_seconds(), outbox.BACKOFF_MAXIMO_SEGUNDOS)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_BACKOFF_SECONDS=10)
+    def test_fallido_tras_max_intentos(self):
+        correo = self.encolar()
+        resultados = []
+        with mock.patch.object(EmailMessage, 'send', side_effect=smtplib.SMTPException('sin servidor')), \
+                self.assertLogs('inventory.outbox', 'ERROR'):
+            for intentos in (1, 2, 3):
+                antes = timezone.now()
+                resultados.append(outbox.enviar_pendientes())
+                correo.refresh_from_db()
+                self.assertEqual((correo.intentos, correo.ultimo_error), (intentos, 'sin servidor'))
+                if correo.estado == 'pendiente':
+                    # Se reintenta después de la espera y no antes
+                    self.assertGreaterEqual(correo.proximo_intento, antes + outbox.espera_reintento(intentos))
+                    self.assertEqual(outbox.reclamar(10), [])
+                    EmailOutbox.objects.filter(pk=correo.pk).update(proximo_intento=timezone.now())
+        self.assertEqual(resultados, [
+            {'enviados': 0, 'reintentos': 1, 'fallidos': 0},
+            {'enviados': 0, 'reintentos': 1, 'fallidos': 0},
+            {'enviados': 0, 'reintentos': 0, 'fallidos': 1},
+        ])
+        self.assertEqual(correo.estado, 'fallido')
+        self.assertEqual(outbox.enviar_pendientes(), {'enviados': 0, 'reintentos': 0, 'fallidos': 0})
+
+
+class UmbralCategoriaTests(TestCase):
+    """Umbral de bajo stock por categoría en caché (ver thresholds.py)."""
+
+    def setUp(self):
+        report_cache.get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('encargado'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/inventory/stock-minimo/', {'categoria': 'silla', 'stock_minimo': 5}, format='json')
+        self.silla = Silla.objects.create(producto='Silla tiffany', cantidad=10)
+        self.url = f'/api/inventory/sillas/{self.silla.pk}/'
+
+    def consultas_de_umbral(self, datos):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.patch(self.url, datos, format='json').status_code, 200)
+        tabla = StockMinimoCategoria._meta.db_table
+        return sum(tabla in consulta['sql'] for consulta in consultas.captured_queries)
+
+    def test_una_consulta_por_ajuste(self):
+        # La alerta y la tabla unificada comparten el umbral leído
+        self.assertLessEqual(self.consultas_de_umbral({'cantidad': 6}), 1)
+        self.assertEqual(self.consultas_de_umbral({'cantidad': 4}), 0)
+        self.assertTrue(AlertaStockPendiente.objects.filter(item_id=self.silla.pk).exists())
+        self.assertEqual(CatalogoItem.objects.get(categoria='silla', item_id=self.silla.pk).umbral, 5)
+
+    def test_cambio_de_categoria_invalida(self):
+        self.assertEqual(thresholds.de_item(self.silla), 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.patch('/api/inventory/stock-minimo/silla/', {'stock_minimo': 3}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(thresholds.de_item(self.silla), 3)
+        self.assertEqual(CatalogoItem.objects.get(categoria='silla', item_id=self.silla.pk).umbral, 3)
+
+        stock.ajustar(self.silla, 'ajuste', delta=-6)
+        self.assertFalse(AlertaStockPendiente.objects.exists())
+        stock.ajustar(self.silla, 'ajuste', delta=-2)
+        self.assertTrue(AlertaStockPendiente.objects.exists())
@@ -0,0 +1,71 @@
+"""
+Stock mínimo (umbral de bajo stock) de los artículos de inventario.
+
+El umbral efectivo de un artículo es, en orden: su `stock_minimo`, el de su
+categoría (StockMinimoCategoria) o INVENTORY_LOW_STOCK_THRESHOLD. La alerta de
+bajo stock (models.alertar_bajo_stock) y el reporte LowStockInventoryView usan
+el mismo valor.
+
+La tabla unificada guarda el umbral efectivo de cada artículo en
+``CatalogoItem.umbral`` y la columna generada ``bajo_stock``, así el reporte lee
+el conjunto ya calculado por un índice parcial. Cambiar el umbral de una
+categoría actualiza sus filas con un solo UPDATE; cambiar el valor global
+requiere ``manage.py rebuild_catalog``.
+
+Los umbrales por categoría se leen en cada ajuste de stock que baja la cantidad
+y en cada guardado del artículo, así que `de_categorias` los guarda en el caché
+de reportes con la versión de la tabla StockMinimoCategoria (ver
+report_cache.py); `recalcular_categoria` cambia esa versión.
+"""
+from django.conf import settings
+
+from . import report_cache
+from .categories import CATEGORIAS
+from .models import UMBRAL_BAJO_STOCK, CatalogoItem, StockMinimoCategoria
+
+PREFIJO = 'inventory:umbrales'
+
+
+def por_defecto():
+    return getattr(settings, 'INVENTORY_LOW_STOCK_THRESHOLD', UMBRAL_BAJO_STOCK)
+
+
+def _leer_categorias():
+    umbrales = {categoria.slug: por_defecto() for categoria in CATEGORIAS}
+    umbrales.update(StockMinimoCategoria.objects.values_list('categoria', 'stock_minimo'))
+    return umbrales
+
+
+def de_categorias():
+    """{slug: umbral} de todas las categorías, del caché o con una consulta."""
+    if not report_cache.activo():
+        return _leer_categorias()
+    cache = report_cache.get_cache()
+    version, = report_cache.versiones([StockMinimoCategoria])
+    llave = f'{PREFIJO}:{version}:{por_defecto()}'
+    umbrales = cache.get(llave)
+    if umbrales is None:
+        umbrales = _leer_categorias()
+        cache.set(llave, umbrales, report_cache.timeout())
+    return umbrales
+
+
+def de_categoria(slug):
+    return de_categorias().get(slug, por_defecto())
+
+
+def de_item(item):
+    """Umbral efectivo de un artículo de categoría."""
+    if item.stock_minimo is not None:
+        return item.stock_minimo
+    return de_categoria(item._meta.model_name)
+
+
+def recalcular_categoria(slug):
+    """Aplica el umbral actual de la categoría a sus artículos sin umbral propio (un UPDATE)."""
+    # Sin caché: la versión nueva recién se publica al confirmarse la transacción
+    actualizados = CatalogoItem.objects.filter(categoria=slug, stock_minimo__isnull=True).update(
+        umbral=_leer_categorias().get(slug, por_defecto())
+    )
+    report_cache.invalidar(CatalogoItem, StockMinimoCategoria)
+    return actualizados
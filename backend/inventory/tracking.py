@@ -0,0 +1,85 @@
+"""
+Rastreo de cambios en los campos de un modelo sin consultas adicionales.
+
+Al cargar una fila desde la base de datos (``Model.from_db``) se guarda una copia
+de los valores leídos. Con ella ``save`` puede saber qué cambió (un estado que
+pasa a 'Finalizado', una cantidad que cruza el umbral de bajo stock) sin volver
+a leer la fila, y escribir sólo las columnas modificadas.
+"""
+
+SIN_VALOR = object()
+
+
+class RastreoCamposMixin:
+    """
+    Mixin para modelos que necesitan comparar sus valores con los de la base de datos.
+
+    Las instancias cargadas desde la base de datos guardan sólo las columnas
+    modificadas (más las ``auto_now`` y las diferidas que se asignaron) cuando
+    se llama a ``save()`` sin ``update_fields``. Las instancias nuevas se
+    guardan completas.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # field_names son attnames; los campos diferidos no se rastrean
+        instance._valores_originales = {
+            nombre: instance.__dict__[nombre] for nombre in field_names if nombre in instance.__dict__
+        }
+        return instance
+
+    def valor_original(self, campo, default=None):
+        """Valor de `campo` (attname) al cargarse desde la base de datos."""
+        return getattr(self, '_valores_originales', {}).get(campo, default)
+
+    def ha_cambiado(self, campo):
+        original = self.valor_original(campo, SIN_VALOR)
+        return original is not SIN_VALOR and original != getattr(self, campo)
+
+    def campos_modificados(self):
+        """
+        Nombres de los campos cargados cuyo valor cambió desde la carga, más los
+        que estaban diferidos (``only``/``defer``) y se asignaron después: de
+        ésos no hay valor original con qué comparar, así que se guardan siempre.
+        """
+        originales = getattr(self, '_valores_originales', {})
+        return [
+            field.name for field in self._meta.concrete_fields
+            if (
+                field.attname in originales and originales[field.attname] != getattr(self, field.attname)
+            ) or (
+                field.attname not in originales and field.attname in self.__dict__
+            )
+        ]
+
+    def actualizar_instantanea(self, *campos):
+        """Marca los valores actuales de `campos` (o de todos) como los guardados."""
+        originales = getattr(self, '_valores_originales', None)
+        if originales is None:
+            return
+        for field in self._meta.concrete_fields:
+            if not campos or field.name in campos or field.attname in campos:
+                if field.attname in self.__dict__:
+                    originales[field.attname] = getattr(self, field.attname)
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and hasattr(self, '_valores_originales')
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not args
+        ):
+            kwargs['update_fields'] = self.campos_modificados() + [
+                field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+            ]
+        super().save(*args, **kwargs)
+
+        if not hasattr(self, '_valores_originales'):
+            self._valores_originales = {}
+        self.actualizar_instantanea(*(kwargs.get('update_fields') or ()))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.actualizar_instantanea(*(fields or ()))
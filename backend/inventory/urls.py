@@ -1,36 +1,33 @@
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
+from .categories import CATEGORIAS
 from .views import (
-    TipoEventoViewSet, BodegaViewSet, ClienteViewSet, ManteleriaViewSet, CubiertoViewSet, LozaViewSet, 
-    CristaleriaViewSet, SillaViewSet, MesaViewSet, SalaLoungeViewSet, PeriqueraViewSet, CarpaViewSet, 
-    PistaTarimaViewSet, ExtraViewSet, EventoViewSet, ContentTypeViewSet, DegustacionViewSet, ProductViewSet, 
+    INVENTARIO_VIEWSETS, TipoEventoViewSet, BodegaViewSet, ClienteViewSet, EventoViewSet, ContentTypeViewSet, DegustacionViewSet, ProductViewSet, 
     CalendarDataAPIView, NotificationViewSet, InventoryUsageReportView, BackupCreateView, BackupRestoreView,
     LowStockInventoryView, WarehouseInventoryReportView, MaintenanceReportView, EventAnalysisReportView,
-    HomeSectionViewSet, InvitationViewSet
+    LowStockInventoryAsyncView, WarehouseInventoryReportAsyncView, MaintenanceReportAsyncView,
+    HomeSectionViewSet, InvitationViewSet, StockMovementViewSet, AvailabilityView, notification_stream,
+    CalendarFeedViewSet, CalendarFeedICSView, StockMinimoCategoriaViewSet, ReportJobViewSet, EventReportBundleView
 )
 
 router = DefaultRouter()
 router.register(r'tipos-evento', TipoEventoViewSet, basename='tipo evento')
 router.register(r'bodegas', BodegaViewSet, basename='bodega')
 router.register(r'clientes', ClienteViewSet, basename='cliente')
-router.register(r'mantelerias', ManteleriaViewSet, basename='manteleria')
-router.register(r'cubiertos', CubiertoViewSet, basename='cubierto')
-router.register(r'lozas', LozaViewSet, basename='loza')
-router.register(r'cristalerias', CristaleriaViewSet, basename='cristaleria')
-router.register(r'sillas', SillaViewSet, basename='silla')
-router.register(r'mesas', MesaViewSet, basename='mesa')
-router.register(r'salas-lounge', SalaLoungeViewSet, basename='sala-lounge')
-router.register(r'periqueras', PeriqueraViewSet, basename='periquera')
-router.register(r'carpas', CarpaViewSet, basename='carpa')
-router.register(r'pistas-tarimas', PistaTarimaViewSet, basename='pista-tarima')
-router.register(r'extras', ExtraViewSet, basename='extra')
+# Una ruta por categoría de inventario (ver categories.CATEGORIAS)
+for categoria in CATEGORIAS:
+    router.register(categoria.ruta, INVENTARIO_VIEWSETS[categoria.slug], basename=categoria.basename)
 router.register(r'eventos', EventoViewSet, basename='evento')
 router.register(r'degustaciones', DegustacionViewSet, basename='degustacion')
 router.register(r'content-types', ContentTypeViewSet, basename='content-type')
 router.register(r'products', ProductViewSet, basename='product')
 router.register(r'notifications', NotificationViewSet, basename='notification')
+router.register(r'movimientos', StockMovementViewSet, basename='movimiento')
 router.register(r'home-sections', HomeSectionViewSet, basename='home-section')
 router.register(r'invitaciones', InvitationViewSet, basename='invitacion')
+router.register(r'calendar-feeds', CalendarFeedViewSet, basename='calendar-feed')
+router.register(r'stock-minimo', StockMinimoCategoriaViewSet, basename='stock-minimo')
+router.register(r'report-jobs', ReportJobViewSet, basename='report-job')
 
 urlpatterns = [
     # 1. OTRAS RUTAS PERSONALIZADAS
@@ -40,16 +37,36 @@ urlpatterns = [
     
     # 2. Low stock inventory endpoint
     path('items/bajo-stock/', LowStockInventoryView.as_view(), name='low-stock-inventory'),
+    path('items/bajo-stock/async/', LowStockInventoryAsyncView.as_view(), name='low-stock-inventory-async'),
     
     # 3. Warehouse inventory report endpoint
     path('items/warehouse-report/', WarehouseInventoryReportView.as_view(), name='warehouse-inventory-report'),
+    path('items/warehouse-report/async/', WarehouseInventoryReportAsyncView.as_view(), name='warehouse-inventory-report-async'),
     
     # 4. Maintenance report endpoint
     path('items/maintenance-report/', MaintenanceReportView.as_view(), name='maintenance-report'),
+    path('items/maintenance-report/async/', MaintenanceReportAsyncView.as_view(), name='maintenance-report-async'),
     
     # 5. Event analysis report endpoint
     path('items/event-analysis/', EventAnalysisReportView.as_view(), name='event-analysis'),
     
-    # 6. ROUTER (AL FINAL)
+    # 5a. Per-event usage report (?format=pdf|excel&event_id=) and events by date range
+    path('reports/', InventoryUsageReportView.as_view(), name='inventory-usage-report'),
+    path('reports/download/', InventoryUsageReportView.as_view(), name='inventory-usage-report-download'),
+
+    # 5b. Multi-event report bundle (ZIP streamed while it is generated)
+    path('reports/bundle/', EventReportBundleView.as_view(), name='report-bundle'),
+
+    # 6. Date-aware availability endpoint
+    path('availability/', AvailabilityView.as_view(), name='availability'),
+
+    # 7. Live notifications (Server-Sent Events, requiere ASGI); antes del router
+    # para que no la capture la ruta de detalle notifications/<pk>/
+    path('notifications/stream/', notification_stream, name='notification-stream'),
+
+    # 8. Feed iCalendar público (autenticado por el token de la URL)
+    path('calendar/feeds/<str:token>.ics', CalendarFeedICSView.as_view(), name='calendar-feed-ics'),
+
+    # 9. ROUTER (AL FINAL)
     path('', include(router.urls)), 
 ]
\ No newline at end of file
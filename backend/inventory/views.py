@@ -3,46 +3,49 @@ import shutil
 from rest_framework import serializers, viewsets, filters, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import FileResponse, Http404, HttpResponse # Combinamos HttpResponse aquí
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse # Combinamos HttpResponse aquí
 from django.db import connection, transaction, models
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.views import View
 
 # Importaciones de Modelos y Serializadores (Se mantienen al final)
 from .models import (
-    TipoEvento, Bodega, Cliente, Manteleria, Cubierto, Loza, Cristaleria, Silla, Mesa, SalaLounge, 
-    Periquera, Carpa, PistaTarima, Extra, Evento, EventoMobiliario, Degustacion, DegustacionMobiliario, Product, Notification, HomeSection, HomeSectionImage, Invitation
+    TipoEvento, Bodega, Cliente, Evento, Degustacion, Product, Notification, HomeSection, HomeSectionImage, Invitation,
+    CatalogoItem, StockMovement, CalendarFeed, StockMinimoCategoria, ReportJob
 )
 from .serializers import (
-    TipoEventoSerializer, BodegaSerializer, ClienteSerializer, ManteleriaSerializer, CubiertoSerializer, 
-    LozaSerializer, CristaleriaSerializer, SillaSerializer, MesaSerializer, SalaLoungeSerializer, 
-    PeriqueraSerializer, CarpaSerializer, PistaTarimaSerializer, ExtraSerializer, EventoSerializer, DegustacionSerializer,
-    ProductSerializer, CalendarActivitySerializer, NotificationSerializer, HomeSectionSerializer, HomeSectionImageSerializer, InvitationSerializer
+    TipoEventoSerializer, BodegaSerializer, ClienteSerializer, EventoSerializer, DegustacionSerializer,
+    ProductSerializer, NotificationSerializer, HomeSectionSerializer, HomeSectionImageSerializer, InvitationSerializer,
+    StockMovementSerializer, CalendarFeedSerializer, StockMinimoCategoriaSerializer, ReportJobSerializer
+)
+from .categories import CATEGORIAS, get_categoria
+from . import (
+    availability, bundles, catalog, conditional, documents, exports, feeds, jobs, notifications, parallel, renders, report_cache, reports, reservations, retention,
+    schedule, sse, stock, thresholds,
 )
 
 # 💡 Importación ÚNICA Y CORRECTA de datetime
 from datetime import datetime, timedelta 
 
-import unidecode
 from io import BytesIO
 from openpyxl import Workbook
-from reportlab.pdfgen import canvas # Asegúrate de tener estas importaciones si las usas abajo
-from reportlab.lib.pagesizes import letter 
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-import openpyxl 
-
-from openpyxl.styles import Font, Alignment
 
-class TipoEventoViewSet(viewsets.ModelViewSet):
+class TipoEventoViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = TipoEvento.objects.all()
     serializer_class = TipoEventoSerializer
     permission_classes = [IsAuthenticated]
 
-class BodegaViewSet(viewsets.ModelViewSet):
+class BodegaViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = Bodega.objects.all()
     serializer_class = BodegaSerializer
     permission_classes = [IsAuthenticated]
@@ -57,18 +60,22 @@ class MantenimientoMixin:
         if not isinstance(cantidad_a_mantenimiento, int) or cantidad_a_mantenimiento <= 0:
             return Response({'error': 'La cantidad debe ser un número positivo.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if cantidad_a_mantenimiento > item.cantidad:
+        saldos = stock.ajustar(
+            item, 'mantenimiento', delta=-cantidad_a_mantenimiento, delta_mantenimiento=cantidad_a_mantenimiento
+        )
+        if saldos is None:
             return Response({'error': 'No hay suficiente stock disponible para enviar a mantenimiento.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        item.cantidad -= cantidad_a_mantenimiento
-        item.cantidad_en_mantenimiento += cantidad_a_mantenimiento
-        item.save()
-
         # Crear notificación
         message = f"Han ingresado al mantenimiento {cantidad_a_mantenimiento} {item.producto}."
-        Notification.objects.create(message=message)
+        notifications.notificar('mantenimiento_entrada', message, item=item, cantidad=cantidad_a_mantenimiento)
 
-        return Response({'status': 'success', 'message': f'{cantidad_a_mantenimiento} unidades enviadas a mantenimiento.'}, status=status.HTTP_200_OK)
+        return Response({
+            'status': 'success',
+            'message': f'{cantidad_a_mantenimiento} unidades enviadas a mantenimiento.',
+            'cantidad': saldos[0],
+            'cantidad_en_mantenimiento': saldos[1],
+        }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     @transaction.atomic
@@ -79,112 +86,91 @@ class MantenimientoMixin:
         if not isinstance(cantidad_a_reintegrar, int) or cantidad_a_reintegrar <= 0:
             return Response({'error': 'La cantidad debe ser un número positivo.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if cantidad_a_reintegrar > item.cantidad_en_mantenimiento:
+        saldos = stock.ajustar(
+            item, 'reintegro', delta=cantidad_a_reintegrar, delta_mantenimiento=-cantidad_a_reintegrar
+        )
+        if saldos is None:
             return Response({'error': 'La cantidad a reintegrar excede la que está en mantenimiento.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        item.cantidad_en_mantenimiento -= cantidad_a_reintegrar
-        item.cantidad += cantidad_a_reintegrar
-        item.save()
-
         # Crear notificación
         message = f"Han salido del mantenimiento {cantidad_a_reintegrar} {item.producto}."
-        Notification.objects.create(message=message)
+        notifications.notificar('mantenimiento_salida', message, item=item, cantidad=cantidad_a_reintegrar)
 
-        return Response({'status': 'success', 'message': f'{cantidad_a_reintegrar} unidades reintegradas al stock.'}, status=status.HTTP_200_OK)
+        return Response({
+            'status': 'success',
+            'message': f'{cantidad_a_reintegrar} unidades reintegradas al stock.',
+            'cantidad': saldos[0],
+            'cantidad_en_mantenimiento': saldos[1],
+        }, status=status.HTTP_200_OK)
 
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = Cliente.objects.all()
     serializer_class = ClienteSerializer
     permission_classes = [IsAuthenticated]
 
-class ManteleriaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Manteleria.objects.all().order_by('-created_at')
-    serializer_class = ManteleriaSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
-
-class CubiertoViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Cubierto.objects.all().order_by('-created_at')
-    serializer_class = CubiertoSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
-
-class LozaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Loza.objects.all().order_by('-created_at')
-    serializer_class = LozaSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
-
-class CristaleriaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Cristaleria.objects.all().order_by('-created_at')
-    serializer_class = CristaleriaSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
-
-class SillaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Silla.objects.all().order_by('-created_at')
-    serializer_class = SillaSerializer
+class InventarioItemViewSet(exports.ExportarListaMixin, MantenimientoMixin, viewsets.ModelViewSet):
+    """Viewset base de las categorías de inventario; ver inventario_viewset()."""
+    categoria = None
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['producto', 'descripcion']
 
-class MesaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Mesa.objects.all().order_by('-created_at')
-    serializer_class = MesaSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """
+        Los cambios de `cantidad` y `cantidad_en_mantenimiento` no se guardan con
+        el resto del artículo: se aplican con stock.ajustar (motivo 'ajuste'), que
+        los registra en la bitácora. La cantidad no puede quedar por debajo de las
+        unidades ya reservadas de ahora en adelante.
+        """
+        item = serializer.instance
+        datos = serializer.validated_data
+        cantidad = datos.pop('cantidad', None)
+        mantenimiento = datos.pop('cantidad_en_mantenimiento', None)
+
+        if cantidad is not None or mantenimiento is not None:
+            llave = (self.categoria.slug, item.pk)
+            # Fila bloqueada: los saldos y las reservas no cambian hasta el commit
+            actual = reservations.bloquear([llave])[llave]
+            cantidad = actual.cantidad if cantidad is None else cantidad
+            mantenimiento = actual.cantidad_en_mantenimiento if mantenimiento is None else mantenimiento
+            reservado = availability.comprometido(llave)
+            if cantidad < reservado:
+                raise serializers.ValidationError({
+                    'cantidad': f'Hay {reservado} unidades reservadas en eventos y degustaciones próximos.'
+                })
+            delta = cantidad - actual.cantidad
+            delta_mantenimiento = mantenimiento - actual.cantidad_en_mantenimiento
+            if (delta or delta_mantenimiento) and stock.ajustar(
+                item, 'ajuste', delta=delta, delta_mantenimiento=delta_mantenimiento
+            ) is None:
+                raise serializers.ValidationError({'cantidad': 'El stock no puede quedar negativo.'})
 
-class SalaLoungeViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = SalaLounge.objects.all().order_by('-created_at')
-    serializer_class = SalaLoungeSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
+        serializer.save()
 
-class PeriqueraViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Periquera.objects.all().order_by('-created_at')
-    serializer_class = PeriqueraSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
 
-class CarpaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Carpa.objects.all().order_by('-created_at')
-    serializer_class = CarpaSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
+def inventario_viewset(categoria):
+    """Construye el viewset de una categoría registrada en categories.CATEGORIAS."""
+    return type(f'{categoria.modelo.__name__}ViewSet', (InventarioItemViewSet,), {
+        'categoria': categoria,
+        'queryset': categoria.modelo.objects.all().order_by('-created_at'),
+        'serializer_class': categoria.serializer,
+    })
 
-class PistaTarimaViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = PistaTarima.objects.all().order_by('-created_at')
-    serializer_class = PistaTarimaSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
 
-class ExtraViewSet(MantenimientoMixin, viewsets.ModelViewSet):
-    queryset = Extra.objects.all().order_by('-created_at')
-    serializer_class = ExtraSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['producto', 'descripcion']
+INVENTARIO_VIEWSETS = {categoria.slug: inventario_viewset(categoria) for categoria in CATEGORIAS}
 
 
 # --- Vistas para Eventos con lógica de negocio ---
 
-class EventoViewSet(viewsets.ModelViewSet):
+class EventoViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = Evento.objects.all().order_by('-created_at')
     serializer_class = EventoSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = super().get_queryset().prefetch_related('mobiliario_asignado__content_object')
+        queryset = super().get_queryset().prefetch_related('mobiliario_asignado')
         
         tipo_evento = self.request.query_params.get('tipo_evento')
         if tipo_evento:
@@ -204,39 +190,21 @@ class EventoViewSet(viewsets.ModelViewSet):
 
         mobiliario_data = serializer.validated_data.pop('mobiliario', [])
 
-        # 1. Validar stock
-        for item in mobiliario_data:
-            content_type = ContentType.objects.get_for_id(item['content_type_id'])
-            model_class = content_type.model_class()
-            try:
-                obj = model_class.objects.get(id=item['object_id'])
-                if obj.cantidad < item['cantidad']:
-                    return Response(
-                        {'error': f"No hay suficiente stock para {obj.producto}. Disponible: {obj.cantidad}"},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            except model_class.DoesNotExist:
-                return Response(
-                    {'error': f"El item de mobiliario con id {item['object_id']} no existe."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        # 2. Crear evento y reducir stock
+        # 1. Bloquear el mobiliario y validar disponibilidad en las fechas del evento
+        pedido = reservations.Pedido(
+            'evento', mobiliario_data,
+            serializer.validated_data['fecha_inicio'], serializer.validated_data['hora_inicio'],
+        )
+        error = pedido.validar()
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 2. Crear evento y reservar el mobiliario (el stock no se descuenta)
         evento = serializer.save()
-        for item in mobiliario_data:
-            content_type = ContentType.objects.get_for_id(item['content_type_id'])
-            model_class = content_type.model_class()
-            obj = model_class.objects.get(id=item['object_id'])
-            obj.cantidad -= item['cantidad']
-            obj.save()
-
-            EventoMobiliario.objects.create(
-                evento=evento,
-                content_type=content_type,
-                object_id=obj.id,
-                cantidad=item['cantidad']
-            )
+        pedido.asignar(evento, reemplazar=False)
 
+        # Releer con el mobiliario precargado para serializar sin N+1
+        serializer = self.get_serializer(self.get_queryset().get(pk=evento.pk))
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
@@ -248,33 +216,31 @@ class EventoViewSet(viewsets.ModelViewSet):
 
         mobiliario_data = serializer.validated_data.pop('mobiliario', None)
 
-        # Si se está actualizando el mobiliario
+        datos = serializer.validated_data
+        fecha = datos.get('fecha_inicio', instance.fecha_inicio)
+        hora = datos.get('hora_inicio', instance.hora_inicio)
+        estado = datos.get('estado', instance.estado)
+
+        # Si cambia la fecha, el mobiliario actual se vuelve a reservar en la nueva ventana
+        if mobiliario_data is None and (fecha, hora) != (instance.fecha_inicio, instance.hora_inicio):
+            mobiliario_data = [
+                {'content_type_id': item.content_type_id, 'object_id': item.item_id, 'cantidad': item.cantidad}
+                for item in instance.mobiliario_asignado.all()
+            ]
+
         if mobiliario_data is not None:
-            # 1. Devolver inventario antiguo
-            for item_asignado in instance.mobiliario_asignado.all():
-                item_asignado.content_object.cantidad += item_asignado.cantidad
-                item_asignado.content_object.save()
-            instance.mobiliario_asignado.all().delete()
-
-            # 2. Validar y asignar nuevo inventario
-            for item in mobiliario_data:
-                content_type = ContentType.objects.get_for_id(item['content_type_id'])
-                model_class = content_type.model_class()
-                obj = model_class.objects.get(id=item['object_id'])
-                if obj.cantidad < item['cantidad']:
-                    raise serializers.ValidationError(f"No hay suficiente stock para {obj.producto}. Disponible: {obj.cantidad}")
-                
-                obj.cantidad -= item['cantidad']
-                obj.save()
-                EventoMobiliario.objects.create(
-                    evento=instance,
-                    content_type=content_type,
-                    object_id=obj.id,
-                    cantidad=item['cantidad']
-                )
+            pedido = reservations.Pedido('evento', mobiliario_data, fecha, hora, excluir=instance)
+            activo = estado not in ['Finalizado', 'Cancelado']
+
+            if activo:
+                error = pedido.validar()
+                if error:
+                    raise serializers.ValidationError(error)
+
+            pedido.asignar(instance, reservar=activo)
 
         self.perform_update(serializer)
-        return Response(serializer.data)
+        return Response(self.get_serializer(self.get_queryset().get(pk=instance.pk)).data)
 
 
 # Vista para obtener los tipos de contenido de mobiliario
@@ -282,7 +248,7 @@ class ContentTypeViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = ContentType.objects.filter(
         app_label='inventory',
-        model__in=['manteleria', 'cubierto', 'loza', 'cristaleria', 'silla', 'mesa', 'salalounge', 'periquera', 'carpa', 'pistatarima', 'extra']
+        model__in=[categoria.slug for categoria in CATEGORIAS]
     ).order_by('model')
     serializer_class = serializers.Serializer # Un serializer genérico es suficiente
 
@@ -293,13 +259,13 @@ class ContentTypeViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(data)
 
 
-class DegustacionViewSet(viewsets.ModelViewSet):
+class DegustacionViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = Degustacion.objects.all().order_by('-created_at')
     serializer_class = DegustacionSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = super().get_queryset().prefetch_related('mobiliario_asignado__content_object')
+        queryset = super().get_queryset().prefetch_related('mobiliario_asignado')
         
         # Filtering by year and month
         year = self.request.query_params.get('year')
@@ -319,37 +285,21 @@ class DegustacionViewSet(viewsets.ModelViewSet):
 
         mobiliario_data = serializer.validated_data.pop('mobiliario', [])
 
-        for item in mobiliario_data:
-            content_type = ContentType.objects.get_for_id(item['content_type_id'])
-            model_class = content_type.model_class()
-            try:
-                obj = model_class.objects.get(id=item['object_id'])
-                if obj.cantidad < item['cantidad']:
-                    return Response(
-                        {'error': f"No hay suficiente stock para {obj.producto}. Disponible: {obj.cantidad}"},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            except model_class.DoesNotExist:
-                return Response(
-                    {'error': f"El item de mobiliario con id {item['object_id']} no existe."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        # 1. Bloquear el mobiliario y validar disponibilidad en las fechas del degustación
+        pedido = reservations.Pedido(
+            'degustacion', mobiliario_data,
+            serializer.validated_data['fecha_degustacion'], serializer.validated_data['hora_degustacion'],
+        )
+        error = pedido.validar()
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
+        # 2. Crear degustación y reservar el mobiliario (el stock no se descuenta)
         degustacion = serializer.save()
-        for item in mobiliario_data:
-            content_type = ContentType.objects.get_for_id(item['content_type_id'])
-            model_class = content_type.model_class()
-            obj = model_class.objects.get(id=item['object_id'])
-            obj.cantidad -= item['cantidad']
-            obj.save()
-
-            DegustacionMobiliario.objects.create(
-                degustacion=degustacion,
-                content_type=content_type,
-                object_id=obj.id,
-                cantidad=item['cantidad']
-            )
+        pedido.asignar(degustacion, reemplazar=False)
 
+        # Releer con el mobiliario precargado para serializar sin N+1
+        serializer = self.get_serializer(self.get_queryset().get(pk=degustacion.pk))
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
@@ -361,33 +311,34 @@ class DegustacionViewSet(viewsets.ModelViewSet):
 
         mobiliario_data = serializer.validated_data.pop('mobiliario', None)
 
+        datos = serializer.validated_data
+        fecha = datos.get('fecha_degustacion', instance.fecha_degustacion)
+        hora = datos.get('hora_degustacion', instance.hora_degustacion)
+        estado = datos.get('estado', instance.estado)
+
+        # Si cambia la fecha, el mobiliario actual se vuelve a reservar en la nueva ventana
+        if mobiliario_data is None and (fecha, hora) != (instance.fecha_degustacion, instance.hora_degustacion):
+            mobiliario_data = [
+                {'content_type_id': item.content_type_id, 'object_id': item.item_id, 'cantidad': item.cantidad}
+                for item in instance.mobiliario_asignado.all()
+            ]
+
         if mobiliario_data is not None:
-            for item_asignado in instance.mobiliario_asignado.all():
-                item_asignado.content_object.cantidad += item_asignado.cantidad
-                item_asignado.content_object.save()
-            instance.mobiliario_asignado.all().delete()
-
-            for item in mobiliario_data:
-                content_type = ContentType.objects.get_for_id(item['content_type_id'])
-                model_class = content_type.model_class()
-                obj = model_class.objects.get(id=item['object_id'])
-                if obj.cantidad < item['cantidad']:
-                    raise serializers.ValidationError(f"No hay suficiente stock para {obj.producto}. Disponible: {obj.cantidad}")
-                
-                obj.cantidad -= item['cantidad']
-                obj.save()
-                DegustacionMobiliario.objects.create(
-                    degustacion=instance,
-                    content_type=content_type,
-                    object_id=obj.id,
-                    cantidad=item['cantidad']
-                )
+            pedido = reservations.Pedido('degustacion', mobiliario_data, fecha, hora, excluir=instance)
+            activo = estado not in ['Finalizado', 'Cancelado']
+
+            if activo:
+                error = pedido.validar()
+                if error:
+                    raise serializers.ValidationError(error)
+
+            pedido.asignar(instance, reservar=activo)
 
         self.perform_update(serializer)
-        return Response(serializer.data)
+        return Response(self.get_serializer(self.get_queryset().get(pk=instance.pk)).data)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
@@ -395,311 +346,426 @@ class ProductViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description', 'colors']
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
-    queryset = Notification.objects.all().order_by('-created_at')
+class NotificationPagination(CursorPagination):
+    """Paginación por cursor sobre (created_at, id): cada página cuesta lo mismo sin importar la profundidad."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class NotificationViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
+    """
+    Notificaciones del inventario. Filtros: tipo (uno o varios separados por
+    coma), severidad, categoria, item_id, evento, degustacion, desde y hasta
+    (AAAA-MM-DD) e is_read.
+    """
+    queryset = Notification.objects.all().order_by('-created_at', '-id')
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationPagination
+
+    @cached_property
+    def estado_lectura(self):
+        estado = notifications.estado_de(self.request.user)
+        return estado, notifications.excepciones(self.request.user, estado.leido_hasta)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        if params.get('tipo'):
+            queryset = queryset.filter(tipo__in=params['tipo'].split(','))
+        queryset = filtrar_por_campos(
+            queryset, params, texto=('severidad', 'categoria'), enteros=('item_id', 'evento', 'degustacion'),
+        )
+        try:
+            if params.get('desde'):
+                desde = datetime.strptime(params['desde'], '%Y-%m-%d')
+                queryset = queryset.filter(created_at__gte=timezone.make_aware(desde))
+            if params.get('hasta'):
+                hasta = datetime.strptime(params['hasta'], '%Y-%m-%d') + timedelta(days=1)
+                queryset = queryset.filter(created_at__lt=timezone.make_aware(hasta))
+        except ValueError:
+            raise serializers.ValidationError({'error': 'Formato de fecha inválido. Usa AAAA-MM-DD.'})
+
+        # ?is_read=true|false según el estado de lectura del usuario
+        is_read = params.get('is_read')
+        if is_read is not None:
+            estado, leidas = self.estado_lectura
+            no_leida = models.Q(id__gt=estado.leido_hasta) & ~models.Q(id__in=leidas)
+            queryset = queryset.filter(no_leida if is_read.lower() in ('false', '0') else ~no_leida)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None and self.request.user.is_authenticated:
+            estado, leidas = self.estado_lectura
+            context.update(leido_hasta=estado.leido_hasta, leidas=leidas)
+        return context
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        """Número de notificaciones no leídas del usuario (para la campana del navbar)."""
+        return Response({'unread_count': notifications.contar_no_leidas(request.user)})
+
+    @action(detail=True, methods=['post'])
+    def mark_as_read(self, request, pk=None):
+        notifications.marcar(request.user, self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=['post'])
     def mark_all_as_read(self, request):
-        Notification.objects.filter(is_read=False).update(is_read=True)
+        notifications.marcar_todas(request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=['post'])
     def delete_all(self, request):
-        Notification.objects.all().delete()
+        # Por lotes, para no retener el candado de escritura durante todo el borrado
+        for _ in retention.purgar(Notification.objects.all()):
+            pass
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _usuario_jwt(request):
+    """
+    Usuario del token JWT para las vistas async, que no pasan por DRF
+    (encabezado Authorization o ?token=, porque EventSource no envía encabezados).
+    """
+    autenticacion = JWTAuthentication()
+    header = autenticacion.get_header(request)
+    token = autenticacion.get_raw_token(header) if header else request.GET.get('token')
+    if not token:
+        return None
+    try:
+        return autenticacion.get_user(autenticacion.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def notification_stream(request):
+    """
+    Stream de Server-Sent Events con las notificaciones nuevas (ver sse.py).
+
+    Requiere un servidor ASGI (backend/asgi.py). Acepta `Last-Event-ID` (o
+    `?last_event_id=`) para reenviar las notificaciones perdidas al reconectar.
+    """
+    if 'wsgi.input' in request.META:
+        # Bajo WSGI (ej. runserver) el stream ocuparía un hilo para siempre; el
+        # frontend vuelve a consultar unread_count periódicamente
+        return JsonResponse({'detail': 'El stream requiere un servidor ASGI.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    user = await sync_to_async(_usuario_jwt)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({'detail': 'Token inválido o ausente.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    ultimo_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        ultimo_id = int(ultimo_id) if ultimo_id else None
+    except ValueError:
+        ultimo_id = None
+
+    broadcaster = sse.get_broadcaster()
+    cola = broadcaster.suscribir()
+    response = StreamingHttpResponse(sse.eventos(broadcaster, cola, ultimo_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Evitar que un proxy (nginx) acumule el stream
+    return response
+
+
+class AvailabilityView(APIView):
+    """
+    Disponibilidad de mobiliario por fechas, para muchos artículos en una sola llamada.
+
+    Ventana: `inicio` y `fin` (AAAA-MM-DD o ISO 8601), o bien `fecha` + `hora` +
+    `tipo` (evento | degustacion) para usar la misma ventana con márgenes con la
+    que se reserva al guardar.
+    Artículos: `items=silla:3,mesa:5`, o `categoria=silla`, o todos si se omiten.
+    Al editar: `excluir_evento` / `excluir_degustacion` ignoran sus propias reservas.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            inicio, fin = self.get_ventana(params)
+            llaves = None
+            if params.get('items'):
+                llaves = []
+                for llave in params['items'].split(','):
+                    categoria, item_id = llave.split(':')
+                    llaves.append((categoria.strip(), int(item_id)))
+        except ValueError:
+            return Response({
+                "error": "Parámetros inválidos. Usa 'inicio' y 'fin' (o 'fecha' y 'hora') e 'items=categoria:id,...'."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if fin <= inicio:
+            return Response({"error": "'fin' debe ser posterior a 'inicio'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        categoria = None
+        if params.get('categoria'):
+            categoria = get_categoria(params['categoria'])
+            if categoria is None:
+                return Response({"error": "Categoría no válida."}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultado = availability.disponibilidad(
+            inicio, fin, llaves=llaves, categoria=categoria,
+            excluir_evento=params.get('excluir_evento') or None,
+            excluir_degustacion=params.get('excluir_degustacion') or None,
+        )
+        items = [
+            {'categoria': llave[0], 'item_id': llave[1], **datos}
+            for llave, datos in resultado.items()
+        ]
+        items.sort(key=lambda item: (item['categoria'], item['producto']))
+        return Response({'inicio': inicio, 'fin': fin, 'items': items})
+
+    def get_ventana(self, params):
+        if params.get('fecha'):
+            fecha = datetime.strptime(params['fecha'], '%Y-%m-%d').date()
+            hora = datetime.strptime(params.get('hora') or '00:00', '%H:%M').time()
+            tipo = 'degustacion' if params.get('tipo') == 'degustacion' else 'evento'
+            return availability.ventana(fecha, hora, tipo)
+
+        inicio = datetime.fromisoformat(params['inicio']) if params.get('inicio') else None
+        fin = datetime.fromisoformat(params['fin']) if params.get('fin') else None
+        if inicio is None or fin is None:
+            raise ValueError('Ventana incompleta')
+        if len(params['fin']) == 10:
+            fin += timedelta(days=1)  # una fecha sin hora incluye el día completo
+        if timezone.is_naive(inicio):
+            inicio = timezone.make_aware(inicio)
+        if timezone.is_naive(fin):
+            fin = timezone.make_aware(fin)
+        return inicio, fin
+
+
+def filtrar_por_campos(queryset, params, texto=(), enteros=()):
+    """
+    Aplica los filtros exactos `texto` y `enteros` presentes en `params`; un
+    entero inválido (ej. ?item_id=abc) es un 400, no un error en la consulta.
+    """
+    for campo in texto:
+        if params.get(campo):
+            queryset = queryset.filter(**{campo: params[campo]})
+    for campo in enteros:
+        if params.get(campo):
+            try:
+                valor = int(params[campo])
+            except ValueError:
+                raise serializers.ValidationError({'error': f"'{campo}' debe ser un número entero."})
+            queryset = queryset.filter(**{campo: valor})
+    return queryset
+
+
+class StockMovementPagination(CursorPagination):
+    """La bitácora sólo crece: paginación por cursor sobre (created_at, id), como las notificaciones."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class StockMovementViewSet(exports.ExportarListaMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Historial de movimientos de stock. Filtros: categoria, item_id, motivo,
+    evento, degustacion, desde y hasta (AAAA-MM-DD).
+    """
+    serializer_class = StockMovementSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StockMovementPagination
+
+    def get_queryset(self):
+        queryset = StockMovement.objects.select_related('bodega').order_by('-created_at', '-id')
+        params = self.request.query_params
+
+        queryset = filtrar_por_campos(
+            queryset, params, texto=('categoria', 'motivo'), enteros=('item_id', 'evento', 'degustacion'),
+        )
+        try:
+            if params.get('desde'):
+                desde = datetime.strptime(params['desde'], '%Y-%m-%d')
+                queryset = queryset.filter(created_at__gte=timezone.make_aware(desde))
+            if params.get('hasta'):
+                hasta = datetime.strptime(params['hasta'], '%Y-%m-%d') + timedelta(days=1)
+                queryset = queryset.filter(created_at__lt=timezone.make_aware(hasta))
+        except ValueError:
+            raise serializers.ValidationError({'error': 'Formato de fecha inválido. Usa AAAA-MM-DD.'})
+        return queryset
+
+
 class CalendarDataAPIView(APIView):
+    """
+    Eventos y degustaciones del rango visible del calendario (`start` y `end`,
+    AAAA-MM-DD; por defecto el mes actual). Responde con ETag y Last-Modified;
+    si la ventana no cambió, un GET condicional recibe 304.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        eventos = Evento.objects.all()
-        degustaciones = Degustacion.objects.all()
-
-        activities = []
-
-        for evento in eventos:
-            start_datetime = datetime.combine(evento.fecha_inicio, evento.hora_inicio)
-            activities.append({
-                'title': evento.nombre,
-                'start': start_datetime,
-                'end': start_datetime + timedelta(hours=2),  # Asumir duración de 2 horas
-                'type': 'Evento',
-                'details': {
-                    'Tipo de Evento': evento.tipo_evento.nombre if evento.tipo_evento else 'No especificado',
-                    'Hora del Evento': evento.hora_inicio.strftime('%H:%M'),
-                    'Cantidad de Personas': evento.cantidad_personas,
-                    'Ubicación': evento.lugar
-                }
-            })
+        try:
+            inicio, fin = schedule.ventana(request.query_params)
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "Parámetros inválidos. Usa 'start' y 'end' con formato AAAA-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        for degustacion in degustaciones:
-            start_datetime = datetime.combine(degustacion.fecha_degustacion, degustacion.hora_degustacion)
-            activities.append({
-                'title': degustacion.nombre,
-                'start': start_datetime,
-                'end': start_datetime + timedelta(hours=1),  # Asumir duración de 1 hora
-                'type': 'Degustación',
-                'details': {
-                    'Nombre de la Degustación': degustacion.nombre,
-                    'Hora': degustacion.hora_degustacion.strftime('%H:%M'),
-                    'Cantidad de Personas': degustacion.cantidad_personas
-                }
-            })
+        etag, last_modified = schedule.validadores(inicio, fin)
+        no_modificado = conditional.no_modificado(request, etag, last_modified)
+        if no_modificado is not None:
+            return no_modificado
+        return conditional.marcar(Response(schedule.actividades(inicio, fin)), etag, last_modified)
 
-        serializer = CalendarActivitySerializer(activities, many=True)
-        return Response(serializer.data)
 
+class CalendarFeedViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
+    """Suscripciones iCalendar del usuario; cada una trae la URL .ics con su token."""
+    serializer_class = CalendarFeedSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return CalendarFeed.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class CalendarFeedICSView(APIView):
+    """
+    Feed .ics de una suscripción. Se autentica con el token de la URL (las apps
+    de calendario no envían encabezados) y responde 304 si los datos no cambiaron.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, token, *args, **kwargs):
+        try:
+            feed = CalendarFeed.objects.select_related('user').get(token=token, user__is_active=True)
+        except CalendarFeed.DoesNotExist:
+            raise Http404
+
+        etag, last_modified = feeds.version(feed)
+        no_modificado = conditional.no_modificado(request, etag, last_modified)
+        if no_modificado is not None:
+            return no_modificado
 
-from django.http import JsonResponse, HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-import openpyxl
-from openpyxl.styles import Font, Alignment
+        response = StreamingHttpResponse(
+            feeds.ics(feed, dominio=request.get_host().split(':')[0]), content_type='text/calendar; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'inline; filename="banquetes.ics"'
+        return conditional.marcar(response, etag, last_modified)
 
-class LowStockInventoryView(APIView):
+
+class StockMinimoCategoriaViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
+    """
+    Stock mínimo por categoría (`categoria` es el slug). Al guardarlo o borrarlo
+    se recalcula el umbral de los artículos de la categoría sin umbral propio.
+    """
+    queryset = StockMinimoCategoria.objects.all().order_by('categoria')
+    serializer_class = StockMinimoCategoriaSerializer
     permission_classes = [IsAuthenticated]
+    lookup_field = 'categoria'
 
-    def get(self, request, *args, **kwargs):
-        """
-        Returns a list of all inventory items with stock below 25 units.
-        """
-        # Define the inventory models to check
-        inventory_models = [
-            Manteleria, Cubierto, Loza, Cristaleria, Silla,
-            Mesa, SalaLounge, Periquera, Carpa, PistaTarima, Extra
-        ]
+    @transaction.atomic
+    def perform_create(self, serializer):
+        instancia = serializer.save()
+        thresholds.recalcular_categoria(instancia.categoria)
 
-        low_stock_items = []
-
-        for model in inventory_models:
-            # Get all items with stock below 25
-            items = model.objects.filter(cantidad__lt=25).select_related('bodega')
-
-            for item in items:
-                low_stock_items.append({
-                    'id': item.id,
-                    'categoria': model._meta.verbose_name_plural.title(),
-                    'nombre': item.producto,
-                    'descripcion': item.descripcion,
-                    'cantidad_actual': item.cantidad,
-                    'stock_minimo': 25,  # Default minimum stock level
-                    'bodega_id': item.bodega.id if item.bodega else None,
-                    'bodega_nombre': item.bodega.nombre if item.bodega else 'No especificada',
-                    'tipo': model.__name__.lower()
-                })
+    @transaction.atomic
+    def perform_update(self, serializer):
+        anterior = serializer.instance.categoria
+        instancia = serializer.save()
+        thresholds.recalcular_categoria(instancia.categoria)
+        if anterior != instancia.categoria:
+            thresholds.recalcular_categoria(anterior)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        thresholds.recalcular_categoria(instance.categoria)
 
-        # Sort by category and then by current quantity (ascending)
-        low_stock_items.sort(key=lambda x: (x['categoria'], x['cantidad_actual']))
 
-        return Response(low_stock_items)
+class LowStockInventoryView(exports.ExportarReporteMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    nombre_exportacion = 'bajo_stock'
+
+    @report_cache.en_cache('bajo-stock', [CatalogoItem, Bodega])
+    def get(self, request, *args, **kwargs):
+        """
+        Returns a list of all inventory items below their minimum stock (the
+        item's, its category's or the global one; see thresholds.py).
+        """
+        # Conjunto precalculado en el catálogo unificado (ver catalog.bajo_stock)
+        return Response(reports.BAJO_STOCK.calcular())
 
 
-class MaintenanceReportView(APIView):
+class MaintenanceReportView(exports.ExportarReporteMixin, APIView):
     permission_classes = [IsAuthenticated]
+    nombre_exportacion = 'mantenimiento'
 
+    @report_cache.en_cache('mantenimiento', [CatalogoItem, StockMovement, Bodega])
     def get(self, request, *args, **kwargs):
         """
         Returns a list of all furniture items currently in maintenance or that 
         were in maintenance activity (entry/exit) in the last 30 days.
         """
-        # Define the inventory models to check (furniture/mobiliary items)
-        inventory_models = [
-            Manteleria, Cubierto, Loza, Cristaleria, Silla,
-            Mesa, SalaLounge, Periquera, Carpa, PistaTarima, Extra
-        ]
+        return Response(reports.MANTENIMIENTO.calcular())
 
-        maintenance_items = []
-        
-        # Get date range for the last 30 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
 
-        # 1. Get items currently in maintenance
-        for model in inventory_models:
-            items = model.objects.filter(cantidad_en_mantenimiento__gt=0).select_related('bodega')
-            
-            for item in items:
-                maintenance_items.append({
-                    'id': item.id,
-                    'categoria': model._meta.verbose_name_plural.title(),
-                    'nombre': item.producto,
-                    'descripcion': item.descripcion,
-                    'cantidad_en_mantenimiento': item.cantidad_en_mantenimiento,
-                    'cantidad_disponible': item.cantidad,
-                    'bodega_id': item.bodega.id if item.bodega else None,
-                    'bodega_nombre': item.bodega.nombre if item.bodega else 'No especificada',
-                    'estado': 'En Mantenimiento',
-                    'fecha': item.updated_at.isoformat() if item.updated_at else None,
-                    'tipo': model.__name__.lower()
-                })
+class EventAnalysisReportView(exports.ExportarReporteMixin, APIView):
+    """
+    Events grouped by time period (monthly, quarterly, yearly) with count and
+    percentage for each period, computed in the database.
 
-        # 2. Get maintenance activity from notifications in the last 30 days
-        maintenance_notifications = Notification.objects.filter(
-            created_at__gte=start_date,
-            created_at__lte=end_date
-        ).filter(
-            models.Q(message__icontains='ingresado al mantenimiento') | 
-            models.Q(message__icontains='salido del mantenimiento')
-        ).order_by('-created_at')
-
-        # Parse notifications to extract maintenance history
-        for notification in maintenance_notifications:
-            message = notification.message
-            
-            # Determine if it's entry or exit from maintenance
-            if 'ingresado al mantenimiento' in message.lower():
-                estado = 'Ingresó a Mantenimiento'
-            elif 'salido del mantenimiento' in message.lower():
-                estado = 'Salió de Mantenimiento'
-            else:
-                continue
-            
-            # Try to extract quantity and product name from message
-            # Message format: "Han ingresado/salido del mantenimiento {cantidad} {producto}."
-            import re
-            match = re.search(r'(\d+)\s+(.+?)\.$', message)
-            if match:
-                cantidad = int(match.group(1))
-                producto = match.group(2).strip()
-                
-                # Find the model that matches this product
-                found_item = None
-                for model in inventory_models:
-                    try:
-                        item = model.objects.filter(producto=producto).first()
-                        if item:
-                            found_item = {
-                                'id': f"notif_{notification.id}",
-                                'categoria': model._meta.verbose_name_plural.title(),
-                                'nombre': producto,
-                                'descripcion': '',
-                                'cantidad_en_mantenimiento': cantidad,
-                                'cantidad_disponible': item.cantidad if item else 0,
-                                'bodega_id': item.bodega.id if item and item.bodega else None,
-                                'bodega_nombre': item.bodega.nombre if item and item.bodega else 'No especificada',
-                                'estado': estado,
-                                'fecha': notification.created_at.isoformat(),
-                                'tipo': model.__name__.lower()
-                            }
-                            break
-                    except Exception as e:
-                        continue
-                
-                if found_item:
-                    # Check if this item is not already in the list (avoid duplicates with current maintenance)
-                    is_duplicate = any(
-                        existing['nombre'] == found_item['nombre'] and 
-                        existing['estado'] == 'En Mantenimiento'
-                        for existing in maintenance_items
-                    )
-                    if not is_duplicate:
-                        maintenance_items.append(found_item)
+    Query params:
+        period: monthly | quarterly | yearly
+        start_date, end_date: optional bounds on fecha_inicio (AAAA-MM-DD)
+        include_events: 'true' to add each period's events, paginated per
+            period with events_page and events_page_size (max 100)
+    """
+    permission_classes = [IsAuthenticated]
+    nombre_exportacion = 'analisis_eventos'
 
-        # Sort by date (most recent first) and then by category
-        maintenance_items.sort(key=lambda x: (x.get('fecha', ''), x['categoria']), reverse=True)
+    def filas_exportacion(self, data):
+        # Un periodo por fila; con include_events sus eventos van en la columna events
+        return data['periods']
 
-        return Response(maintenance_items)
+    @report_cache.en_cache('analisis-eventos', [Evento])
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        period_type = params.get('period', 'monthly')  # monthly, quarterly, yearly
+        if period_type not in reports.TRUNC_POR_PERIODO:
+            return Response({"error": "Periodo no válido. Usa monthly, quarterly o yearly."}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            desde = datetime.strptime(params['start_date'], '%Y-%m-%d').date() if params.get('start_date') else None
+            hasta = datetime.strptime(params['end_date'], '%Y-%m-%d').date() if params.get('end_date') else None
+            pagina = max(int(params.get('events_page', 1)), 1)
+            por_pagina = min(max(int(params.get('events_page_size', 20)), 1), 100)
+        except ValueError:
+            return Response({"error": "Parámetros inválidos. Usa fechas AAAA-MM-DD y páginas numéricas."}, status=status.HTTP_400_BAD_REQUEST)
 
-class EventAnalysisReportView(APIView):
-    permission_classes = [IsAuthenticated]
+        conteos = reports.eventos_por_periodo(period_type, desde, hasta)
+        total_events = sum(fila['count'] for fila in conteos)
+
+        detalle = None
+        if params.get('include_events', '').lower() in ('true', '1') and conteos:
+            detalle = reports.detalle_por_periodo(period_type, desde, hasta, pagina, por_pagina)
 
-    def get(self, request, *args, **kwargs):
-        """
-        Returns event analysis grouped by time periods (monthly, quarterly, yearly)
-        with count and percentage for each period.
-        """
-        period_type = request.query_params.get('period', 'monthly')  # monthly, quarterly, yearly
-        
-        # Get all events
-        eventos = Evento.objects.all().order_by('fecha_inicio')
-        
-        if not eventos.exists():
-            return Response({
-                'period_type': period_type,
-                'periods': [],
-                'total_events': 0
-            })
-        
-        # Group events by period
-        period_data = {}
-        total_events = eventos.count()
-        
-        for evento in eventos:
-            fecha = evento.fecha_inicio
-            
-            if period_type == 'monthly':
-                # Format: "Enero 2024", "Febrero 2024", etc.
-                period_key = fecha.strftime('%B %Y')
-                # Spanish month names
-                month_names = {
-                    'January': 'Enero', 'February': 'Febrero', 'March': 'Marzo',
-                    'April': 'Abril', 'May': 'Mayo', 'June': 'Junio',
-                    'July': 'Julio', 'August': 'Agosto', 'September': 'Septiembre',
-                    'October': 'Octubre', 'November': 'Noviembre', 'December': 'Diciembre'
-                }
-                for eng, esp in month_names.items():
-                    period_key = period_key.replace(eng, esp)
-                    
-            elif period_type == 'quarterly':
-                # Format: "Q1 2024", "Q2 2024", etc.
-                quarter = (fecha.month - 1) // 3 + 1
-                period_key = f"Q{quarter} {fecha.year}"
-                
-            else:  # yearly
-                # Format: "2024", "2025", etc.
-                period_key = str(fecha.year)
-            
-            if period_key not in period_data:
-                period_data[period_key] = {
-                    'period': period_key,
-                    'count': 0,
-                    'events': []
-                }
-            
-            period_data[period_key]['count'] += 1
-            period_data[period_key]['events'].append({
-                'id': evento.id,
-                'nombre': evento.nombre,
-                'fecha': evento.fecha_inicio.isoformat(),
-                'responsable': evento.responsable,
-                'cantidad_personas': evento.cantidad_personas
-            })
-        
-        # Calculate percentages and format response
         periods = []
-        for period_key, data in period_data.items():
-            percentage = round((data['count'] / total_events) * 100, 1)
-            periods.append({
-                'period': data['period'],
-                'count': data['count'],
-                'percentage': percentage,
-                'events': data['events']
-            })
-        
-        # Sort periods chronologically
-        if period_type == 'yearly':
-            periods.sort(key=lambda x: x['period'])
-        elif period_type == 'quarterly':
-            periods.sort(key=lambda x: (x['period'].split()[1], x['period'].split()[0]))
-        else:  # monthly
-            # Sort by date parsing
-            month_order = {
-                'Enero': 1, 'Febrero': 2, 'Marzo': 3, 'Abril': 4,
-                'Mayo': 5, 'Junio': 6, 'Julio': 7, 'Agosto': 8,
-                'Septiembre': 9, 'Octubre': 10, 'Noviembre': 11, 'Diciembre': 12
+        for fila in conteos:
+            periodo = {
+                'period': reports.etiqueta_periodo(fila['period_start'], period_type),
+                'period_start': fila['period_start'].isoformat(),
+                'count': fila['count'],
+                'percentage': round((fila['count'] / total_events) * 100, 1),
             }
-            periods.sort(key=lambda x: (
-                int(x['period'].split()[1]),  # year
-                month_order.get(x['period'].split()[0], 0)  # month
-            ))
-        
+            if detalle is not None:
+                periodo['events'] = detalle.get(fila['period_start'], [])
+                periodo['events_has_more'] = fila['count'] > pagina * por_pagina
+            periods.append(periodo)
+
         return Response({
             'period_type': period_type,
             'periods': periods,
@@ -707,8 +773,13 @@ class EventAnalysisReportView(APIView):
         })
 
 
-class InventoryUsageReportView(APIView):
+class InventoryUsageReportView(exports.ExportarReporteMixin, APIView):
     permission_classes = [IsAuthenticated]
+    nombre_exportacion = 'eventos'
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format=pdf|excel elige el documento, no un renderer de DRF; los errores van en JSON
+        return super().perform_content_negotiation(request, force=True)
 
     def generate_test_excel(self):
         """Genera un archivo Excel de prueba directamente."""
@@ -756,13 +827,9 @@ class InventoryUsageReportView(APIView):
         # 🎯 CASO 2: DESCARGAR UN REPORTE DE EVENTO ESPECÍFICO (reports/download/)
         if report_format and event_id:
             try:
-                evento = Evento.objects.get(pk=event_id)
-                if report_format == 'pdf':
-                    # Llama a tu función de generación de PDF
-                    return self.generate_pdf(evento)
-                elif report_format == 'excel':
-                    # Llama a tu función de generación de Excel
-                    return self.generate_excel(evento)
+                evento = Evento.objects.select_related('tipo_evento').get(pk=event_id)
+                if report_format in documents.GENERADORES_USO_EVENTO:
+                    return self.servir_render(request, evento, report_format)
                 else:
                     return Response({"error": "Formato de reporte no válido."}, status=status.HTTP_400_BAD_REQUEST)
             
@@ -786,6 +853,10 @@ class InventoryUsageReportView(APIView):
                     "detalle": str(e)
                 }, status=status.HTTP_400_BAD_REQUEST)
 
+            # Uso consolidado (agregado en SQL) en lugar del detalle de cada evento
+            if request.query_params.get('mode') == 'usage':
+                return self.uso(request, start_date, end_date)
+
             # Si la conversión fue exitosa:
             events = Evento.objects.filter(fecha_inicio__range=[start_date, end_date])
             
@@ -800,267 +871,210 @@ class InventoryUsageReportView(APIView):
             "error": "Parámetros incorrectos. Se requiere 'start_date' y 'end_date' o 'format' y 'event_id'."
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    def generate_pdf(self, evento):
-        # 1. PREPARAR EL NOMBRE DEL ARCHIVO SEGURO
-        
-        # Eliminamos acentos, tildes, y caracteres problemáticos del nombre del evento
-        # para que el nombre de archivo sea compatible con la mayoría de los sistemas.
-        # Esto previene errores de codificación complejos en la cabecera.
-        import unidecode
-        
-        # Usamos unidecode para simplificar caracteres (ej: Evento Día Ñ -> Evento Dia N)
-        clean_name = unidecode.unidecode(evento.nombre).replace(" ", "_").replace("/", "-")
-        base_filename = f"reporte_evento_{clean_name}.pdf"
+    def filas_exportacion(self, data):
+        # mode=usage: un artículo por fila
+        if isinstance(data, dict) and 'items' in data:
+            return data['items']['results']
+        return data
 
-        # 2. GENERAR LA RESPUESTA HTTP Y CABECERAS (CRÍTICO)
-        response = HttpResponse(content_type='application/pdf')
-        
-        # Codificamos la cabecera 'Content-Disposition' con latin-1, el estándar de Django
-        # para asegurar que los navegadores manejen correctamente los nombres de archivo no-ASCII.
-        response['Content-Disposition'] = f'attachment; filename="{base_filename}"'.encode('latin-1', errors='replace').decode('latin-1')
-        
-        # 3. GENERACIÓN DEL CONTENIDO DEL PDF CON REPORTLAB
-        
-        doc = SimpleDocTemplate(response, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Título y detalles
-        story.append(Paragraph(f"Reporte de Uso de Inventario", styles['Title']))
-        story.append(Spacer(1, 12))
-
-        # Nota: Usar 'Normal' con <b> funciona, pero si hay problemas de codificación 
-        # o fuentes en ReportLab, es mejor mantener el texto simple.
-        story.append(Paragraph(f"<b>Nombre del Evento:</b> {evento.nombre}", styles['Normal']))
-        story.append(Paragraph(f"<b>Tipo de Evento:</b> {evento.tipo_evento.nombre if evento.tipo_evento else 'N/A'}", styles['Normal']))
-        story.append(Paragraph(f"<b>Responsable:</b> {evento.responsable}", styles['Normal']))
-        story.append(Paragraph(f"<b>Lugar:</b> {evento.lugar}", styles['Normal']))
-        story.append(Paragraph(f"<b>Fecha:</b> {evento.fecha_inicio.strftime('%d/%m/%Y')}", styles['Normal']))
-        story.append(Spacer(1, 24))
-
-        story.append(Paragraph("Inventario Utilizado", styles['h2']))
-        
-        # Datos de la tabla
-        mobiliario_data = [['Producto', 'Descripción', 'Cantidad']]
-        for item in evento.mobiliario_asignado.all():
-            mobiliario_data.append([
-                item.content_object.producto,
-                item.content_object.descripcion,
-                item.cantidad
-            ])
-
-        table = Table(mobiliario_data)
-        style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ])
-        table.setStyle(style)
-        story.append(table)
-
-        doc.build(story)
-        return response
+    def uso(self, request, desde, hasta):
+        """
+        Consolidated inventory usage of the events between start_date and
+        end_date (mode=usage): totals per category, peak units out of the
+        warehouse per day and, per item, units, events and peak concurrent
+        units. Items are paginated with page and page_size (max 500);
+        ?export= exports every item.
+        """
+        params = request.query_params
+        try:
+            pagina = max(int(params.get('page', 1)), 1)
+            por_pagina = min(max(int(params.get('page_size', 50)), 1), 500)
+        except ValueError:
+            return Response({"error": "Parámetros de página inválidos."}, status=status.HTTP_400_BAD_REQUEST)
+        if desde > hasta:
+            return Response({"error": "'start_date' debe ser anterior a 'end_date'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        articulos = reports.uso_por_articulo(desde, hasta)
+        total_articulos = articulos.count()
+        if exports.formato_solicitado(request):
+            pagina, por_pagina = 1, max(total_articulos, 1)
+        filas = list(articulos[(pagina - 1) * por_pagina:pagina * por_pagina])
+
+        llaves = [(fila['categoria'], fila['item_id']) for fila in filas]
+        productos = {
+            (articulo['categoria'], articulo['item_id']): articulo['producto']
+            for articulo in catalog.por_llaves(llaves, campos=('categoria', 'item_id', 'producto'))
+        }
+        picos = reports.picos_por_articulo(desde, hasta, llaves)
+        items = []
+        for fila, llave in zip(filas, llaves):
+            categoria = get_categoria(fila['categoria'])
+            pico, fecha_pico = picos.get(llave, (0, None))
+            items.append({
+                'categoria': categoria.etiqueta if categoria else fila['categoria'],
+                'tipo': fila['categoria'],
+                'item_id': fila['item_id'],
+                'producto': productos.get(llave, 'Artículo eliminado'),
+                'unidades': fila['unidades'],
+                'eventos': fila['eventos'],
+                'pico': pico,
+                'fecha_pico': fecha_pico.isoformat() if fecha_pico else None,
+            })
 
-    def generate_excel(self, evento):
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="reporte_evento_{evento.nombre}.xlsx"'
+        categorias = []
+        for fila in reports.uso_por_categoria(desde, hasta):
+            categoria = get_categoria(fila['categoria'])
+            categorias.append({
+                'categoria': categoria.etiqueta if categoria else fila['categoria'],
+                'tipo': fila['categoria'],
+                'unidades': fila['unidades'],
+                'eventos': fila['eventos'],
+                'articulos': fila['articulos'],
+            })
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Reporte de Inventario"
-
-        # --- Header ---
-        ws.merge_cells('A1:C1')
-        title_cell = ws['A1']
-        title_cell.value = "Reporte de Uso de Inventario"
-        title_cell.font = Font(bold=True, size=16)
-        title_cell.alignment = Alignment(horizontal='center')
-
-        # --- Event Details ---
-        details = [
-            ("Nombre del Evento:", evento.nombre),
-            ("Tipo de Evento:", evento.tipo_evento.nombre if evento.tipo_evento else 'N/A'),
-            ("Responsable:", evento.responsable),
-            ("Lugar:", evento.lugar),
-            ("Fecha:", evento.fecha_inicio.strftime('%d/%m/%Y'))
+        eventos_por_dia = dict(
+            reports.eventos_en_rango(desde, hasta)
+            .values('fecha_inicio').annotate(count=models.Count('id')).values_list('fecha_inicio', 'count')
+            .order_by()
+        )
+        dias = [
+            {'fecha': dia.isoformat(), 'eventos': eventos_por_dia.get(dia, 0), 'unidades_pico': unidades}
+            for dia, unidades in reports.picos_por_dia(desde, hasta).items()
         ]
-        row = 3
-        for label, value in details:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'B{row}'] = value
-            row += 1
-
-        # --- Inventory Table ---
-        table_header_row = row + 1
-        headers = ["Producto", "Descripción", "Cantidad"]
-        for col_num, header_title in enumerate(headers, 1):
-            cell = ws.cell(row=table_header_row, column=col_num)
-            cell.value = header_title
-            cell.font = Font(bold=True)
-
-        for item in evento.mobiliario_asignado.all():
-            table_header_row += 1
-            ws.cell(row=table_header_row, column=1).value = item.content_object.producto
-            ws.cell(row=table_header_row, column=2).value = item.content_object.descripcion
-            ws.cell(row=table_header_row, column=3).value = item.cantidad
-
-        wb.save(response)
-        return response
 
+        return Response({
+            'mode': 'usage',
+            'start_date': desde.isoformat(),
+            'end_date': hasta.isoformat(),
+            'total_events': sum(eventos_por_dia.values()),
+            'total_units': sum(categoria['unidades'] for categoria in categorias),
+            'categories': categorias,
+            'days': dias,
+            'items': {
+                'count': total_articulos,
+                'page': pagina,
+                'page_size': por_pagina,
+                'has_more': total_articulos > pagina * por_pagina,
+                'results': items,
+            },
+        })
 
-class BackupCreateView(APIView):
+    def servir_render(self, request, evento, report_format):
+        """
+        Reporte del evento desde la caché en disco (ver renders.py): 304 si el
+        cliente ya tiene la versión actual, si no el archivo guardado, que sólo
+        se genera cuando cambian el evento o su mobiliario.
+        """
+        render = renders.Render(evento, report_format)
+        no_modificado = conditional.no_modificado(request, render.etag, render.modificado())
+        if no_modificado is not None:
+            return no_modificado
+        response = FileResponse(
+            open(render.generar(), 'rb'), as_attachment=True, filename=render.nombre_archivo,
+            content_type=render.content_type,
+        )
+        return conditional.marcar(response, render.etag, render.modificado())
+
+
+class EventReportBundleView(APIView):
+    """
+    ZIP con el reporte de uso de inventario de varios eventos: un PDF por evento
+    y un Excel con todos (ver bundles.py). Se genera en paralelo y se envía
+    mientras se produce.
+
+    Query params:
+        start_date, end_date: rango de fecha_inicio (AAAA-MM-DD), o bien
+        event_ids: lista separada por comas
+        formats: pdf, excel o ambos (por defecto)
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        # 1. Verificar que estamos usando SQLite (o ajustar si es otro motor)
-        if 'sqlite3' not in settings.DATABASES['default']['ENGINE']:
-            return Response({'error': 'La función de respaldo solo está configurada para SQLite.'}, 
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        db_path = settings.DATABASES['default']['NAME']
-        
-        # 2. Generar un nombre de archivo dinámico
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"db_backup_{timestamp}.sqlite3"
-        
-        # 3. Asegurar que la conexión a la base de datos esté cerrada temporalmente (Necesario para copiar SQLite)
-        # Esto es crucial para asegurar una copia consistente de SQLite
-        connection.close() 
+        params = request.query_params
+        formatos = [f for f in params.get('formats', 'pdf,excel').split(',') if f]
+        if not formatos or any(f not in bundles.FORMATOS for f in formatos):
+            return Response({"error": "Formato no válido. Usa pdf, excel o ambos."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # 4. Usar FileResponse para servir el archivo directamente
-            response = FileResponse(
-                open(db_path, 'rb'), 
-                content_type='application/octet-stream'
+            if params.get('event_ids'):
+                queryset = Evento.objects.filter(pk__in=[int(i) for i in params['event_ids'].split(',') if i])
+                nombre = 'reportes_eventos.zip'
+            elif params.get('start_date') and params.get('end_date'):
+                desde = datetime.strptime(params['start_date'], '%Y-%m-%d').date()
+                hasta = datetime.strptime(params['end_date'], '%Y-%m-%d').date()
+                queryset = reports.eventos_en_rango(desde, hasta)
+                nombre = f'reportes_eventos_{desde}_{hasta}.zip'
+            else:
+                return Response({"error": "Se requiere 'start_date' y 'end_date' o 'event_ids'."}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({"error": "Parámetros inválidos. Usa fechas AAAA-MM-DD e IDs numéricos."}, status=status.HTTP_400_BAD_REQUEST)
+
+        evento_ids = list(queryset.order_by('fecha_inicio', 'id').values_list('id', flat=True)[:bundles.max_eventos() + 1])
+        if not evento_ids:
+            return Response({"error": "No hay eventos en la selección."}, status=status.HTTP_404_NOT_FOUND)
+        if len(evento_ids) > bundles.max_eventos():
+            return Response(
+                {"error": f"La selección supera el máximo de {bundles.max_eventos()} eventos; divide el rango."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            
-            # 5. Establecer el encabezado Content-Disposition (crucial para la descarga)
-            response['Content-Disposition'] = f'attachment; filename="{backup_filename}"'
-            
-            return response
-            
-        except FileNotFoundError:
-            raise Http404("Archivo de base de datos no encontrado.")
-            
-        finally:
-            # 6. Reabrir la conexión a la base de datos después de la operación
-            connection.ensure_connection()
 
-class BackupRestoreView(APIView):
-    permission_classes = [IsAuthenticated]
+        response = StreamingHttpResponse(bundles.zip_eventos(evento_ids, formatos), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        return response
 
-    def post(self, request, *args, **kwargs):
-        # 1. Obtener el archivo del request (clave 'backup_file' del frontend)
-        uploaded_file = request.FILES.get('backup_file')
-        
-        if not uploaded_file:
-            return Response({'error': 'No se encontró el archivo de respaldo.'}, 
-                            status=status.HTTP_400_BAD_REQUEST)
 
-        # 2. Configuración de rutas (igual que en BackupCreateView)
-        db_path = settings.DATABASES['default']['NAME']
-        
-        # 3. Guardar el archivo subido en una ubicación temporal
-        temp_dir = settings.BASE_DIR / 'temp_restore'
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_file_path = temp_dir / 'incoming_backup.sqlite3'
-        
-        with open(temp_file_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
+class ReportJobViewSet(exports.ExportarListaMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Reportes generados en segundo plano (ver jobs.py).
 
-        # 4. CRÍTICO: Cerrar la conexión a la base de datos
-        connection.close() 
+    POST {tipo, formato, parametros} encola el reporte, o devuelve el trabajo
+    vigente con los mismos datos (202 si es nuevo, 200 si ya existía). El estado
+    se consulta en el detalle y el archivo se baja de /descargar/ cuando está
+    'listo'. Filtro: estado.
+    """
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated]
 
-        try:
-            # 5. Sobrescribir el archivo de base de datos con el archivo de respaldo
-            shutil.copyfile(temp_file_path, db_path)
-            
-            # 6. Responder éxito
-            return Response({'status': 'Restauración completada exitosamente. Se recomienda recargar el sistema.'}, 
-                            status=status.HTTP_200_OK)
+    def get_queryset(self):
+        queryset = ReportJob.objects.order_by('-created_at')
+        if self.request.query_params.get('estado'):
+            queryset = queryset.filter(estado=self.request.query_params['estado'])
+        return queryset
 
-        except Exception as e:
-            # 7. Manejo de errores
-            return Response({'error': f'Error al restaurar la base de datos: {str(e)}'}, 
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job, creado = jobs.encolar(
+                serializer.validated_data['tipo'], serializer.validated_data['formato'],
+                serializer.validated_data.get('parametros'), usuario=request.user,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED if creado else status.HTTP_200_OK
+        )
 
-        finally:
-            # 8. Reabrir la conexión y limpiar el archivo temporal
-            connection.ensure_connection()
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
+    @action(detail=True, methods=['get'])
+    def descargar(self, request, pk=None):
+        job = self.get_object()
+        if job.estado == 'vencido' or (job.estado == 'listo' and job.expira_at <= timezone.now()):
+            return Response({'error': 'El archivo venció; vuelve a solicitar el reporte.'}, status=status.HTTP_410_GONE)
+        if job.estado != 'listo':
+            return Response({'error': f'El reporte está {job.estado}.', 'estado': job.estado}, status=status.HTTP_409_CONFLICT)
+        try:
+            archivo = job.archivo.open('rb')
+        except FileNotFoundError:
+            raise Http404("Archivo de reporte no encontrado.")
+        return FileResponse(
+            archivo, as_attachment=True, filename=job.nombre_archivo,
+            content_type=documents.CONTENT_TYPES.get(job.formato, 'application/octet-stream'),
+        )
 
 
-class WarehouseInventoryReportView(APIView):
+class BackupCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
-        """
-        Returns inventory data grouped by warehouse and category.
-        Shows percentage of inventory per warehouse and items by category.
-        """
-        # Define the inventory models to check
-        inventory_models = [
-            ('Manteleria', Manteleria),
-            ('Cubierto', Cubierto),
-            ('Loza', Loza),
-            ('Cristaleria', Cristaleria),
-            ('Sillas', Silla),
-            ('Mesas', Mesa),
-            ('Salas lounge', SalaLounge),
-            ('Periqueras', Periquera),
-            ('Carpas', Carpa),
-            ('Pistas y tarimas', PistaTarima),
-            ('Extras', Extra)
-        ]
-
-        # Get all warehouses
-        bodegas = Bodega.objects.all()
-        
-        # Structure to hold the report data
-        report_data = []
-        total_inventory = 0
-        
-        # Calculate total inventory across all warehouses
-        for category_name, model in inventory_models:
-            total_inventory += model.objects.aggregate(total=models.Sum('cantidad'))['total'] or 0
-        
-        # Process each warehouse
-        for bodega in bodegas:
-            bodega_data = {
-                'id': bodega.id,
-                'nombre': bodega.nombre,
-                'ubicacion': bodega.ubicacion,
-                'total_items': 0,
-                'percentage': 0,
-                'categories': []
-            }
-            
-            bodega_total = 0
-            category_details = []
-            
-            # Calculate inventory by category for this warehouse
-            for category_name, model in inventory_models:
-                category_total = model.objects.filter(bodega=bodega).aggregate(
-                    total=models.Sum('cantidad')
-                )['total'] or 0
-                
-                bodega_total += category_total
-                
-                category_details.append({
-                    'categoria': category_name,
-                    'cantidad': category_total,
-                    'percentage': 0  # Will calculate after we know bodega_total
-                })
-            
-            # Calculate percentages
-            bodega_data['total_items'] = bodega_total
     def get(self, request, *args, **kwargs):
         # 1. Verificar que estamos usando SQLite (o ajustar si es otro motor)
         if 'sqlite3' not in settings.DATABASES['default']['ENGINE']:
@@ -1142,87 +1156,101 @@ class BackupRestoreView(APIView):
                 os.remove(temp_file_path)
 
 
-class WarehouseInventoryReportView(APIView):
+class WarehouseInventoryReportView(exports.ExportarReporteMixin, APIView):
     permission_classes = [IsAuthenticated]
+    nombre_exportacion = 'inventario_bodegas'
+
+    def filas_exportacion(self, data):
+        """Una fila por bodega y categoría."""
+        for bodega in data['warehouses']:
+            for categoria in bodega['categories']:
+                yield {
+                    'bodega_id': bodega['id'],
+                    'bodega': bodega['nombre'],
+                    'ubicacion': bodega['ubicacion'],
+                    'categoria': categoria['categoria'],
+                    'cantidad': categoria['cantidad'],
+                    'cantidad_en_mantenimiento': categoria['cantidad_en_mantenimiento'],
+                    'porcentaje_bodega': categoria['percentage'],
+                }
 
+    @report_cache.en_cache('bodegas', [CatalogoItem, Bodega])
     def get(self, request, *args, **kwargs):
         """
-        Returns inventory data grouped by warehouse and category.
-        Shows percentage of inventory per warehouse and items by category.
+        Returns inventory data grouped by warehouse and category, plus the
+        breakdown by category across all warehouses.
+
+        Every total comes from one grouped query over (bodega, categoría); the
+        other query only reads the warehouse names, so the query count does not
+        grow with the number of warehouses.
         """
-        # Define the inventory models to check
-        inventory_models = [
-            ('Manteleria', Manteleria),
-            ('Cubierto', Cubierto),
-            ('Loza', Loza),
-            ('Cristaleria', Cristaleria),
-            ('Sillas', Silla),
-            ('Mesas', Mesa),
-            ('Salas lounge', SalaLounge),
-            ('Periqueras', Periquera),
-            ('Carpas', Carpa),
-            ('Pistas y tarimas', PistaTarima),
-            ('Extras', Extra)
-        ]
+        return Response(reports.BODEGAS.calcular())
+
+
+class ReporteCategoriasAsyncView(View):
+    """
+    Versión async de un reporte entre categorías, para servirla con ASGI
+    (backend/asgi.py) junto a la vista sync, que sigue igual para WSGI.
+
+    Responde lo mismo que `vista_sync`, con el mismo caché de resultados y
+    ``?export=``; en un MISS las consultas de cada categoría y las generales se
+    hacen a la vez en el grupo de hilos acotado de parallel.py.
+    """
+    vista_sync = None
+    reporte = None
+    nombre_cache = None
+
+    @staticmethod
+    def json(datos, codigo=status.HTTP_200_OK):
+        # Mismo JSON que el JSONRenderer de DRF
+        return JsonResponse(
+            datos, status=codigo, safe=False, json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')}
+        )
 
-        # Get all warehouses
-        bodegas = Bodega.objects.all()
-        
-        # Structure to hold the report data
-        report_data = []
-        total_inventory = 0
-        
-        # Calculate total inventory across all warehouses
-        for category_name, model in inventory_models:
-            total_inventory += model.objects.aggregate(total=models.Sum('cantidad'))['total'] or 0
-        
-        # Process each warehouse
-        for bodega in bodegas:
-            bodega_data = {
-                'id': bodega.id,
-                'nombre': bodega.nombre,
-                'ubicacion': bodega.ubicacion,
-                'total_items': 0,
-                'percentage': 0,
-                'categories': []
-            }
-            
-            bodega_total = 0
-            category_details = []
-            
-            # Calculate inventory by category for this warehouse
-            for category_name, model in inventory_models:
-                category_total = model.objects.filter(bodega=bodega).aggregate(
-                    total=models.Sum('cantidad')
-                )['total'] or 0
-                
-                bodega_total += category_total
-                
-                category_details.append({
-                    'categoria': category_name,
-                    'cantidad': category_total,
-                    'percentage': 0  # Will calculate after we know bodega_total
-                })
-            
-            # Calculate percentages
-            bodega_data['total_items'] = bodega_total
-            if total_inventory > 0:
-                bodega_data['percentage'] = round((bodega_total / total_inventory) * 100, 2)
-            
-            # Calculate category percentages within this warehouse
-            for category in category_details:
-                if bodega_total > 0:
-                    category['percentage'] = round((category['cantidad'] / bodega_total) * 100, 2)
-            
-            bodega_data['categories'] = category_details
-            report_data.append(bodega_data)
-        
-        return Response({
-            'total_inventory': total_inventory,
-            'warehouses': report_data
-        })
+    async def get(self, request, *args, **kwargs):
+        user = await parallel.en_hilo(_usuario_jwt, request)
+        if user is None or not user.is_active:
+            return self.json({'detail': str(NotAuthenticated.default_detail)}, status.HTTP_401_UNAUTHORIZED)
+
+        formato = request.GET.get(exports.PARAMETRO)
+        if formato and formato not in exports.EXPORTADORES:
+            return self.json(
+                {'error': f"Formato de exportación no válido. Usa: {', '.join(exports.EXPORTADORES)}."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        datos, resultado = await report_cache.servir_async(
+            self.nombre_cache, report_cache.REPORTES[self.nombre_cache], request,
+            parallel.calcular, self.reporte,
+        )
+        if formato:
+            vista = self.vista_sync()
+            return exports.respuesta(formato, vista.filas_exportacion(datos), vista.nombre_exportacion)
+
+        response = self.json(datos)
+        if resultado:
+            response['X-Report-Cache'] = resultado.upper()
+        return response
+
+
+class LowStockInventoryAsyncView(ReporteCategoriasAsyncView):
+    vista_sync = LowStockInventoryView
+    reporte = reports.BAJO_STOCK
+    nombre_cache = 'bajo-stock'
+
+
+class MaintenanceReportAsyncView(ReporteCategoriasAsyncView):
+    vista_sync = MaintenanceReportView
+    reporte = reports.MANTENIMIENTO
+    nombre_cache = 'mantenimiento'
+
+
+class WarehouseInventoryReportAsyncView(ReporteCategoriasAsyncView):
+    vista_sync = WarehouseInventoryReportView
+    reporte = reports.BODEGAS
+    nombre_cache = 'bodegas'
 
-class HomeSectionViewSet(viewsets.ModelViewSet):
+class HomeSectionViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = HomeSection.objects.all()
     serializer_class = HomeSectionSerializer
     permission_classes = [IsAuthenticated]
@@ -1259,7 +1287,7 @@ class HomeSectionViewSet(viewsets.ModelViewSet):
         except HomeSectionImage.DoesNotExist:
             return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class InvitationViewSet(viewsets.ModelViewSet):
+class InvitationViewSet(exports.ExportarListaMixin, viewsets.ModelViewSet):
     queryset = Invitation.objects.all()
     serializer_class = InvitationSerializer
     permission_classes = [IsAuthenticated]
\ No newline at end of file
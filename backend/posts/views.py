@@ -9,8 +9,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
-from django.conf import settings
+from inventory.outbox import encolar
 import logging
 
 logger = logging.getLogger(__name__)
@@ -102,7 +101,7 @@ class PasswordResetRequestView(APIView):
             # Construir enlace de restablecimiento
             reset_link = f"http://localhost:5173/reset-password/{uid}/{token}"
             
-            # Enviar correo
+            # Preparar correo
             subject = '🔑 Solicitud de Restablecimiento de Contraseña - Sistema de Banquetes'
             message = f"""
 Hola {user.username},
@@ -120,15 +119,10 @@ Atentamente,
 Sistema de Gestión de Banquetes
             """
             
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
+            # Se encola; el comando send_outbox hace el envío SMTP fuera de la petición
+            encolar(subject, message, para=[user.email])
             
-            logger.info(f"Correo de restablecimiento enviado a {user.email}")
+            logger.info(f"Correo de restablecimiento encolado para {user.email}")
             
             return Response(
                 {'message': f'Se ha enviado un correo a {user.email} con instrucciones para restablecer tu contraseña'},
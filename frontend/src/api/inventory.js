@@ -52,6 +52,13 @@ export const getAllMobiliario = async () => {
   return allMobiliario;
 };
 
+// --- Disponibilidad por fecha --- //
+// Devuelve { 'modelo:id': unidades libres } para la fecha y hora indicadas
+export const getDisponibilidad = async (params) => {
+  const { data } = await api.get('/api/inventory/availability/', { params });
+  return Object.fromEntries(data.items.map(item => [`${item.categoria}:${item.item_id}`, item.disponible]));
+};
+
 // --- Content Types --- //
 export const getContentTypes = () => api.get('/api/inventory/content-types/');
 
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
-import { createEvento, updateEvento, getEventos, getTiposEvento, getAllMobiliario, getContentTypes } from '../api/inventory';
+import { createEvento, updateEvento, getEventos, getTiposEvento, getAllMobiliario, getContentTypes, getDisponibilidad } from '../api/inventory';
 import { toast } from 'react-hot-toast';
 import '../styles/EventoForm.css';
 
@@ -133,6 +133,7 @@ function EventoForm() {
   const [allMobiliario, setAllMobiliario] = useState([]);
   const [contentTypes, setContentTypes] = useState([]);
   const [selectedMobiliario, setSelectedMobiliario] = useState([]);
+  const [disponibilidad, setDisponibilidad] = useState(null);
 
   useEffect(() => {
     const loadInitialData = async () => {
@@ -169,6 +170,23 @@ function EventoForm() {
     loadInitialData();
   }, [id]);
 
+  // Unidades libres en la fecha del evento (una sola petición para todo el mobiliario)
+  useEffect(() => {
+    if (!evento.fecha_inicio || !evento.hora_inicio) {
+      setDisponibilidad(null);
+      return;
+    }
+    const params = { fecha: evento.fecha_inicio, hora: evento.hora_inicio, tipo: 'evento' };
+    if (id) params.excluir_evento = id;
+    getDisponibilidad(params)
+      .then(setDisponibilidad)
+      .catch(() => setDisponibilidad(null));
+  }, [evento.fecha_inicio, evento.hora_inicio, id]);
+
+  const mobiliarioDisponible = disponibilidad
+    ? allMobiliario.map(item => ({ ...item, cantidad: disponibilidad[`${item.modelName}:${item.id}`] ?? item.cantidad }))
+    : allMobiliario;
+
   const handleChange = (e) => {
     const { name, value } = e.target;
     setEvento({ ...evento, [name]: value });
@@ -357,7 +375,7 @@ function EventoForm() {
           
           <div className="mobiliario-selector">
             <h3>Agregar Mobiliario</h3>
-            <MobiliarioSelector allMobiliario={allMobiliario} onAdd={handleAddMobiliario} />
+            <MobiliarioSelector allMobiliario={mobiliarioDisponible} onAdd={handleAddMobiliario} />
           </div>
 
           {selectedMobiliario.length > 0 ? (
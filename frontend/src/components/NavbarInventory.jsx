@@ -23,17 +23,37 @@ const NavbarInventory = () => {
 
         const fetchUnreadCount = async () => {
             try {
-                const response = await api.get('/api/inventory/notifications/?is_read=false');
-                setUnreadCount(response.data.length);
+                const response = await api.get('/api/inventory/notifications/unread_count/');
+                setUnreadCount(response.data.unread_count);
             } catch (error) {
                 console.error('Error fetching unread count:', error);
             }
         };
 
         fetchUnreadCount();
-        const interval = setInterval(fetchUnreadCount, 60000); // Poll every 60 seconds
 
-        return () => clearInterval(interval);
+        // Una conexión SSE por pestaña; si el servidor no la soporta se consulta cada 60 s
+        let source = null;
+        let interval = null;
+        const startPolling = () => {
+            if (!interval) interval = setInterval(fetchUnreadCount, 60000);
+        };
+
+        if (token && window.EventSource) {
+            const baseUrl = api.defaults.baseURL.replace(/\/$/, '');
+            source = new EventSource(`${baseUrl}/api/inventory/notifications/stream/?token=${encodeURIComponent(token)}`);
+            source.addEventListener('notification', () => setUnreadCount(count => count + 1));
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED) startPolling();
+            };
+        } else {
+            startPolling();
+        }
+
+        return () => {
+            if (source) source.close();
+            if (interval) clearInterval(interval);
+        };
     }, []);
 
     return (
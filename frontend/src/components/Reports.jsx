@@ -1096,6 +1096,30 @@ const Reports = () => {
               <div className="warehouse-summary" style={{ marginBottom: '30px', padding: '15px', backgroundColor: '#f8f9fa', borderRadius: '5px' }}>
                 <h3>Resumen General</h3>
                 <p style={{ fontSize: '18px', fontWeight: 'bold' }}>Inventario Total: {warehouseData.total_inventory} unidades</p>
+                {warehouseData.categories && (
+                  <table className="table" style={{ width: '100%', marginTop: '15px' }}>
+                    <thead>
+                      <tr>
+                        <th>Categoría</th>
+                        <th>Cantidad</th>
+                        <th>En Mantenimiento</th>
+                        <th>% del Total</th>
+                      </tr>
+                    </thead>
+                    <tbody>
+                      {warehouseData.categories
+                        .filter(cat => cat.cantidad > 0 || cat.cantidad_en_mantenimiento > 0)
+                        .map(category => (
+                          <tr key={category.slug}>
+                            <td>{category.categoria}</td>
+                            <td>{category.cantidad}</td>
+                            <td>{category.cantidad_en_mantenimiento}</td>
+                            <td>{category.percentage}%</td>
+                          </tr>
+                        ))}
+                    </tbody>
+                  </table>
+                )}
               </div>
 
               {warehouseData.warehouses.map((warehouse, index) => (
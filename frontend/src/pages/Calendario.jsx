@@ -41,14 +41,31 @@ const customStyles = {
 const Calendario = () => {
   const [activities, setActivities] = useState([]);
   const [selectedActivity, setSelectedActivity] = useState(null);
+  const [feedUrl, setFeedUrl] = useState(null);
 
   useEffect(() => {
-    fetchCalendarData();
+    // Rango visible inicial: la cuadrícula del mes actual
+    fetchCalendarData(moment().startOf('month').startOf('week'), moment().endOf('month').endOf('week'));
   }, []);
 
-  const fetchCalendarData = async () => {
+  // react-big-calendar entrega un arreglo de días (semana/día) o {start, end} (mes/agenda)
+  const handleRangeChange = (range) => {
+    if (Array.isArray(range)) {
+      fetchCalendarData(range[0], range[range.length - 1]);
+    } else {
+      fetchCalendarData(range.start, range.end);
+    }
+  };
+
+  const fetchCalendarData = async (start, end) => {
     try {
-      const response = await api.get('/api/inventory/calendar/'); // Endpoint que creamos en Django
+      // Sólo las actividades del rango visible; el servidor responde 304 si no cambiaron
+      const response = await api.get('/api/inventory/calendar/', {
+        params: {
+          start: moment(start).format('YYYY-MM-DD'),
+          end: moment(end).format('YYYY-MM-DD'),
+        },
+      });
       // El backend devuelve fechas como strings, hay que convertirlas a objetos Date
       const formattedActivities = response.data.map(activity => ({
         ...activity,
@@ -61,6 +78,18 @@ const Calendario = () => {
     }
   };
 
+  // Suscripción .ics para la app de calendario del teléfono (se reutiliza la existente)
+  const handleSubscribe = async () => {
+    try {
+      const existing = await api.get('/api/inventory/calendar-feeds/');
+      const feeds = existing.data.results || existing.data;
+      const feed = feeds.length ? feeds[0] : (await api.post('/api/inventory/calendar-feeds/', {})).data;
+      setFeedUrl(feed.url.replace(/^https?:/, 'webcal:'));
+    } catch (error) {
+      console.error('Error creating calendar feed:', error);
+    }
+  };
+
   // Función para formatear la fecha
   const formatDate = (date) => {
     return moment(date).format('DD/MM/YYYY HH:mm');
@@ -123,6 +152,14 @@ const Calendario = () => {
   return (
     <div className="calendar-container">
       <h1 className="calendar-title">Calendario de Actividades</h1>
+      <div className="calendar-subscribe">
+        <button onClick={handleSubscribe} className="close-modal-btn">Suscribirse desde el teléfono</button>
+        {feedUrl && (
+          <p>
+            Agrega este calendario en tu app: <a href={feedUrl}>{feedUrl}</a>
+          </p>
+        )}
+      </div>
       <div className="calendar-wrapper">
         <Calendar
           localizer={localizer}
@@ -160,6 +197,7 @@ const Calendario = () => {
               }
             };
           }}
+          onRangeChange={handleRangeChange}
           onSelectEvent={event => setSelectedActivity(event)}
         />
       </div>
@@ -4,6 +4,8 @@ import '../styles/Notifications.css';
 
 const Notifications = () => {
     const [notifications, setNotifications] = useState([]);
+    const [nextUrl, setNextUrl] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [isLoading, setIsLoading] = useState(true);
     const [error, setError] = useState(null);
 
@@ -16,7 +18,8 @@ const Notifications = () => {
             setIsLoading(true);
             setError(null);
             const response = await api.get('/api/inventory/notifications/');
-            setNotifications(response.data);
+            setNotifications(response.data.results);
+            setNextUrl(response.data.next);
         } catch (error) {
             console.error('Error fetching notifications:', error);
             setError('No se pudieron cargar las notificaciones. Por favor, intenta de nuevo más tarde.');
@@ -25,6 +28,22 @@ const Notifications = () => {
         }
     };
 
+    // Paginación por cursor: la API devuelve la URL de la siguiente página
+    const fetchMore = async () => {
+        if (!nextUrl) return;
+        try {
+            setIsLoadingMore(true);
+            const response = await api.get(nextUrl);
+            setNotifications(prev => [...prev, ...response.data.results]);
+            setNextUrl(response.data.next);
+        } catch (error) {
+            console.error('Error fetching notifications:', error);
+            setError('No se pudieron cargar más notificaciones. Intenta de nuevo.');
+        } finally {
+            setIsLoadingMore(false);
+        }
+    };
+
     const handleMarkAllAsRead = async () => {
         try {
             await api.post('/api/inventory/notifications/mark_all_as_read/');
@@ -46,6 +65,7 @@ const Notifications = () => {
             try {
                 await api.post('/api/inventory/notifications/delete_all/');
                 setNotifications([]);
+                setNextUrl(null);
             } catch (error) {
                 console.error('Error deleting notifications:', error);
                 setError('No se pudieron eliminar las notificaciones. Intenta de nuevo.');
@@ -129,6 +149,14 @@ const Notifications = () => {
                     </div>
                 )}
             </div>
+
+            {nextUrl && (
+                <div className="notifications-actions">
+                    <button onClick={fetchMore} disabled={isLoadingMore}>
+                        {isLoadingMore ? 'Cargando...' : 'Cargar más'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };